@@ -0,0 +1,292 @@
+"""
+benchmark.py - Headless benchmarks of the catalog hot paths for Enhanced TV App
+Generates synthetic M3U playlists and times each stage of turning them into a
+filtered channel list: parsing, country detection, catalog and bucket
+building, search indexing and filtering. Needs no display, VLC or network.
+
+    python benchmark.py --sizes 1000,10000,100000 --output bench.json
+    python benchmark.py --compare bench.json
+    python benchmark.py --sizes 100000,1000000 --scaling --max-workers 8
+
+Results are written as JSON so runs from different commits can be compared.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+
+from tv_api import TVApi
+from catalog import ChannelCatalog
+from search_index import SearchIndex
+from countries import COUNTRY_NAMES, detect_country
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+GROUPS = ['News', 'Sports', 'Movies', 'Kids', 'Music', 'Entertainment', 'Documentary', 'Religious', 'General', '']
+WORDS = ['TV', 'News', 'Sport', 'Cinema', 'Music', 'Kids', 'One', 'Plus', 'HD', 'Channel', 'Live', 'World', 'Radio', 'Info', 'Max']
+QUERIES = ['news', 'sport hd', 'tv', 'zzz-no-match']
+
+
+def generate_playlist(count, seed=0):
+    """
+    Return an M3U playlist of count entries mixing the attribute styles seen
+    in public playlists: quoted, unquoted and multi-country tvg-country, no
+    country at all, country hints in group titles and channel names, extra
+    #EXTVLCOPT lines and blank lines.
+    """
+    rng = random.Random(seed)
+    codes = sorted(COUNTRY_NAMES)
+    names = [COUNTRY_NAMES[code] for code in codes]
+    lines = ['#EXTM3U x-tvg-url="https://example.com/guide.xml"']
+    for i in range(count):
+        code = rng.choice(codes)
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) + f' {i}'
+        attrs = [f'tvg-id="Ch{i}.{code.lower()}"']
+        style = rng.random()
+        if style < 0.45:
+            attrs.append(f'tvg-country="{code}"')
+        elif style < 0.55:
+            attrs.append(f'tvg-country="{code};{rng.choice(codes)}"')
+        elif style < 0.60:
+            attrs.append(f'tvg-country={code}')
+        elif style < 0.70:
+            title = f'[{code}] {title}'
+        elif style < 0.75:
+            title = f'{title} ({code})'
+        elif style < 0.80:
+            title = f'{code}: {title}'
+        elif style < 0.90:
+            title = f'{title} {rng.choice(names)}'
+        group = rng.choice(GROUPS)
+        if rng.random() < 0.1:
+            group = f'{rng.choice(names)};{group}'
+        attrs.append(f'tvg-logo="https://example.com/logos/{i}.png"')
+        attrs.append(f'group-title="{group}"')
+        lines.append(f'#EXTINF:-1 {" ".join(attrs)},{title}')
+        if rng.random() < 0.05:
+            lines.append('#EXTVLCOPT:http-user-agent=Mozilla/5.0')
+        lines.append(f'https://stream{rng.randint(1, 50)}.example.com/live/{i}/index.m3u8')
+        if rng.random() < 0.02:
+            lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def measure(func, repeat=1, memory=False):
+    """Run func repeat times; return its last result and the best time, plus the peak allocation if memory is set."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    stats = {'seconds': round(best, 6)}
+    if memory:
+        # Separate run: tracemalloc slows allocation-heavy code down considerably
+        gc.collect()
+        tracemalloc.start()
+        func()
+        stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, stats
+
+
+def retained_bytes(func):
+    """Return func's result and how many bytes it still holds once it has returned."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, retained
+
+
+def bench_size(count, repeat=1, memory=True, seed=0):
+    results = {}
+    content = generate_playlist(count, seed)
+    results['playlist_bytes'] = len(content.encode('utf-8'))
+    api = TVApi()
+
+    # Serial on purpose, so results stay comparable across machines; see --scaling for the process pool
+    channels, results['parse_m3u_content'] = measure(lambda: api.parse_m3u_content(content, workers=1), repeat, memory)
+    results['channels'] = len(channels)
+
+    extinf_lines = [line for line in content.splitlines() if line.startswith('#EXTINF:')]
+    _, stats = measure(lambda: [api.parse_extinf(line) for line in extinf_lines], repeat, memory)
+    stats['us_per_line'] = round(stats['seconds'] / max(1, len(extinf_lines)) * 1e6, 3)
+    results['parse_extinf'] = stats
+
+    titles = [channel.title for channel in channels]
+
+    def detect_all():
+        # Start cold so the lru_cache in front of the matcher does not hide its cost
+        detect_country.cache_clear()
+        return [api.detect_country_from_text(title) for title in titles]
+    _, results['detect_country_from_text'] = measure(detect_all, repeat, memory)
+
+    catalog, results['catalog_build'] = measure(lambda: ChannelCatalog(channels), repeat, memory)
+    if memory:
+        del catalog
+        catalog, retained = retained_bytes(lambda: ChannelCatalog(channels))
+        results['catalog_build']['bytes_per_channel'] = round(retained / max(1, len(channels)), 1)
+        # The same channels held as one Python object each, for comparison
+        _, retained = retained_bytes(lambda: api.parse_m3u_content(content, workers=1))
+        results['parse_m3u_content']['bytes_per_channel'] = round(retained / max(1, len(channels)), 1)
+    # Free the per-channel objects before the remaining stages
+    channels = None
+
+    _, results['set_channels'] = measure(lambda: api.set_channels(catalog), repeat, memory)
+    countries, results['get_countries'] = measure(api.get_countries, repeat)
+    _, results['get_country_counts'] = measure(api.get_country_counts, repeat)
+
+    index, results['search_index_build'] = measure(lambda: SearchIndex(catalog.titles), repeat, memory)
+
+    busiest = max(countries, key=lambda code: len(api.get_country_rows(code))) if countries else None
+    dead = set(catalog.urls[::10])
+    filters = {
+        'all': lambda: api.filter_rows(),
+        'country': lambda: api.filter_rows(busiest),
+        'hide_offline': lambda: api.filter_rows(is_dead=dead.__contains__),
+    }
+
+    def cold_search(country, query):
+        # Adding nothing resets the remembered previous query, so every run searches from scratch
+        index.add(())
+        return api.filter_rows(country, query, search_index=index)
+    for query in QUERIES:
+        filters[f'scan:{query}'] = lambda query=query: api.filter_rows(query=query)
+        filters[f'index:{query}'] = lambda query=query: cold_search(None, query)
+        filters[f'country+index:{query}'] = lambda query=query: cold_search(busiest, query)
+    results['filter_rows'] = {}
+    for name, func in filters.items():
+        rows, stats = measure(func, max(repeat, 3))
+        stats['rows'] = len(rows)
+        results['filter_rows'][name] = stats
+    return results
+
+
+def worker_counts(max_workers):
+    """1, the powers of two below max_workers, and max_workers itself."""
+    counts = {1, max_workers}
+    count = 2
+    while count < max_workers:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def bench_parse_scaling(count, max_workers, repeat=1, seed=0):
+    """
+    Time parse_m3u_content on 1..max_workers processes, pool start-up
+    included, with the speedup over a serial parse. The small-input
+    fallback is disabled so every size really runs on the pool.
+    """
+    content = generate_playlist(count, seed)
+    api = TVApi()
+    results = {}
+    serial = None
+    for workers in worker_counts(max_workers):
+        _, stats = measure(lambda: api.parse_m3u_content(content, workers=workers, min_entries=0), repeat)
+        serial = serial or stats['seconds']
+        stats['speedup'] = round(serial / stats['seconds'], 2) if stats['seconds'] else None
+        results[f'{workers}_workers'] = stats
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def flatten(results, prefix=''):
+    """Yield (stage path, seconds) for every timed stage in a results tree."""
+    for key, value in results.items():
+        if isinstance(value, dict):
+            if 'seconds' in value:
+                yield prefix + key, value['seconds']
+            else:
+                yield from flatten(value, prefix + key + '/')
+
+
+def compare(baseline, current, threshold, min_delta=0.001):
+    """
+    Print every stage next to its baseline time and return how many got
+    slower than threshold times the baseline (and by more than min_delta
+    seconds, so timer noise on tiny stages is not reported).
+    """
+    regressions = 0
+    for size, results in current['results'].items():
+        old = dict(flatten(baseline.get('results', {}).get(size, {})))
+        for stage, seconds in flatten(results):
+            if stage not in old or not old[stage]:
+                continue
+            ratio = seconds / old[stage]
+            flag = ''
+            if ratio > threshold and seconds - old[stage] > min_delta:
+                flag = '  <-- slower'
+                regressions += 1
+            print(f"{size:>8} {stage:<40} {old[stage]:10.4f}s -> {seconds:10.4f}s  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark playlist parsing and channel filtering.")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated playlist sizes (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage; the best time is kept")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc runs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scaling', action='store_true', help="also time parallel parsing on 1..--max-workers processes")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help="largest process count for --scaling (default: %(default)s)")
+    parser.add_argument('--output', help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--compare', metavar='BASELINE', help="compare against an earlier JSON result")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="slowdown ratio reported as a regression by --compare (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    report = {'environment': environment(), 'results': {}}
+    for size in (int(size) for size in args.sizes.split(',') if size.strip()):
+        print(f"Benchmarking {size} channels...", file=sys.stderr)
+        report['results'][str(size)] = bench_size(size, args.repeat, not args.no_memory, args.seed)
+        if args.scaling:
+            report['results'][str(size)]['parse_scaling'] = bench_parse_scaling(size, args.max_workers, args.repeat, args.seed)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    elif not args.compare:
+        print(text)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
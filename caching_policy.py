@@ -0,0 +1,115 @@
+"""
+caching_policy.py - Adaptive per-channel network caching for Enhanced TV App
+Instead of one fixed network cache for every stream, each channel gets its own
+:network-caching value. It grows quickly after stalls and shrinks slowly after
+clean plays, so it settles near the smallest buffer that avoids rebuffering.
+"""
+
+import os
+import json
+import threading
+
+
+class CachingPolicy:
+    """
+    Picks the network-caching value (ms) for a channel from its
+    PlaybackMetrics history. New channels start at twice their average time
+    to first frame when one is known, otherwise at default. Each decision
+    looks at the sessions played since the previous one: any stall or error
+    multiplies the cache by grow, and every clean_streak clean plays in a
+    row multiply it by shrink. Values are kept within [minimum, maximum].
+    """
+    def __init__(self, metrics, policy_file='caching_policy.json', default=2000,
+                 minimum=300, maximum=10000, grow=1.5, shrink=0.9, clean_streak=3):
+        self.metrics = metrics
+        self.policy_file = policy_file
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.grow = grow
+        self.shrink = shrink
+        self.clean_streak = clean_streak
+        self.channels = {}  # url -> {'caching': ms, 'problems': n, 'first_frames': n, 'clean': n}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.policy_file):
+            try:
+                with open(self.policy_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self.channels = data
+            except Exception:
+                self.channels = {}
+        self.sanitize()
+
+    def sanitize(self):
+        # Keep only well-formed entries and pull cache sizes back into range
+        clean = {}
+        for url, state in self.channels.items():
+            if not isinstance(url, str) or not isinstance(state, dict):
+                continue
+            if not all(isinstance(state.get(key), (int, float)) for key in ('caching', 'problems', 'first_frames', 'clean')):
+                continue
+            clean[url] = {
+                'caching': self.clamp(state['caching']),
+                'problems': int(state['problems']),
+                'first_frames': int(state['first_frames']),
+                'clean': int(state['clean']),
+            }
+        self.channels = clean
+
+    def save(self):
+        if not self.dirty:
+            return
+        with self.lock:
+            data = {url: dict(state) for url, state in self.channels.items()}
+            self.dirty = False
+        tmp_file = self.policy_file + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.policy_file)
+        except Exception:
+            pass
+
+    def clamp(self, caching):
+        return int(min(self.maximum, max(self.minimum, caching)))
+
+    def initial_caching(self, stats):
+        # Startup time tracks connection and segment fetch time, so a buffer of twice that covers one refetch
+        if stats['ttff_average'] is not None:
+            return self.clamp(stats['ttff_average'] * 2000)
+        return self.clamp(self.default)
+
+    def caching_for(self, url):
+        """Return the network-caching value (ms) to use for the next play of url."""
+        stats = self.metrics.get(url)
+        problems = stats['buffering_episodes'] + stats['errors']
+        first_frames = stats['ttff_count']
+        with self.lock:
+            state = self.channels.get(url)
+            clean = 0
+            if state is None:
+                caching = self.initial_caching(stats)
+            elif problems > state['problems']:
+                caching = self.clamp(state['caching'] * self.grow)
+            elif first_frames > state['first_frames']:
+                caching = state['caching']
+                clean = state['clean'] + first_frames - state['first_frames']
+                if clean >= self.clean_streak:
+                    # Only probe for a smaller buffer once the current one has proven stable
+                    caching = self.clamp(caching * self.shrink)
+                    clean = 0
+            else:
+                # Nothing new was observed since the last decision
+                caching = state['caching']
+                clean = state['clean']
+            self.channels[url] = {'caching': caching, 'problems': problems, 'first_frames': first_frames, 'clean': clean}
+            self.dirty = True
+        return caching
+
+    def media_options(self, url):
+        return (f':network-caching={self.caching_for(url)}',)
@@ -0,0 +1,168 @@
+"""
+catalog.py - Compact columnar channel storage for Enhanced TV App
+Large aggregated playlists are kept as parallel columns instead of one Python
+object per channel; countries, groups and source playlists are stored once in
+lookup tables. A background refresh edits the catalog in place: changed
+channels are rewritten at their index and removed ones become tombstones, so
+the indices held by the list model and the country buckets stay valid.
+"""
+
+from array import array
+
+
+class TVChannel:
+    __slots__ = ('title', 'url', 'country', 'country_name', 'logo', 'group', 'tvg_id', 'source')
+
+    def __init__(self, title, url, country="Unknown", country_name="Unknown", logo="", group="", tvg_id="", source=""):
+        self.title = title
+        self.url = url
+        self.country = country
+        self.country_name = country_name
+        self.logo = logo
+        self.group = group
+        self.tvg_id = tvg_id
+        self.source = source
+
+
+class ChannelCatalog:
+    """
+    Sequence of channels stored column by column. Indexing returns a fresh
+    TVChannel view, so existing code can keep using channel attributes.
+    Indices in removed are tombstones: they keep their slot but are no
+    longer part of the catalog.
+    """
+    def __init__(self, channels=()):
+        self.titles = []
+        self.urls = []
+        self.logos = []
+        self.tvg_ids = []
+        self.country_ids = array('H')
+        self.group_ids = array('I')
+        self.source_ids = array('H')
+        self.countries = []   # (code, name) per country id
+        self.groups = []      # group title per group id
+        self.sources = []     # playlist URL or path per source id
+        self.removed = set()
+        self._country_lookup = {}
+        self._group_lookup = {}
+        self._source_lookup = {}
+        self.extend(channels)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __getitem__(self, index):
+        code, name = self.countries[self.country_ids[index]]
+        return TVChannel(
+            self.titles[index],
+            self.urls[index],
+            code,
+            name,
+            self.logos[index],
+            self.groups[self.group_ids[index]],
+            self.tvg_ids[index],
+            self.sources[self.source_ids[index]]
+        )
+
+    def __iter__(self):
+        for index in range(len(self.urls)):
+            yield self[index]
+
+    def _country_id(self, code, name):
+        key = (code, name)
+        country_id = self._country_lookup.get(key)
+        if country_id is None:
+            country_id = self._country_lookup[key] = len(self.countries)
+            self.countries.append(key)
+        return country_id
+
+    def _group_id(self, group):
+        group_id = self._group_lookup.get(group)
+        if group_id is None:
+            group_id = self._group_lookup[group] = len(self.groups)
+            self.groups.append(group)
+        return group_id
+
+    def _source_id(self, source):
+        source_id = self._source_lookup.get(source)
+        if source_id is None:
+            source_id = self._source_lookup[source] = len(self.sources)
+            self.sources.append(source)
+        return source_id
+
+    def append_row(self, title, url, country="Unknown", country_name="Unknown", logo="", group="", tvg_id="", source=""):
+        self.titles.append(title)
+        self.urls.append(url)
+        self.logos.append(logo)
+        self.tvg_ids.append(tvg_id)
+        self.country_ids.append(self._country_id(country, country_name))
+        self.group_ids.append(self._group_id(group))
+        self.source_ids.append(self._source_id(source))
+
+    def append(self, channel):
+        self.append_row(channel.title, channel.url, channel.country, channel.country_name, channel.logo, channel.group, channel.tvg_id, channel.source)
+
+    def extend(self, channels):
+        for channel in channels:
+            self.append(channel)
+
+    def replace(self, index, channel):
+        """Overwrite the channel at index, keeping its position."""
+        self.titles[index] = channel.title
+        self.urls[index] = channel.url
+        self.logos[index] = channel.logo
+        self.tvg_ids[index] = channel.tvg_id
+        self.country_ids[index] = self._country_id(channel.country, channel.country_name)
+        self.group_ids[index] = self._group_id(channel.group)
+        self.source_ids[index] = self._source_id(channel.source)
+
+    def remove(self, index):
+        self.removed.add(index)
+
+    def live_count(self):
+        """Number of channels, not counting tombstones."""
+        return len(self.urls) - len(self.removed)
+
+    def signature(self, index):
+        """Hash of everything shown for the channel at index except its URL, to spot changed entries."""
+        return hash((
+            self.titles[index],
+            self.logos[index],
+            self.tvg_ids[index],
+            self.countries[self.country_ids[index]],
+            self.groups[self.group_ids[index]],
+            self.sources[self.source_ids[index]]
+        ))
+
+    def country_of(self, index):
+        return self.countries[self.country_ids[index]][0]
+
+
+class CatalogDiff:
+    """
+    Differences between two catalogs, matched by URL: indices of the new
+    catalog to insert, indices of the old one to remove, and (old, new)
+    index pairs of channels whose details changed.
+    """
+    def __init__(self, inserted=(), removed=(), updated=()):
+        self.inserted = list(inserted)
+        self.removed = list(removed)
+        self.updated = list(updated)
+
+    def __len__(self):
+        return len(self.inserted) + len(self.removed) + len(self.updated)
+
+
+def diff_catalogs(old, new):
+    """Return the CatalogDiff turning old (tombstones excluded) into new."""
+    removed = old.removed
+    positions = {url: index for index, url in enumerate(old.urls) if index not in removed}
+    inserted = []
+    updated = []
+    for new_index, url in enumerate(new.urls):
+        old_index = positions.pop(url, None)
+        if old_index is None:
+            inserted.append(new_index)
+        elif old.signature(old_index) != new.signature(new_index):
+            updated.append((old_index, new_index))
+    return CatalogDiff(inserted, sorted(positions.values()), updated)
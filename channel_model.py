@@ -0,0 +1,155 @@
+"""
+channel_model.py - Virtualized channel list model for Enhanced TV App
+The view only asks for the rows it is drawing, so filtering just swaps the
+row index array instead of rebuilding one widget item per channel.
+"""
+
+from bisect import bisect_left
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+
+class ChannelListModel(QAbstractListModel):
+    """List model over a channel sequence, showing only the channel indices in rows."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.channels = []
+        self.rows = []
+        self.placeholder = None
+        self._rows_owned = False
+        # Optional StreamHealthCache used to mark offline streams
+        self.health = None
+        # Optional LogoCache providing logo thumbnails
+        self.logos = None
+        # Optional EpgIndex for showing the programme currently on air
+        self.epg = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if not self.rows and self.placeholder:
+            return 1
+        return len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if not self.rows:
+            return self.placeholder if role == Qt.DisplayRole else None
+        channel = self.channels[self.rows[index.row()]]
+        if role == Qt.DisplayRole:
+            return f"{channel.title}  [{channel.country}]{self.programme_label(channel.tvg_id)}{self.health_label(channel.url)}\n{channel.url}"
+        if role == Qt.UserRole:
+            return channel
+        if role == Qt.DecorationRole and self.logos is not None and channel.logo:
+            return self.logos.get(channel.logo)
+        if role == Qt.ForegroundRole and self.health is not None and self.health.is_dead(channel.url):
+            return QColor('#777')
+        return None
+
+    def health_label(self, url):
+        entry = self.health.get(url) if self.health is not None else None
+        if entry is None:
+            return ''
+        if entry['ok']:
+            return f"  ● {entry['latency'] * 1000:.0f} ms"
+        return "  ✖ offline"
+
+    def programme_label(self, tvg_id):
+        programme = self.epg.now(tvg_id) if self.epg is not None and tvg_id else None
+        if programme is None or not programme.title:
+            return ''
+        return f"  ▶ {programme.title}"
+
+    def refresh(self):
+        """Repaint every row, e.g. after new stream health results or logos came in."""
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1))
+
+    def channel_at(self, row):
+        if 0 <= row < len(self.rows):
+            return self.channels[self.rows[row]]
+        return None
+
+    def set_channels(self, channels, rows, placeholder="No channels found."):
+        """
+        Show rows (indices into channels); placeholder is displayed while rows
+        is empty. rows may be shared with the caller (e.g. a country bucket) and
+        is copied before the model ever appends to it.
+        """
+        self.beginResetModel()
+        self.channels = channels
+        self.rows = rows
+        self.placeholder = placeholder
+        self._rows_owned = False
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.set_channels(self.channels, rows, self.placeholder)
+
+    def own_rows(self):
+        """Copy rows if they are shared with the caller, before they (or the caller's list) get edited."""
+        if not self._rows_owned:
+            self.rows = list(self.rows)
+            self._rows_owned = True
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        if not self.rows:
+            self.set_rows(list(rows))
+            return
+        self.own_rows()
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def apply_changes(self, removed, updated, inserted, matches):
+        """
+        Update the shown rows after the catalog was edited in place, touching
+        only the affected rows so selection and scroll position survive.
+        removed and updated are channel indices, inserted are the new indices
+        that pass the current filter and matches(index) tells whether an
+        updated channel still does. Rows are kept in ascending order.
+        """
+        updated = sorted(updated)
+        if not self.rows:
+            self.set_rows(sorted(index for index in updated if matches(index)) + list(inserted))
+            return
+        self.own_rows()
+        rows = self.rows
+        drop = set(removed)
+        drop.update(index for index in updated if not matches(index))
+        positions = []
+        for index in drop:
+            position = bisect_left(rows, index)
+            if position < len(rows) and rows[position] == index:
+                positions.append(position)
+        if len(positions) == len(rows):
+            # Removing every row would leave the placeholder behind a removal; start over instead
+            kept = [index for index in updated if matches(index)]
+            self.set_rows(sorted(kept) + list(inserted))
+            return
+        positions.sort()
+        # Remove runs of adjacent rows, last run first so earlier positions stay valid
+        while positions:
+            last = positions.pop()
+            first = last
+            while positions and positions[-1] == first - 1:
+                first = positions.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del rows[first:last + 1]
+            self.endRemoveRows()
+        for index in updated:
+            if index in drop:
+                continue
+            position = bisect_left(rows, index)
+            if position < len(rows) and rows[position] == index:
+                self.dataChanged.emit(self.index(position), self.index(position))
+            else:
+                self.beginInsertRows(QModelIndex(), position, position)
+                rows.insert(position, index)
+                self.endInsertRows()
+        self.append_rows(inserted)
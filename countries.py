@@ -0,0 +1,139 @@
+"""
+countries.py - Country code tables and country detection for Enhanced TV App
+"""
+
+from functools import lru_cache
+
+COUNTRY_NAMES = {
+    'US': 'United States', 'GB': 'United Kingdom', 'CA': 'Canada', 'FR': 'France', 'DE': 'Germany',
+    'IT': 'Italy', 'ES': 'Spain', 'RU': 'Russia', 'CN': 'China', 'JP': 'Japan', 'KR': 'South Korea',
+    'IN': 'India', 'BR': 'Brazil', 'MX': 'Mexico', 'AU': 'Australia', 'NL': 'Netherlands',
+    'SE': 'Sweden', 'NO': 'Norway', 'FI': 'Finland', 'DK': 'Denmark', 'PL': 'Poland',
+    'TR': 'Turkey', 'GR': 'Greece', 'PT': 'Portugal', 'AR': 'Argentina', 'CL': 'Chile',
+    'ZA': 'South Africa', 'EG': 'Egypt', 'NG': 'Nigeria', 'UA': 'Ukraine', 'RO': 'Romania',
+    'HU': 'Hungary', 'CZ': 'Czech Republic', 'SK': 'Slovakia', 'BG': 'Bulgaria', 'RS': 'Serbia',
+    'HR': 'Croatia', 'SI': 'Slovenia', 'AT': 'Austria', 'CH': 'Switzerland', 'BE': 'Belgium',
+    'IE': 'Ireland', 'NZ': 'New Zealand', 'IL': 'Israel', 'SA': 'Saudi Arabia', 'AE': 'UAE',
+    'IR': 'Iran', 'IQ': 'Iraq', 'PK': 'Pakistan', 'ID': 'Indonesia', 'TH': 'Thailand',
+    'VN': 'Vietnam', 'MY': 'Malaysia', 'SG': 'Singapore', 'PH': 'Philippines', 'TW': 'Taiwan',
+    'HK': 'Hong Kong', 'BY': 'Belarus', 'XX': 'Unknown'
+}
+
+# Lowercase country names and demonyms found in group titles and channel names
+COUNTRY_ALIASES = {
+    'united states': 'US', 'usa': 'US', 'america': 'US', 'american': 'US',
+    'united kingdom': 'GB', 'uk': 'GB', 'britain': 'GB', 'british': 'GB', 'england': 'GB', 'english': 'GB',
+    'canada': 'CA', 'canadian': 'CA', 'france': 'FR', 'french': 'FR', 'germany': 'DE', 'german': 'DE',
+    'italy': 'IT', 'italian': 'IT', 'spain': 'ES', 'spanish': 'ES',
+    'russia': 'RU', 'russian': 'RU', 'china': 'CN', 'chinese': 'CN', 'japan': 'JP', 'japanese': 'JP',
+    'south korea': 'KR', 'korea': 'KR', 'korean': 'KR', 'india': 'IN', 'indian': 'IN',
+    'brazil': 'BR', 'brazilian': 'BR', 'mexico': 'MX', 'mexican': 'MX', 'australia': 'AU', 'australian': 'AU',
+    'netherlands': 'NL', 'dutch': 'NL', 'sweden': 'SE', 'swedish': 'SE', 'norway': 'NO', 'norwegian': 'NO',
+    'finland': 'FI', 'finnish': 'FI', 'denmark': 'DK', 'danish': 'DK', 'poland': 'PL', 'polish': 'PL',
+    'turkey': 'TR', 'turkish': 'TR', 'greece': 'GR', 'greek': 'GR', 'portugal': 'PT', 'portuguese': 'PT',
+    'argentina': 'AR', 'argentine': 'AR', 'chile': 'CL', 'chilean': 'CL', 'south africa': 'ZA',
+    'egypt': 'EG', 'egyptian': 'EG', 'nigeria': 'NG', 'nigerian': 'NG', 'ukraine': 'UA', 'ukrainian': 'UA',
+    'romania': 'RO', 'romanian': 'RO', 'hungary': 'HU', 'hungarian': 'HU', 'czech republic': 'CZ', 'czech': 'CZ',
+    'slovakia': 'SK', 'slovak': 'SK', 'bulgaria': 'BG', 'bulgarian': 'BG', 'serbia': 'RS', 'serbian': 'RS',
+    'croatia': 'HR', 'croatian': 'HR', 'slovenia': 'SI', 'slovenian': 'SI', 'austria': 'AT', 'austrian': 'AT',
+    'switzerland': 'CH', 'swiss': 'CH', 'belgium': 'BE', 'belgian': 'BE', 'ireland': 'IE', 'irish': 'IE',
+    'new zealand': 'NZ', 'israel': 'IL', 'israeli': 'IL', 'saudi arabia': 'SA', 'uae': 'AE',
+    'iran': 'IR', 'iranian': 'IR', 'iraq': 'IQ', 'iraqi': 'IQ', 'pakistan': 'PK', 'pakistani': 'PK',
+    'indonesia': 'ID', 'indonesian': 'ID', 'thailand': 'TH', 'thai': 'TH', 'vietnam': 'VN', 'vietnamese': 'VN',
+    'malaysia': 'MY', 'malaysian': 'MY', 'singapore': 'SG', 'philippines': 'PH', 'filipino': 'PH',
+    'taiwan': 'TW', 'taiwanese': 'TW', 'hong kong': 'HK', 'belarus': 'BY', 'belarusian': 'BY',
+}
+
+
+def get_country_name(country_code):
+    return COUNTRY_NAMES.get(country_code, 'Unknown')
+
+
+def country_key(country):
+    """Bucket key for a channel's country: the trimmed code, or 'Unknown' when there is none."""
+    code = country.strip() if country else ''
+    return code if code and code.lower() != 'unknown' else 'Unknown'
+
+
+def add_to_country_buckets(buckets, channels, start=0):
+    """Append the index of each channel (numbered from start) to the bucket of its country."""
+    for index, channel in enumerate(channels, start):
+        key = country_key(channel.country)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = []
+        bucket.append(index)
+    return buckets
+
+
+class CountryMatcher:
+    """
+    Aho-Corasick automaton over country aliases. A single pass over the text
+    finds every alias occurrence; only whole-word matches count, so "uk" no
+    longer matches inside "ukraine".
+    """
+    def __init__(self, aliases):
+        self.transitions = [{}]
+        self.outputs = [[]]
+        self.max_length = 0
+        for alias, code in aliases.items():
+            state = 0
+            for ch in alias:
+                next_state = self.transitions[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.transitions)
+                    self.transitions[state][ch] = next_state
+                    self.transitions.append({})
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append((len(alias), code))
+            self.max_length = max(self.max_length, len(alias))
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        self.failure = [0] * len(self.transitions)
+        queue = list(self.transitions[0].values())
+        for state in queue:
+            for ch, next_state in self.transitions[state].items():
+                fallback = self.failure[state]
+                while fallback and ch not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+                target = self.transitions[fallback].get(ch, 0)
+                self.failure[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.failure[next_state]]
+                queue.append(next_state)
+
+    def find(self, text):
+        """Return the code of the leftmost (then longest) whole-word alias in text, or None."""
+        best_start, best_length, best_code = None, 0, None
+        state = 0
+        length = len(text)
+        for i, ch in enumerate(text):
+            if best_start is not None and i - self.max_length >= best_start:
+                break
+            while state and ch not in self.transitions[state]:
+                state = self.failure[state]
+            state = self.transitions[state].get(ch, 0)
+            for alias_length, code in self.outputs[state]:
+                start = i - alias_length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if i + 1 < length and text[i + 1].isalnum():
+                    continue
+                if best_start is None or start < best_start or (start == best_start and alias_length > best_length):
+                    best_start, best_length, best_code = start, alias_length, code
+        return best_code
+
+
+COUNTRY_MATCHER = CountryMatcher(COUNTRY_ALIASES)
+
+
+@lru_cache(maxsize=8192)
+def detect_country(text):
+    """Return (code, name) for the first country mentioned in text, or None."""
+    if not text:
+        return None
+    code = COUNTRY_MATCHER.find(text.lower().strip())
+    if code is None:
+        return None
+    return (code, get_country_name(code))
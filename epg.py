@@ -0,0 +1,194 @@
+"""
+epg.py - XMLTV programme guide for Enhanced TV App
+Guides are streamed with iterparse and every element is discarded as soon as
+it has been read, so even very large files never exist as a full tree. The
+programmes of each channel are kept in start-time order for binary-search
+now/next lookups.
+"""
+
+import gzip
+import time
+import calendar
+from array import array
+from bisect import bisect_right
+import xml.etree.ElementTree as ET
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+def guide_key(channel_id):
+    """Normalize a tvg-id / XMLTV channel id for matching."""
+    return channel_id.strip().casefold()
+
+
+def parse_xmltv_time(value):
+    """Convert an XMLTV timestamp such as '20240101120000 +0100' to Unix seconds, or None."""
+    try:
+        value = value.strip()
+        seconds = calendar.timegm((
+            int(value[0:4]), int(value[4:6]), int(value[6:8]),
+            int(value[8:10]), int(value[10:12]), int(value[12:14] or 0), 0, 0, 0
+        ))
+        offset = value[14:].strip()
+        if offset:
+            sign = -1 if offset[0] == '-' else 1
+            digits = offset.lstrip('+-')
+            seconds -= sign * (int(digits[0:2]) * 3600 + int(digits[2:4]) * 60)
+        return seconds
+    except (ValueError, IndexError):
+        return None
+
+
+class Programme:
+    __slots__ = ('title', 'start', 'stop')
+
+    def __init__(self, title, start, stop):
+        self.title = title
+        self.start = start
+        self.stop = stop
+
+
+class ChannelSchedule:
+    """Programmes of one channel as sorted parallel columns."""
+    def __init__(self, programmes):
+        programmes.sort()
+        # Several guides may list the same programme; keep one entry per start time
+        programmes = [p for i, p in enumerate(programmes) if i == 0 or p[0] != programmes[i - 1][0]]
+        self.starts = array('q', (p[0] for p in programmes))
+        self.stops = array('q', (p[1] for p in programmes))
+        self.titles = [p[2] for p in programmes]
+
+    def __len__(self):
+        return len(self.titles)
+
+    def programme(self, position):
+        if 0 <= position < len(self.titles):
+            return Programme(self.titles[position], self.starts[position], self.stops[position])
+        return None
+
+    def now_next(self, when):
+        """Return (current, next) programmes at Unix time when; either may be None."""
+        position = bisect_right(self.starts, when) - 1
+        current = self.programme(position)
+        if current is not None and current.stop <= when:
+            # A gap in the schedule: nothing is on right now
+            current = None
+        return current, self.programme(position + 1)
+
+
+class EpgIndex:
+    """Schedules keyed by normalized guide channel id."""
+    def __init__(self, schedules=None):
+        self.schedules = schedules or {}
+
+    def __len__(self):
+        return len(self.schedules)
+
+    def now_next(self, tvg_id, when=None):
+        schedule = self.schedules.get(guide_key(tvg_id)) if tvg_id else None
+        if schedule is None:
+            return None, None
+        return schedule.now_next(time.time() if when is None else when)
+
+    def now(self, tvg_id, when=None):
+        return self.now_next(tvg_id, when)[0]
+
+
+def open_guide(source, session=None, timeout=60):
+    """Open an XMLTV source (HTTP(S) URL or file path, optionally gzipped) as a binary stream."""
+    if source.startswith(('http://', 'https://')):
+        if session is None:
+            import requests
+            session = requests
+        response = session.get(source, stream=True, timeout=timeout)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        stream = response.raw
+    else:
+        stream = open(source[len('file://'):] if source.startswith('file://') else source, 'rb')
+    if source.endswith('.gz'):
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def parse_xmltv(stream, channel_ids=None, keep_after=None, is_cancelled=None):
+    """
+    Stream the programmes of an XMLTV document into per-channel lists of
+    (start, stop, title). Only channels whose normalized id is in channel_ids
+    are kept (all when None), and programmes ending before keep_after are
+    skipped. Returns {channel key: [(start, stop, title), ...]}.
+    """
+    programmes = {}
+    events = ET.iterparse(stream, events=('start', 'end'))
+    _, root = next(events)
+    for event, elem in events:
+        if event != 'end':
+            continue
+        if elem.tag == 'programme':
+            key = guide_key(elem.get('channel', ''))
+            if channel_ids is None or key in channel_ids:
+                start = parse_xmltv_time(elem.get('start', ''))
+                stop = parse_xmltv_time(elem.get('stop', '')) if elem.get('stop') else None
+                if start is not None:
+                    stop = stop if stop is not None else start
+                    if keep_after is None or stop > keep_after:
+                        title = elem.findtext('title') or ''
+                        programmes.setdefault(key, []).append((start, stop, title.strip()))
+            # Drop the finished element and its siblings so the tree never grows
+            root.clear()
+            if is_cancelled is not None and is_cancelled():
+                break
+        elif elem.tag == 'channel':
+            root.clear()
+    return programmes
+
+
+def build_epg_index(programmes):
+    schedules = {}
+    for key, items in programmes.items():
+        schedule = ChannelSchedule(items)
+        # Programmes without an explicit stop run until the next one starts
+        stops = schedule.stops
+        for i in range(len(stops) - 1):
+            if stops[i] <= schedule.starts[i]:
+                stops[i] = schedule.starts[i + 1]
+        schedules[key] = schedule
+    return EpgIndex(schedules)
+
+
+class EpgLoader(QObject):
+    """Loads and indexes XMLTV guides on a worker thread, keeping only the given channel ids."""
+    ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    done = pyqtSignal()
+
+    def __init__(self, sources, channel_ids, session=None):
+        super().__init__()
+        self.sources = list(sources)
+        self.channel_ids = {guide_key(channel_id) for channel_id in channel_ids if channel_id}
+        self.session = session
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            programmes = {}
+            # Anything that ended more than an hour ago will never be shown
+            keep_after = time.time() - 3600
+            for source in self.sources:
+                if self._cancelled:
+                    return
+                try:
+                    with open_guide(source, self.session) as stream:
+                        found = parse_xmltv(stream, self.channel_ids, keep_after, lambda: self._cancelled)
+                except Exception as e:
+                    self.failed.emit(f"{source}: {e}")
+                    continue
+                for key, items in found.items():
+                    programmes.setdefault(key, []).extend(items)
+            if not self._cancelled:
+                self.ready.emit(build_epg_index(programmes))
+        finally:
+            self.done.emit()
@@ -0,0 +1,41 @@
+"""
+event_loop_monitor.py - Qt event loop lag measurement for Enhanced TV App
+A repeating timer should fire every interval ms; however much later it
+actually fires is time the UI thread spent busy and unable to respond.
+"""
+
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class EventLoopMonitor(QObject):
+    """
+    Records the lag of every tick as the event_loop_lag timing of telemetry
+    and counts ticks later than stall_threshold seconds as
+    event_loop_stalls.
+    """
+    def __init__(self, telemetry, interval=100, stall_threshold=0.1, parent=None):
+        super().__init__(parent)
+        self.telemetry = telemetry
+        self.interval = interval / 1000
+        self.stall_threshold = stall_threshold
+        self.last = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self.last - self.interval)
+        self.last = now
+        self.telemetry.observe('event_loop_lag', lag)
+        if lag > self.stall_threshold:
+            self.telemetry.count('event_loop_stalls')
@@ -1,19 +1,31 @@
 """
 favorites.py - Persistent favorites management for Enhanced TV App
 Modular, robust, and sanitized like the rest of the app modules.
+Favorites are stored as a JSON snapshot plus an append-only journal of
+add/remove operations, so a toggle appends one line instead of rewriting the
+whole list. The journal is folded into the snapshot in the background once it
+grows past compact_threshold entries.
 """
 
 import os
 import json
+import threading
 
 class FavoritesManager:
     """Manages persistent, sanitized favorites for TV channels."""
-    def __init__(self, favorites_file='favorites.json'):
+    def __init__(self, favorites_file='favorites.json', compact_threshold=500):
         self.favorites_file = favorites_file
+        self.journal_file = os.path.splitext(favorites_file)[0] + '.journal'
+        self.rotated_journal_file = self.journal_file + '.1'
+        self.compact_threshold = compact_threshold
         self.favorites = set()
+        self.journal_entries = 0
+        self.lock = threading.Lock()
+        self.compactor = None
         self.load()
 
     def load(self):
+        self.favorites = set()
         if os.path.exists(self.favorites_file):
             try:
                 with open(self.favorites_file, 'r', encoding='utf-8') as f:
@@ -21,28 +33,125 @@ class FavoritesManager:
                     self.favorites = set(data if isinstance(data, list) else [])
             except Exception:
                 self.favorites = set()
+        # A rotated journal is left behind only if a compaction was interrupted
+        leftover = os.path.exists(self.rotated_journal_file)
+        if leftover:
+            self.replay(self.rotated_journal_file)
+        self.journal_entries = self.replay(self.journal_file)
         self.sanitize()
+        if leftover:
+            self.compact_now()
+
+    def replay(self, journal_file):
+        """Apply the operations of journal_file to the favorites; return how many were read."""
+        if not os.path.exists(journal_file):
+            return 0
+        try:
+            # Bytes, not text: a torn append may end in the middle of a multi-byte character
+            with open(journal_file, 'rb') as f:
+                content = f.read()
+        except Exception:
+            return 0
+        end = content.rfind(b'\n') + 1
+        if end < len(content):
+            # The last append was cut short by a crash: drop the partial line for good
+            try:
+                os.truncate(journal_file, end)
+            except Exception:
+                pass
+        count = 0
+        for raw in content[:end].split(b'\n'):
+            try:
+                line = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                continue
+            op, url = line[:1], line[1:]
+            if op == '+':
+                self.favorites.add(url)
+            elif op == '-':
+                self.favorites.discard(url)
+            else:
+                continue
+            count += 1
+        return count
 
     def save(self):
+        """Rewrite the snapshot atomically from the current favorites."""
         self.sanitize()
+        self.write_snapshot(list(self.favorites))
+
+    def write_snapshot(self, favorites):
+        tmp_file = self.favorites_file + '.tmp'
         try:
-            with open(self.favorites_file, 'w', encoding='utf-8') as f:
-                json.dump(list(self.favorites), f, indent=2)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(favorites, f)
+            os.replace(tmp_file, self.favorites_file)
+            return True
         except Exception:
-            pass
+            return False
 
     def sanitize(self):
-        # Only keep valid, non-empty string URLs
-        self.favorites = set(f for f in self.favorites if isinstance(f, str) and f.strip())
+        # Only keep valid, non-empty, single-line string URLs
+        self.favorites = set(f for f in self.favorites if self.is_valid(f))
+
+    @staticmethod
+    def is_valid(channel_url):
+        return isinstance(channel_url, str) and bool(channel_url.strip()) and '\n' not in channel_url and '\r' not in channel_url
+
+    def append(self, op, channel_url):
+        with self.lock:
+            if op == '+':
+                self.favorites.add(channel_url)
+            else:
+                self.favorites.discard(channel_url)
+            try:
+                with open(self.journal_file, 'a', encoding='utf-8', newline='\n') as f:
+                    f.write(op + channel_url + '\n')
+            except Exception:
+                return
+            self.journal_entries += 1
+            needs_compaction = self.journal_entries >= self.compact_threshold and self.compactor is None
+            if needs_compaction:
+                self.compactor = threading.Thread(target=self.compact, name='favorites-compact', daemon=True)
+        if needs_compaction:
+            self.compactor.start()
+
+    def compact(self):
+        """Fold the journal into the snapshot; appends made meanwhile go to a fresh journal."""
+        try:
+            with self.lock:
+                if os.path.exists(self.rotated_journal_file):
+                    return
+                try:
+                    os.replace(self.journal_file, self.rotated_journal_file)
+                except Exception:
+                    return
+                favorites = list(self.favorites)
+                self.journal_entries = 0
+            # Until the rotated journal is removed, load() replays it over whichever snapshot is on disk
+            if self.write_snapshot(favorites):
+                os.remove(self.rotated_journal_file)
+        finally:
+            with self.lock:
+                self.compactor = None
+
+    def compact_now(self):
+        with self.lock:
+            favorites = list(self.favorites)
+            if not self.write_snapshot(favorites):
+                return
+            for journal_file in (self.rotated_journal_file, self.journal_file):
+                if os.path.exists(journal_file):
+                    os.remove(journal_file)
+            self.journal_entries = 0
 
     def add_favorite(self, channel_url):
-        if isinstance(channel_url, str) and channel_url.strip():
-            self.favorites.add(channel_url)
-            self.save()
+        if self.is_valid(channel_url) and channel_url not in self.favorites:
+            self.append('+', channel_url)
 
     def remove_favorite(self, channel_url):
-        self.favorites.discard(channel_url)
-        self.save()
+        if channel_url in self.favorites:
+            self.append('-', channel_url)
 
     def is_favorite(self, channel_url):
         return channel_url in self.favorites
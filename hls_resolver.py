@@ -0,0 +1,234 @@
+"""
+hls_resolver.py - HLS master playlist pre-resolution for Enhanced TV App
+Most channel URLs are HLS master playlists. Left alone, VLC fetches the master
+when a channel starts, often opens a rendition that is too heavy for the link
+and then switches down. The resolver fetches masters in the background while
+channels are being browsed and hands the player the variant playlist that
+fits the measured throughput, so playback starts on the right rendition.
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from http_session import LazySession
+
+HLS_ATTR_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_hls_attributes(text):
+    return {key: value.strip('"') for key, value in HLS_ATTR_RE.findall(text)}
+
+
+class HlsVariant:
+    __slots__ = ('url', 'bandwidth', 'width', 'height', 'audio_only')
+
+    def __init__(self, url, bandwidth, width=0, height=0, audio_only=False):
+        self.url = url
+        self.bandwidth = bandwidth  # bits per second
+        self.width = width
+        self.height = height
+        self.audio_only = audio_only
+
+
+def parse_master_playlist(text, base_url):
+    """
+    Return the variants of an HLS master playlist, ordered by bandwidth, or
+    None when text is not a master playlist or its variants cannot be played
+    on their own (audio carried in separate renditions).
+    """
+    variants = []
+    attrs = None
+    separate_audio = False
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#EXT-X-STREAM-INF:'):
+            attrs = parse_hls_attributes(line[len('#EXT-X-STREAM-INF:'):])
+        elif line.startswith('#EXT-X-MEDIA:'):
+            media = parse_hls_attributes(line[len('#EXT-X-MEDIA:'):])
+            # A variant URL alone would play without this audio track
+            if media.get('TYPE') == 'AUDIO' and media.get('URI'):
+                separate_audio = True
+        elif line.startswith('#'):
+            continue
+        elif attrs is not None:
+            try:
+                bandwidth = int(attrs.get('BANDWIDTH', 0))
+            except ValueError:
+                bandwidth = 0
+            width, _, height = attrs.get('RESOLUTION', '').partition('x')
+            codecs = attrs.get('CODECS', '')
+            audio_only = bool(codecs) and not attrs.get('RESOLUTION') and all(
+                codec.strip().startswith(('mp4a', 'ac-3', 'ec-3', 'opus')) for codec in codecs.split(','))
+            variants.append(HlsVariant(
+                urljoin(base_url, line), bandwidth,
+                int(width) if width.isdigit() else 0, int(height) if height.isdigit() else 0, audio_only))
+            attrs = None
+    if not variants or separate_audio:
+        return None
+    variants.sort(key=lambda variant: variant.bandwidth)
+    return variants
+
+
+class ThroughputEstimator:
+    """Exponentially weighted average of measured download rates, in kbit/s."""
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.kbps = None
+        self.updated = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, size, seconds):
+        if seconds <= 0:
+            return
+        kbps = size * 8 / seconds / 1000
+        with self.lock:
+            self.kbps = kbps if self.kbps is None else self.alpha * kbps + (1 - self.alpha) * self.kbps
+            self.updated = time.time()
+
+    def age(self):
+        return time.time() - self.updated if self.kbps is not None else None
+
+
+class HlsResolver:
+    """
+    Caches the variants of HLS master playlists for ttl seconds. resolve()
+    never touches the network: it returns the pinned variant of a prefetched
+    master, or the original URL. prefetch() fetches masters on a small
+    thread pool. While the throughput estimate is missing or older than
+    probe_interval seconds, prefetching also times the first probe_bytes of
+    a media segment to refresh it. A variant fits when its bandwidth is at
+    most safety times the estimate; without an estimate, default_kbps is
+    assumed. Responses larger than max_playlist_bytes are not playlists.
+    """
+    def __init__(self, max_workers=2, timeout=5.0, ttl=10 * 60, max_entries=2048,
+                 safety=0.7, default_kbps=4000, probe_interval=60, probe_bytes=256 * 1024,
+                 max_playlist_bytes=256 * 1024):
+        self.timeout = timeout
+        self.max_playlist_bytes = max_playlist_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.safety = safety
+        self.default_kbps = default_kbps
+        self.probe_interval = probe_interval
+        self.probe_bytes = probe_bytes
+        self.throughput = ThroughputEstimator()
+        self.session = LazySession(max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hls-resolve')
+        self.entries = OrderedDict()  # url -> (fetched at, variants or None)
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def _fresh_entry(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                return None
+            self.entries.move_to_end(url)
+            return entry
+
+    def _store(self, url, variants):
+        with self.lock:
+            self.entries[url] = (time.time(), variants)
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def choose(self, variants):
+        """Return the highest-bandwidth video variant that fits the current throughput, else the lightest one."""
+        video = [variant for variant in variants if not variant.audio_only] or variants
+        budget = (self.throughput.kbps or self.default_kbps) * self.safety * 1000
+        fitting = [variant for variant in video if variant.bandwidth <= budget]
+        return fitting[-1] if fitting else video[0]
+
+    def resolve(self, url):
+        """Return the URL to hand the player for url: a variant playlist when one was pinned, else url itself."""
+        entry = self._fresh_entry(url)
+        if entry is None or not entry[1]:
+            return url
+        return self.choose(entry[1]).url
+
+    def describe(self, url):
+        """One line for the debug overlay: the variant picked for url and the throughput estimate."""
+        kbps = self.throughput.kbps
+        estimate = f"{kbps:.0f} kbps" if kbps is not None else f"unknown (assuming {self.default_kbps} kbps)"
+        entry = self._fresh_entry(url)
+        if entry is None or not entry[1]:
+            return f"HLS: master not resolved | Throughput: {estimate}"
+        variant = self.choose(entry[1])
+        size = f"{variant.width}x{variant.height}, " if variant.height else ""
+        return f"HLS: {size}{variant.bandwidth // 1000} kbps ({len(entry[1])} variants) | Throughput: {estimate}"
+
+    def fetch(self, url):
+        """Fetch and cache the master playlist at url; return its variants or None."""
+        if not url.startswith(('http://', 'https://')):
+            return None
+        try:
+            # Streamed and capped: a channel URL may just as well be an endless MPEG-TS stream
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                if response.status_code >= 400:
+                    raise ValueError(f"HTTP {response.status_code}")
+                body = b''
+                for chunk in response.iter_content(64 * 1024):
+                    body += chunk
+                    if len(body) >= self.max_playlist_bytes:
+                        raise ValueError("not a playlist")
+                final_url = response.url
+            text = body.decode('utf-8', errors='replace')
+            variants = parse_master_playlist(text, final_url) if text.startswith('#EXTM3U') and '#EXT-X-STREAM-INF' in text else None
+        except Exception:
+            variants = None
+        self._store(url, variants)
+        return variants
+
+    def measure(self, variant_url):
+        """Time the download of the start of the first segment of a variant playlist."""
+        try:
+            response = self.session.get(variant_url, timeout=self.timeout)
+            segment = next((line.strip() for line in response.text.splitlines()
+                            if line.strip() and not line.startswith('#')), None)
+            if segment is None:
+                return
+            start = time.perf_counter()
+            size = 0
+            with self.session.get(urljoin(response.url, segment), stream=True, timeout=self.timeout) as segment_response:
+                if segment_response.status_code >= 400:
+                    return
+                for chunk in segment_response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size >= self.probe_bytes:
+                        break
+            # Tiny downloads are dominated by latency and would understate the link
+            if size >= 64 * 1024:
+                self.throughput.add(size, time.perf_counter() - start)
+        except Exception:
+            pass
+
+    def prefetch(self, urls):
+        """Fetch in the background every HTTP(S) url whose master is not cached yet."""
+        for url in urls:
+            if not url or not url.startswith(('http://', 'https://')) or self._fresh_entry(url) is not None:
+                continue
+            with self.lock:
+                if url in self.pending:
+                    continue
+                self.pending.add(url)
+            self.executor.submit(self._run, url)
+
+    def _run(self, url):
+        try:
+            variants = self.fetch(url)
+            age = self.throughput.age()
+            if variants and (age is None or age > self.probe_interval):
+                self.measure(self.choose(variants).url)
+        finally:
+            with self.lock:
+                self.pending.discard(url)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
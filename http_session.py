@@ -0,0 +1,37 @@
+"""
+http_session.py - Shared pooled HTTP sessions for Enhanced TV App
+requests is only imported when the first request is made, so modules that may
+talk HTTP do not slow down startup just by being imported or constructed.
+"""
+
+import threading
+
+
+def create_session(pool_size):
+    """Return a requests.Session keeping up to pool_size connections per host alive."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class LazySession:
+    """A pooled session that is created, thread-safely, on its first request."""
+    def __init__(self, pool_size=8):
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = create_session(self.pool_size)
+        return self._session
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
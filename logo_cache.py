@@ -0,0 +1,167 @@
+"""
+logo_cache.py - Lazy channel logo thumbnails for Enhanced TV App
+Logos are only fetched for the rows currently on screen. Downloads and image
+decoding run on a small thread pool; the UI thread just turns finished images
+into pixmaps. Decoded thumbnails live in an in-memory LRU and the raw bytes in
+a size-capped on-disk cache, so logos seen before never hit the network again.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+from http_session import LazySession
+
+
+class LogoDiskCache:
+    """Raw logo bytes keyed by URL, evicting least recently used files beyond max_bytes."""
+    def __init__(self, cache_dir='logo_cache', max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.sizes = {}  # file name -> size in bytes
+        self.total = 0
+        self.scan()
+
+    def scan(self):
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        self.sizes[entry.name] = entry.stat().st_size
+        except Exception:
+            pass
+        self.total = sum(self.sizes.values())
+
+    def _name(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        path = os.path.join(self.cache_dir, self._name(url))
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # The modification time doubles as the last access time for eviction
+            os.utime(path, None)
+            return data
+        except Exception:
+            return None
+
+    def put(self, url, data):
+        name = self._name(url)
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = path + '.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            return
+        with self.lock:
+            self.total += len(data) - self.sizes.get(name, 0)
+            self.sizes[name] = len(data)
+            if self.total > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        # Drop the least recently used files until the cache is back under 90% of its cap
+        def last_used(name):
+            try:
+                return os.path.getmtime(os.path.join(self.cache_dir, name))
+            except Exception:
+                return 0
+        for name in sorted(self.sizes, key=last_used):
+            if self.total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except Exception:
+                pass
+            self.total -= self.sizes.pop(name)
+
+
+class LogoCache(QObject):
+    """
+    Thumbnail pixmaps for logo URLs. request() queues the logos of the
+    visible rows, dropping queued ones that scrolled out of view; get()
+    returns a pixmap once it is ready. logo_ready(url) is emitted on the UI
+    thread for every logo that becomes available.
+    """
+    logo_ready = pyqtSignal(str)
+    decoded = pyqtSignal(str, QImage)
+
+    def __init__(self, size=32, max_items=512, max_workers=4, timeout=10.0, disk_cache=None):
+        super().__init__()
+        self.size = size
+        self.max_items = max_items
+        self.timeout = timeout
+        self.disk_cache = disk_cache if disk_cache is not None else LogoDiskCache()
+        self.pixmaps = OrderedDict()
+        self.pending = set()
+        self.failed = set()
+        self.wanted = set()
+        self.lock = threading.Lock()
+        self.session = LazySession(max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='logo-fetch')
+        self.decoded.connect(self.on_decoded)
+
+    def get(self, url):
+        pixmap = self.pixmaps.get(url)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(url)
+        return pixmap
+
+    def request(self, urls):
+        """Fetch the logos of urls that are neither cached, in flight nor known to fail."""
+        urls = [url for url in urls if url.startswith(('http://', 'https://'))]
+        with self.lock:
+            self.wanted = set(urls)
+            queue = [url for url in urls if url not in self.pixmaps and url not in self.pending and url not in self.failed]
+            self.pending.update(queue)
+        for url in queue:
+            self.executor.submit(self._load, url)
+
+    def _load(self, url):
+        image = None
+        try:
+            with self.lock:
+                if url not in self.wanted:
+                    # Scrolled out of view before its turn came
+                    return
+            data = self.disk_cache.get(url)
+            if data is None:
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                data = response.content
+                self.disk_cache.put(url, data)
+            image = QImage.fromData(data)
+            if image.isNull():
+                image = None
+            else:
+                image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        except Exception:
+            image = None
+        finally:
+            with self.lock:
+                self.pending.discard(url)
+                if image is None and url in self.wanted:
+                    self.failed.add(url)
+        if image is not None:
+            self.decoded.emit(url, image)
+
+    def on_decoded(self, url, image):
+        # QPixmap may only be created on the UI thread
+        self.pixmaps[url] = QPixmap.fromImage(image)
+        self.pixmaps.move_to_end(url)
+        while len(self.pixmaps) > self.max_items:
+            self.pixmaps.popitem(last=False)
+        self.logo_ready.emit(url)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,12 @@
 """
 main.py - Enhanced TV App
 Modern, professional UI for end users.
+The window is shown before anything slow happens: VLC is started on the first
+playback, and hardware probing and playlist loading run after the first paint.
+Run with --startup-profile to print how long each startup phase took.
 """
 
+from startup_profile import PROFILE
 
 import sys
 import os
@@ -15,267 +19,118 @@ try:
         sys.stderr = nul
 except Exception:
     pass
-import vlc
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QListWidget, QListWidgetItem, QPushButton, QComboBox, QMessageBox, QFrame, QSlider
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QListView, QPushButton, QComboBox, QCheckBox, QMessageBox, QFrame, QSlider, QStackedWidget
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal
 from PyQt5.QtGui import QPalette, QColor
 
-import re
-import requests
+import time
+import threading
 from keyboard_shortcuts import setup_shortcuts
 from theme_toggle import set_theme
 from remember_settings import RememberSettings
 from favorites import FavoritesManager
+from playlist_cache import PlaylistCache
+from playlist_loader import PlaylistLoader, SearchIndexBuilder, start_worker
+from channel_model import ChannelListModel
+from catalog import ChannelCatalog
+from tv_api import TVApi
+from stream_health import StreamHealthCache, StreamProber
+from zapping import ZapEngine
+from mosaic import MosaicView
+from hls_resolver import HlsResolver
+from telemetry import TELEMETRY, ProfilerToggle, MetricsServer
+from event_loop_monitor import EventLoopMonitor
+from playback_metrics import PlaybackMetrics
+from caching_policy import CachingPolicy
+from logo_cache import LogoCache
+from epg import EpgIndex, EpgLoader
 
-class TVChannel:
-    def __init__(self, title, url, country="Unknown", country_name="Unknown", logo=""):
-        self.title = title
-        self.url = url
-        self.country = country
-        self.country_name = country_name
-        self.logo = logo
-
-class TVApi:
-    def __init__(self, playlist_url=None):
-        self.channels = []
-        if playlist_url:
-            self.load_playlist(playlist_url)
-
-    def load_playlist(self, playlist_url):
-        response = requests.get(playlist_url)
-        response.raise_for_status()
-        self.channels = self.parse_m3u_content(response.text)
-        return self.channels
-
-    def parse_m3u_content(self, content):
-        channels = []
-        lines = content.splitlines()
-        extinf = None
-        for line in lines:
-            line = line.strip()
-            if line.startswith('#EXTINF:'):
-                extinf = line
-            elif line and not line.startswith('#') and extinf:
-                channel_info = self.parse_extinf(extinf)
-                channel_info['url'] = line
-                channels.append(TVChannel(
-                    channel_info['title'],
-                    channel_info['url'],
-                    channel_info['country'],
-                    channel_info['country_name'],
-                    channel_info['logo']
-                ))
-                extinf = None
-        return channels
-
-    def parse_extinf(self, extinf_line):
-        channel_info = {
-            'title': 'Unknown Channel',
-            'country': 'Unknown',
-            'country_name': 'Unknown',
-            'logo': '',
-            'extinf': extinf_line
-        }
-        try:
-            # Extract title
-            if ',' in extinf_line:
-                title_part = extinf_line.split(',', 1)[1].strip().strip('"\'')
-                if title_part:
-                    channel_info['title'] = title_part[:200]
-            # Extract country code from tvg-country
-            country_match = re.search(r'tvg-country="([^"]*)"', extinf_line, re.IGNORECASE)
-            if not country_match:
-                country_match = re.search(r'tvg-country=([A-Z]{2})', extinf_line, re.IGNORECASE)
-            if country_match:
-                country_codes = country_match.group(1).upper().split(';')
-                for country_code in country_codes:
-                    country_code = country_code.strip()
-                    if len(country_code) == 2 and country_code.isalpha():
-                        channel_info['country'] = country_code
-                        channel_info['country_name'] = self.get_country_name(country_code)
-                        break
-            # Try group-title for country info
-            if channel_info['country'] == 'Unknown':
-                group_match = re.search(r'group-title="([^"]*)"', extinf_line, re.IGNORECASE)
-                if group_match:
-                    group_title = group_match.group(1)
-                    detected_country = self.detect_country_from_text(group_title)
-                    if detected_country:
-                        channel_info['country'] = detected_country[0]
-                        channel_info['country_name'] = detected_country[1]
-            # Try to extract country from channel title patterns
-            if channel_info['country'] == 'Unknown':
-                title = channel_info['title']
-                title_country_match = re.match(r'\[([A-Z]{2})\]\s*(.*)', title)
-                if title_country_match:
-                    country_code = title_country_match.group(1).upper()
-                    if len(country_code) == 2 and country_code.isalpha():
-                        channel_info['country'] = country_code
-                        channel_info['country_name'] = self.get_country_name(country_code)
-                        channel_info['title'] = title_country_match.group(2).strip()
-                elif '(' in title and ')' in title:
-                    paren_match = re.search(r'\(([A-Z]{2})\)', title)
-                    if paren_match:
-                        country_code = paren_match.group(1).upper()
-                        if len(country_code) == 2 and country_code.isalpha():
-                            channel_info['country'] = country_code
-                            channel_info['country_name'] = self.get_country_name(country_code)
-                            channel_info['title'] = re.sub(r'\s*\([A-Z]{2}\)', '', title).strip()
-                elif ':' in title:
-                    colon_match = re.match(r'([A-Z]{2}):\s*(.*)', title)
-                    if colon_match:
-                        country_code = colon_match.group(1).upper()
-                        if len(country_code) == 2 and country_code.isalpha():
-                            channel_info['country'] = country_code
-                            channel_info['country_name'] = self.get_country_name(country_code)
-                            channel_info['title'] = colon_match.group(2).strip()
-                if channel_info['country'] == 'Unknown':
-                    detected_country = self.detect_country_from_text(title)
-                    if detected_country:
-                        channel_info['country'] = detected_country[0]
-                        channel_info['country_name'] = detected_country[1]
-            # Extract logo URL
-            logo_match = re.search(r'tvg-logo="([^"]*)"', extinf_line, re.IGNORECASE)
-            if logo_match:
-                channel_info['logo'] = logo_match.group(1)
-        except Exception as e:
-            print(f"Error parsing EXTINF: {e}")
-        return channel_info
-
-    def get_country_name(self, country_code):
-        country_map = {
-            'US': 'United States', 'GB': 'United Kingdom', 'CA': 'Canada', 'FR': 'France', 'DE': 'Germany',
-            'IT': 'Italy', 'ES': 'Spain', 'RU': 'Russia', 'CN': 'China', 'JP': 'Japan', 'KR': 'South Korea',
-            'IN': 'India', 'BR': 'Brazil', 'MX': 'Mexico', 'AU': 'Australia', 'NL': 'Netherlands',
-            'SE': 'Sweden', 'NO': 'Norway', 'FI': 'Finland', 'DK': 'Denmark', 'PL': 'Poland',
-            'TR': 'Turkey', 'GR': 'Greece', 'PT': 'Portugal', 'AR': 'Argentina', 'CL': 'Chile',
-            'ZA': 'South Africa', 'EG': 'Egypt', 'NG': 'Nigeria', 'UA': 'Ukraine', 'RO': 'Romania',
-            'HU': 'Hungary', 'CZ': 'Czech Republic', 'SK': 'Slovakia', 'BG': 'Bulgaria', 'RS': 'Serbia',
-            'HR': 'Croatia', 'SI': 'Slovenia', 'AT': 'Austria', 'CH': 'Switzerland', 'BE': 'Belgium',
-            'IE': 'Ireland', 'NZ': 'New Zealand', 'IL': 'Israel', 'SA': 'Saudi Arabia', 'AE': 'UAE',
-            'IR': 'Iran', 'IQ': 'Iraq', 'PK': 'Pakistan', 'ID': 'Indonesia', 'TH': 'Thailand',
-            'VN': 'Vietnam', 'MY': 'Malaysia', 'SG': 'Singapore', 'PH': 'Philippines', 'TW': 'Taiwan',
-            'HK': 'Hong Kong', 'XX': 'Unknown'
-        }
-        return country_map.get(country_code, 'Unknown')
-
-    def get_countries(self):
-        countries = set()
-        for c in self.channels:
-            if c.country and c.country.strip() and c.country.strip().lower() != 'unknown':
-                countries.add(c.country.strip())
-        return sorted(countries)
-
-    def detect_country_from_text(self, text):
-        if not text:
-            return None
-        text_lower = text.lower().strip()
-        country_name_map = {
-            'united states': 'US', 'usa': 'US', 'america': 'US', 'american': 'US',
-            'united kingdom': 'GB', 'uk': 'GB', 'britain': 'GB', 'british': 'GB', 'england': 'GB', 'english': 'GB',
-            'canada': 'CA', 'canadian': 'CA', 'france': 'FR', 'french': 'FR', 'germany': 'DE', 'german': 'DE',
-            'italy': 'IT', 'italian': 'IT', 'spain': 'ES', 'spanish': 'ES',
-            'russia': 'RU', 'russian': 'RU', 'china': 'CN', 'chinese': 'CN', 'japan': 'JP', 'japanese': 'JP',
-            'south korea': 'KR', 'korea': 'KR', 'korean': 'KR', 'india': 'IN', 'indian': 'IN',
-            'brazil': 'BR', 'brazilian': 'BR', 'mexico': 'MX', 'mexican': 'MX', 'australia': 'AU', 'australian': 'AU',
-            'netherlands': 'NL', 'dutch': 'NL', 'sweden': 'SE', 'swedish': 'SE', 'norway': 'NO', 'norwegian': 'NO',
-            'finland': 'FI', 'finnish': 'FI', 'denmark': 'DK', 'danish': 'DK', 'poland': 'PL', 'polish': 'PL',
-            'turkey': 'TR', 'turkish': 'TR', 'greece': 'GR', 'greek': 'GR', 'portugal': 'PT', 'portuguese': 'PT',
-            'argentina': 'AR', 'argentine': 'AR', 'chile': 'CL', 'chilean': 'CL', 'south africa': 'ZA',
-            'egypt': 'EG', 'egyptian': 'EG', 'nigeria': 'NG', 'nigerian': 'NG', 'ukraine': 'UA', 'ukrainian': 'UA',
-            'romania': 'RO', 'romanian': 'RO', 'hungary': 'HU', 'hungarian': 'HU', 'czech republic': 'CZ', 'czech': 'CZ',
-            'slovakia': 'SK', 'slovak': 'SK', 'bulgaria': 'BG', 'bulgarian': 'BG', 'serbia': 'RS', 'serbian': 'RS',
-            'croatia': 'HR', 'croatian': 'HR', 'slovenia': 'SI', 'slovenian': 'SI', 'austria': 'AT', 'austrian': 'AT',
-            'switzerland': 'CH', 'swiss': 'CH', 'belgium': 'BE', 'belgian': 'BE', 'ireland': 'IE', 'irish': 'IE',
-            'new zealand': 'NZ', 'israel': 'IL', 'israeli': 'IL', 'saudi arabia': 'SA', 'uae': 'AE',
-            'iran': 'IR', 'iranian': 'IR', 'iraq': 'IQ', 'iraqi': 'IQ', 'pakistan': 'PK', 'pakistani': 'PK',
-            'indonesia': 'ID', 'indonesian': 'ID', 'thailand': 'TH', 'thai': 'TH', 'vietnam': 'VN', 'vietnamese': 'VN',
-            'malaysia': 'MY', 'malaysian': 'MY', 'singapore': 'SG', 'philippines': 'PH', 'filipino': 'PH',
-            'taiwan': 'TW', 'taiwanese': 'TW', 'hong kong': 'HK', 'belarus': 'BY', 'belarusian': 'BY',
-        }
-        for name, code in country_name_map.items():
-            if name in text_lower:
-                return (code, self.get_country_name(code))
-        return None
-# --- End Integrated TV API Logic ---
 
 DEFAULT_PLAYLIST = "https://iptv-org.github.io/iptv/index.m3u"
 
+# --- Hardware Acceleration Mode ---
+# User override: set to 'auto' to enable detection, or set to 'd3d11va', 'dxva2', 'nvdec', 'none' to force a mode
+USER_HW_ACCEL_MODE = 'auto'  # 'auto', 'd3d11va', 'dxva2', 'nvdec', 'none'
+# Mode picked per detected GPU vendor ('nvdec' is not always stable on Windows)
+HW_ACCEL_BY_VENDOR = {'nvidia': 'd3d11va', 'amd': 'd3d11va', 'intel': 'd3d11va'}
+HW_ACCEL_FALLBACK = 'd3d11va'
+
+
+
+def detect_gpu_vendor():
+    try:
+        if os.name == 'nt':
+            import subprocess
+            result = subprocess.check_output(['wmic', 'path', 'win32_VideoController', 'get', 'name'], stderr=subprocess.DEVNULL)
+            gpus = result.decode(errors='ignore').lower()
+            if 'nvidia' in gpus:
+                return 'nvidia'
+            elif 'amd' in gpus or 'radeon' in gpus:
+                return 'amd'
+            elif 'intel' in gpus:
+                return 'intel'
+    except Exception:
+        pass
+    return None
+
+
+PROFILE.mark('imports')
+
 
 class EnhancedTVApp(QMainWindow):
+    hardware_detected = pyqtSignal()
+    # Emitted from the metrics server thread; cProfile has to be switched on the UI thread
+    profile_requested = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Enhanced TV App")
         self.setGeometry(100, 100, 1200, 800)
         self.setFixedSize(1325, 800)
         self.resize(False, False)
-        self.api = TVApi()
+        self.api = TVApi(cache=PlaylistCache())
         self.current_theme = 'dark'
         set_theme(QApplication.instance(), self.current_theme)
         self.settings = RememberSettings()
         self.settings.sanitize()
         self.favorites = FavoritesManager()
 
-        # --- Hardware Acceleration Mode ---
-        # User override: set to 'auto' to enable detection, or set to 'd3d11va', 'dxva2', 'nvdec', 'none' to force a mode
-        user_hw_accel_mode = 'auto'  # 'auto', 'd3d11va', 'dxva2', 'nvdec', 'none'
-
-        def detect_gpu_vendor():
-            try:
-                if os.name == 'nt':
-                    import subprocess
-                    result = subprocess.check_output(['wmic', 'path', 'win32_VideoController', 'get', 'name'], stderr=subprocess.DEVNULL)
-                    gpus = result.decode(errors='ignore').lower()
-                    if 'nvidia' in gpus:
-                        return 'nvidia'
-                    elif 'amd' in gpus or 'radeon' in gpus:
-                        return 'amd'
-                    elif 'intel' in gpus:
-                        return 'intel'
-            except Exception:
-                pass
-            return None
-
-        if user_hw_accel_mode == 'auto':
-            vendor = detect_gpu_vendor()
-            if vendor == 'nvidia':
-                hardware_accel_mode = 'd3d11va'  # 'nvdec' is not always stable on Windows
-            elif vendor == 'amd':
-                hardware_accel_mode = 'd3d11va'
-            elif vendor == 'intel':
-                hardware_accel_mode = 'd3d11va'
-            else:
-                hardware_accel_mode = 'd3d11va'  # fallback
-            gpu_info_str = f"GPU detected: {vendor if vendor else 'unknown'}\nHardware Acceleration: {hardware_accel_mode}"
-            print(f"[INFO] {gpu_info_str.replace(chr(10), ' | ')}")
-        else:
-            hardware_accel_mode = user_hw_accel_mode
-            gpu_info_str = f"GPU detection bypassed (manual override)\nHardware Acceleration: {hardware_accel_mode}"
-            print(f"[INFO] {gpu_info_str.replace(chr(10), ' | ')}")
-
-        # Show popup with GPU info for 15 seconds (non-blocking)
-        from PyQt5.QtCore import QTimer
-        def show_gpu_popup():
-            self.gpu_popup = QMessageBox(self)
-            self.gpu_popup.setWindowTitle("Hardware Info")
-            self.gpu_popup.setText(gpu_info_str)
-            self.gpu_popup.setStandardButtons(QMessageBox.Close)
-            self.gpu_popup.setStyleSheet("QLabel{min-width:300px; font-size:15px;} QMessageBox{background:#23272e; color:#fff;}")
-            self.gpu_popup.show()
-            QTimer.singleShot(5000, self.gpu_popup.close)
-        QTimer.singleShot(100, show_gpu_popup)  # Show after window appears
-
-        # Optimize VLC cache to reduce freezing (network/file cache in ms)
-        self.vlc_instance = vlc.Instance(
-            f'--avcodec-hw={hardware_accel_mode}',
-            '--network-caching=2000',   # 2 seconds network cache
-            '--file-caching=2000'       # 2 seconds file cache
-        )
-        self.player = self.vlc_instance.media_player_new()
-        self.init_ui()
-        self.load_playlist(DEFAULT_PLAYLIST)
+        # Filled in by detect_hardware() after the window is on screen
+        self.hardware_accel_mode = HW_ACCEL_FALLBACK
+        self.hardware_thread = None
+        self.hardware_detected.connect(self.show_gpu_popup)
+        # VLC is only started on the first playback (see ensure_playback)
+        self.vlc_instance = None
+        self.zapper = None
+        self.mosaic = None
+        self.playback_metrics = PlaybackMetrics()
+        self.caching_policy = CachingPolicy(self.playback_metrics)
+        self.loader = None
+        self.worker_threads = {}
+        self.search_index = None
+        self.search_builder = None
+        self.stream_health = StreamHealthCache()
+        self.prober = StreamProber(self.stream_health)
+        self.prober.probed.connect(self.on_stream_probed)
+        self.logo_cache = LogoCache()
+        self.hls = HlsResolver()
+        self.epg = EpgIndex()
+        self.epg_loader = None
+        self.epg_channel_ids = None
+        self.current_channel = None
+        self.first_paint_done = False
+        self.profiler = ProfilerToggle()
+        self.profile_requested.connect(self.toggle_profiler)
+        self.metrics_server = None
+        self.loop_monitor = EventLoopMonitor(TELEMETRY, parent=self)
+        TELEMETRY.gauge('channels', lambda: self.api.channels.live_count(), "Channels in the catalog")
+        TELEMETRY.gauge('shown_rows', lambda: len(self.channel_model.rows), "Channels shown by the current filter")
+        TELEMETRY.gauge('prewarmed_players', lambda: len(self.zapper.prewarmed) if self.zapper is not None else 0, "Streams buffering in the background")
+        TELEMETRY.gauge('mosaic_tiles', lambda: len(self.mosaic.tiles) if self.mosaic is not None else 0, "Tiles of the open mosaic")
+        with PROFILE.phase('build ui'):
+            self.init_ui()
         setup_shortcuts(self)
         # Add keyboard shortcut for theme toggle (Ctrl+T)
         from PyQt5.QtWidgets import QShortcut
@@ -283,6 +138,14 @@ class EnhancedTVApp(QMainWindow):
         QShortcut(QKeySequence('Ctrl+T'), self, self.toggle_theme)
         # Add keyboard shortcut for showing help (Ctrl+H)
         QShortcut(QKeySequence('Ctrl+H'), self, self.show_shortcuts_popup)
+        # Add keyboard shortcut for the playback statistics overlay (Ctrl+D)
+        QShortcut(QKeySequence('Ctrl+D'), self, self.toggle_debug_overlay)
+        # Add keyboard shortcut for the multi-channel mosaic (Ctrl+M)
+        QShortcut(QKeySequence('Ctrl+M'), self, self.toggle_mosaic)
+        # Add keyboard shortcut for starting/stopping the profiler (Ctrl+P)
+        QShortcut(QKeySequence('Ctrl+P'), self, self.toggle_profiler)
+        # Add keyboard shortcut for cancelling a playlist load (Esc)
+        QShortcut(QKeySequence('Esc'), self, self.cancel_loading)
 
     def init_ui(self):
         # Apply dark modern palette
@@ -340,7 +203,12 @@ class EnhancedTVApp(QMainWindow):
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search channels...")
         self.search_box.setStyleSheet("QLineEdit { border-radius: 8px; padding: 8px; font-size: 15px; background: #23252a; color: #fff; }")
-        self.search_box.textChanged.connect(self.update_channel_list)
+        # Collapse bursts of keystrokes into a single search
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.update_channel_list)
+        self.search_box.textChanged.connect(self.search_timer.start)
         top_bar.addWidget(self.search_box)
         self.country_combo = QComboBox()
         self.country_combo.setStyleSheet("QComboBox { border-radius: 8px; padding: 8px; font-size: 15px; background: #23252a; color: #fff; }")
@@ -364,12 +232,69 @@ class EnhancedTVApp(QMainWindow):
         ''')
         self.favorite_button.clicked.connect(self.toggle_favorite)
         top_bar.addWidget(self.favorite_button)
+        self.hide_offline_box = QCheckBox("Hide offline")
+        self.hide_offline_box.setToolTip("Hide channels whose stream did not respond to the last check")
+        self.hide_offline_box.setStyleSheet("QCheckBox { color: #fff; font-size: 14px; }")
+        self.hide_offline_box.toggled.connect(self.update_channel_list)
+        top_bar.addWidget(self.hide_offline_box)
         left_panel.addLayout(top_bar)
         # Channel list
-        self.channel_list = QListWidget()
-        self.channel_list.setStyleSheet("QListWidget { border-radius: 8px; font-size: 15px; background: #23252a; color: #fff; selection-background-color: #0078d4; selection-color: #fff; }")
-        self.channel_list.itemDoubleClicked.connect(self.play_channel)
-        self.channel_list.currentItemChanged.connect(lambda _, __: self.update_favorite_button())
+        self.channel_list = QListView()
+        self.channel_model = ChannelListModel(self)
+        self.channel_list.setModel(self.channel_model)
+        # Every row has the same height, so the view can lay out only the visible rows
+        self.channel_list.setUniformItemSizes(True)
+        # Qt visits every row to lay the list out; do it in slices so a large catalog cannot freeze the UI
+        self.channel_list.setLayoutMode(QListView.Batched)
+        self.channel_list.setBatchSize(2000)
+        self.channel_list.setVerticalScrollMode(QListView.ScrollPerItem)
+        self.channel_list.setIconSize(QSize(self.logo_cache.size, self.logo_cache.size))
+        self.channel_list.setStyleSheet("QListView { border-radius: 8px; font-size: 15px; background: #23252a; color: #fff; selection-background-color: #0078d4; selection-color: #fff; }")
+        self.channel_list.doubleClicked.connect(self.play_channel)
+        self.channel_list.selectionModel().currentChanged.connect(lambda _, __: self.update_favorite_button())
+        # Resolve the HLS masters of the selected channel and its neighbours before they are played
+        self.hls_timer = QTimer(self)
+        self.hls_timer.setSingleShot(True)
+        self.hls_timer.setInterval(250)
+        self.hls_timer.timeout.connect(self.prefetch_hls)
+        self.channel_list.selectionModel().currentChanged.connect(lambda _, __: self.hls_timer.start())
+        # Probe the streams of whatever rows are on screen once scrolling settles
+        self.channel_model.health = self.stream_health
+        self.probe_timer = QTimer(self)
+        self.probe_timer.setSingleShot(True)
+        self.probe_timer.setInterval(300)
+        self.probe_timer.timeout.connect(self.probe_visible_channels)
+        # Slots take no arguments: QTimer.start(int) would treat the scroll position as the interval
+        self.channel_list.verticalScrollBar().valueChanged.connect(lambda _: self.schedule_visible_rows_work())
+        self.channel_model.modelReset.connect(self.schedule_visible_rows_work)
+        self.channel_model.rowsInserted.connect(lambda *_: self.schedule_visible_rows_work())
+        self.repaint_timer = QTimer(self)
+        self.repaint_timer.setSingleShot(True)
+        self.repaint_timer.setInterval(200)
+        self.repaint_timer.timeout.connect(self.channel_model.refresh)
+        # Logos are requested for the rows on screen shortly after scrolling pauses
+        self.channel_model.logos = self.logo_cache
+        self.logo_timer = QTimer(self)
+        self.logo_timer.setSingleShot(True)
+        self.logo_timer.setInterval(80)
+        self.logo_timer.timeout.connect(self.fetch_visible_logos)
+        self.logo_cache.logo_ready.connect(self.schedule_repaint)
+        # Programmes change over time: refresh the guide info once a minute
+        self.channel_model.epg = self.epg
+        self.epg_timer = QTimer(self)
+        self.epg_timer.setInterval(60000)
+        self.epg_timer.timeout.connect(self.update_now_playing)
+        self.epg_timer.timeout.connect(self.schedule_repaint)
+        self.epg_timer.start()
+        # Periodic background refresh of the playlist sources, started with the first load
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh_playlist)
+        self.persist_timer = QTimer(self)
+        self.persist_timer.setInterval(60000)
+        self.persist_timer.timeout.connect(self.stream_health.save)
+        self.persist_timer.timeout.connect(self.playback_metrics.save)
+        self.persist_timer.timeout.connect(self.caching_policy.save)
+        self.persist_timer.start()
         left_panel.addWidget(self.channel_list, 1)
 
         # Status
@@ -389,10 +314,17 @@ class EnhancedTVApp(QMainWindow):
         # Right: Video player and controls
         right_panel = QVBoxLayout()
         right_panel.setSpacing(16)
-        self.video_frame = QFrame()
-        self.video_frame.setFrameShape(QFrame.Box)
-        self.video_frame.setStyleSheet("background-color: #111216; border-radius: 12px; border: 2px solid #23252a; box-shadow: 0 4px 24px #00000044;")
-        right_panel.addWidget(self.video_frame, 8)
+        # One frame per VLC player; pre-buffered neighbours render into hidden frames
+        self.video_stack = QStackedWidget()
+        right_panel.addWidget(self.video_stack, 8)
+        # Stands in for the player frames until VLC is started
+        self.video_frame = self.create_video_frame()
+        self.video_stack.addWidget(self.video_frame)
+        self.prewarm_timer = QTimer(self)
+        self.prewarm_timer.setSingleShot(True)
+        # Give the channel being watched a head start before opening its neighbours
+        self.prewarm_timer.setInterval(1500)
+        self.prewarm_timer.timeout.connect(self.prewarm_neighbors)
 
         # Volume slider row
         volume_row = QHBoxLayout()
@@ -433,72 +365,497 @@ class EnhancedTVApp(QMainWindow):
         self.now_playing.setStyleSheet("color: #00bfff; font-size: 18px; font-weight: 600; padding: 8px 0 0 0;")
         right_panel.addWidget(self.now_playing)
 
+        # Playback statistics for the current channel (Ctrl+D)
+        self.debug_overlay = QLabel()
+        self.debug_overlay.setStyleSheet("color: #9f9; font-family: monospace; font-size: 12px; padding: 6px; background: #181a1f; border-radius: 8px;")
+        self.debug_overlay.hide()
+        right_panel.addWidget(self.debug_overlay)
+        self.debug_timer = QTimer(self)
+        self.debug_timer.setInterval(1000)
+        self.debug_timer.timeout.connect(self.update_debug_overlay)
+
         layout.addLayout(right_panel, 5)
 
         # Use remembered volume for initial slider value
         self.volume_slider.setValue(self.settings.get_volume())
 
-    def load_playlist(self, url):
+    def create_video_frame(self):
+        frame = QFrame()
+        frame.setFrameShape(QFrame.Box)
+        frame.setStyleSheet("background-color: #111216; border-radius: 12px; border: 2px solid #23252a; box-shadow: 0 4px 24px #00000044;")
+        return frame
+
+    def load_playlist(self, sources):
+        self.cancel_loading()
+        # Render the last snapshots right away and check the sources for changes in the background
+        cached = self.api.load_cached(sources)
+        if cached:
+            self.api.set_channels(cached)
+            self.populate_country_combo()
+            self.update_channel_list()
+            self.build_search_index()
+            self.load_epg()
+            self.status.setText(f"Loaded {self.api.channels.live_count()} channels (cached). Checking for updates...")
+            PROFILE.mark('cached channels shown')
+            self.start_loader(sources, revalidate=True)
+            return
         self.status.setText("Loading playlist...")
-        try:
-            self.api.load_playlist(url)
-            self.status.setText(f"Loaded {len(self.api.channels)} channels.")
-            self.country_combo.clear()
-            self.country_combo.addItem("All Countries")
-            countries = self.api.get_countries()
-            # Add 'Unknown' if any channel has no country or is marked unknown
-            if any(not c or c.strip() == '' or c.lower() == 'unknown' for c in [ch.country for ch in self.api.channels]):
-                self.country_combo.addItem("Unknown")
-            self.country_combo.addItems(sorted([c for c in countries if c and c.strip() and c.lower() != 'unknown']))
+        self.api.set_channels(ChannelCatalog())
+        self.channel_model.set_channels(self.api.channels, [], placeholder=None)
+        self.country_combo.blockSignals(True)
+        self.country_combo.clear()
+        self.country_combo.blockSignals(False)
+        self.start_loader(sources, revalidate=False)
+
+    def start_loader(self, sources, revalidate):
+        # A revalidation is diffed against the catalog on screen, so only the changes are applied
+        loader = PlaylistLoader(self.api, sources, revalidate, base=self.api.channels if revalidate else None)
+        # Lambdas keep track of which loader a queued signal came from, so late
+        # signals from a cancelled loader are ignored
+        loader.batch_ready.connect(lambda batch: self.on_playlist_batch(loader, batch))
+        loader.progress.connect(lambda count: self.on_playlist_progress(loader, count))
+        loader.finished.connect(lambda not_modified: self.on_playlist_finished(loader, not_modified))
+        loader.failed.connect(lambda message: self.on_playlist_failed(loader, message))
+        thread = start_worker(loader)
+        thread.finished.connect(lambda: self.on_worker_thread_finished(loader))
+        self.worker_threads[loader] = thread
+        self.loader = loader
+
+    def cancel_loading(self):
+        if self.loader is not None:
+            self.loader.cancel()
+            if not self.loader.revalidate:
+                self.status.setText(f"Loading cancelled ({self.api.channels.live_count()} channels).")
+                self.populate_country_combo()
+                self.build_search_index()
+            self.loader = None
+
+    def build_search_index(self):
+        self.search_index = None
+        builder = SearchIndexBuilder(self.api.channels)
+        channels = self.api.channels
+        builder.ready.connect(lambda index: self.on_search_index_ready(builder, channels, index))
+        thread = start_worker(builder)
+        thread.finished.connect(lambda: self.on_worker_thread_finished(builder))
+        self.worker_threads[builder] = thread
+        self.search_builder = builder
+
+    def on_search_index_ready(self, builder, channels, index):
+        # Ignore an index built for a catalog that has since been replaced or edited
+        if builder is self.search_builder and channels is self.api.channels:
+            self.search_index = index
+
+    def on_worker_thread_finished(self, worker):
+        thread = self.worker_threads.pop(worker, None)
+        if thread is not None:
+            thread.wait()
+
+    def on_playlist_batch(self, loader, batch):
+        if loader is not self.loader:
+            return
+        # Show channels as soon as each batch is parsed instead of waiting for the whole playlist
+        start = self.api.add_channels(batch)
+        self.channel_model.append_rows(self.filter_rows(start))
+
+    def on_playlist_progress(self, loader, count):
+        if loader is not self.loader:
+            return
+        if loader.revalidate:
+            self.status.setText(f"Loaded {self.api.channels.live_count()} channels. Checking for updates... {count} channels")
+        else:
+            self.status.setText(f"Loading playlist... {count} channels (Esc to cancel)")
+
+    def on_playlist_finished(self, loader, not_modified):
+        if loader is not self.loader:
+            return
+        self.loader = None
+        PROFILE.finish('playlist loaded')
+        if loader.revalidate:
+            if not_modified:
+                self.status.setText(f"Loaded {self.api.channels.live_count()} channels (up to date).")
+                return
+            if self.can_apply_diff(loader):
+                self.apply_refresh(loader)
+                return
+            # The cached catalog stayed on screen until the new one was complete
+            self.api.set_channels(loader.channels, loader.country_buckets)
+            self.populate_country_combo()
+            self.update_channel_list()
+            self.build_search_index()
+            self.load_epg()
+            self.status.setText(f"Loaded {self.api.channels.live_count()} channels (updated).{self.source_errors_note()}")
+            return
+        self.status.setText(f"Loaded {self.api.channels.live_count()} channels.{self.source_errors_note()}")
+        self.populate_country_combo()
+        if not self.channel_model.rows:
             self.update_channel_list()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
-            self.status.setText("Failed to load playlist.")
+        self.build_search_index()
+        self.load_epg()
 
-    def update_channel_list(self):
-        query = self.search_box.text().strip().lower()
-        country = self.country_combo.currentText()
-        if country == "All Countries":
-            channels = self.api.channels
-        elif country == "Unknown":
-            channels = [c for c in self.api.channels if not getattr(c, 'country', None) or c.country.strip() == '' or c.country.lower() == 'unknown']
+    def can_apply_diff(self, loader):
+        diff = loader.diff
+        if diff is None or loader.base is not self.api.channels:
+            return False
+        # Tombstones keep their slot; once they make up a quarter of the catalog, replace it instead
+        catalog = self.api.channels
+        tombstones = len(catalog.removed) + len(diff.removed)
+        return tombstones * 4 <= len(catalog) + len(diff.inserted)
+
+    def apply_refresh(self, loader):
+        """Apply a revalidated catalog as a diff, so the UI only does work for the channels that changed."""
+        diff = loader.diff
+        if not diff:
+            self.status.setText(f"Loaded {self.api.channels.live_count()} channels (up to date).{self.source_errors_note()}")
+            return
+        catalog = self.api.channels
+        # The model may be showing a country bucket that is about to be edited in place
+        self.channel_model.own_rows()
+        start = self.api.apply_diff(diff, loader.channels)
+        updated = [index for index, _ in diff.updated]
+        if self.search_index is not None and len(self.search_index) == start:
+            for index in diff.removed:
+                self.search_index.replace(index, '')
+            for index in updated:
+                self.search_index.replace(index, catalog.titles[index])
+            self.search_index.add(catalog.titles[start:])
         else:
-            channels = [c for c in self.api.channels if getattr(c, 'country', None) and c.country.strip().lower() == country.strip().lower()]
-        if query:
-            channels = [c for c in channels if query in c.title.lower()]
-        self.channel_list.clear()
-        for c in channels:
-            item = QListWidgetItem(f"{c.title}  [{c.country}]\n{c.url}")
-            item.setData(Qt.UserRole, c)
-            self.channel_list.addItem(item)
-        if not channels:
-            self.channel_list.addItem(QListWidgetItem("No channels found."))
-
-    def play_channel(self, item):
-        channel = item.data(Qt.UserRole)
+            self.build_search_index()
+        country = self.country_combo.currentData()
+        query = self.search_box.text()
+        is_dead = self.stream_health.is_dead if self.hide_offline_box.isChecked() else None
+        self.channel_model.apply_changes(
+            diff.removed,
+            updated,
+            self.filter_rows(start),
+            lambda index: self.api.row_matches(index, country, query, is_dead)
+        )
+        self.populate_country_combo()
+        if self.country_combo.currentData() != country:
+            # The selected country lost all its channels and the combo fell back to All Countries
+            self.update_channel_list()
+        # Only guide ids that were not requested before make the guide worth fetching again
+        new_ids = {catalog.tvg_ids[index] for index in updated}
+        new_ids.update(catalog.tvg_ids[start:])
+        new_ids.discard('')
+        if new_ids - (self.epg_channel_ids or set()):
+            self.load_epg()
+        self.status.setText(
+            f"Loaded {catalog.live_count()} channels (updated: {len(diff.inserted)} new, "
+            f"{len(diff.removed)} removed, {len(diff.updated)} changed).{self.source_errors_note()}"
+        )
+
+    def refresh_playlist(self):
+        """Check the playlist sources for changes in the background."""
+        if self.loader is not None:
+            return
+        self.start_loader(self.settings.get_playlist_sources() or [DEFAULT_PLAYLIST], revalidate=True)
+
+    def load_epg(self):
+        sources = self.settings.get_epg_sources()
+        if not sources:
+            return
+        channel_ids = set(self.api.channels.tvg_ids)
+        channel_ids.discard('')
+        if not channel_ids or channel_ids == self.epg_channel_ids:
+            return
+        if self.epg_loader is not None:
+            self.epg_loader.cancel()
+        self.epg_channel_ids = channel_ids
+        loader = EpgLoader(sources, channel_ids, self.api.session)
+        loader.ready.connect(lambda index: self.on_epg_ready(loader, index))
+        loader.failed.connect(lambda message: print(f"[EPG] {message}"))
+        thread = start_worker(loader)
+        thread.finished.connect(lambda: self.on_worker_thread_finished(loader))
+        self.worker_threads[loader] = thread
+        self.epg_loader = loader
+
+    def on_epg_ready(self, loader, index):
+        if loader is not self.epg_loader:
+            return
+        self.epg_loader = None
+        self.epg = index
+        self.channel_model.epg = index
+        self.update_now_playing()
+        self.schedule_repaint()
+
+    def source_errors_note(self):
+        failed = len(self.api.source_errors)
+        return f" {failed} source(s) could not be loaded." if failed else ""
+
+    def on_playlist_failed(self, loader, message):
+        if loader is not self.loader:
+            return
+        self.loader = None
+        PROFILE.finish('playlist failed')
+        if loader.revalidate:
+            self.status.setText(f"Loaded {self.api.channels.live_count()} channels (cached, offline).")
+            return
+        QMessageBox.critical(self, "Error", message)
+        self.status.setText("Failed to load playlist.")
+
+    def populate_country_combo(self):
+        current = self.country_combo.currentData()
+        counts = self.api.get_country_counts()
+        self.country_combo.blockSignals(True)
+        self.country_combo.clear()
+        self.country_combo.addItem(f"All Countries ({self.api.channels.live_count()})", None)
+        if 'Unknown' in counts:
+            self.country_combo.addItem(f"Unknown ({counts['Unknown']})", 'Unknown')
+        for code in self.api.get_countries():
+            self.country_combo.addItem(f"{code} ({counts[code]})", code)
+        index = self.country_combo.findData(current) if current else 0
+        self.country_combo.setCurrentIndex(index if index >= 0 else 0)
+        self.country_combo.blockSignals(False)
+
+    def filter_rows(self, start=0):
+        """Return the indices of self.api.channels, from start on, that match the search box and country filter."""
+        return self.api.filter_rows(
+            self.country_combo.currentData(),
+            self.search_box.text(),
+            start,
+            self.search_index,
+            self.stream_health.is_dead if self.hide_offline_box.isChecked() else None
+        )
+
+    def update_channel_list(self):
+        with TELEMETRY.span('update_channel_list'):
+            self.channel_model.set_channels(self.api.channels, self.filter_rows())
+
+    def visible_channels(self):
+        # Rows share one height and the view scrolls per item, so the visible range follows
+        # from the scroll position even while a batched layout is still in progress
+        if not self.channel_model.rows:
+            return []
+        first = self.channel_list.verticalScrollBar().value()
+        row_height = max(1, self.channel_list.sizeHintForRow(0))
+        last = min(len(self.channel_model.rows) - 1, first + self.channel_list.viewport().height() // row_height)
+        channels = (self.channel_model.channel_at(row) for row in range(first, last + 1))
+        return [channel for channel in channels if channel]
+
+    def schedule_visible_rows_work(self):
+        self.probe_timer.start()
+        self.logo_timer.start()
+
+    def probe_visible_channels(self):
+        self.prober.submit([channel.url for channel in self.visible_channels()])
+
+    def fetch_visible_logos(self):
+        self.logo_cache.request([channel.logo for channel in self.visible_channels() if channel.logo])
+
+    def prewarm_neighbors(self):
+        row = self.channel_list.currentIndex().row()
+        if row < 0 or self.zapper is None or self.mosaic is not None:
+            return
+        # Next channel first: it is the most likely zap target
+        neighbors = [self.channel_model.channel_at(row + 1), self.channel_model.channel_at(row - 1)]
+        self.zapper.prewarm([channel.url for channel in neighbors if channel])
+
+    def prefetch_hls(self):
+        row = self.channel_list.currentIndex().row()
+        if row < 0:
+            return
+        channels = [self.channel_model.channel_at(row), self.channel_model.channel_at(row + 1), self.channel_model.channel_at(row - 1)]
+        self.hls.prefetch([channel.url for channel in channels if channel])
+
+    def on_stream_probed(self, url, ok, latency):
+        self.schedule_repaint()
+
+    def schedule_repaint(self):
+        # Probe results and logos arrive in bursts; repaint once for all of them
+        if not self.repaint_timer.isActive():
+            self.repaint_timer.start()
+
+    def play_channel(self, index):
+        with TELEMETRY.span('play_channel'):
+            self._play_channel(index)
+
+    def _play_channel(self, index):
+        channel = index.data(Qt.UserRole)
         if channel:
-            self.now_playing.setText(f"Now Playing: {channel.title} [{channel.country}]")
-            self.player.stop()
-            # Set up video output
-            if sys.platform.startswith('linux'):
-                self.player.set_xwindow(self.video_frame.winId())
-            elif sys.platform == "win32":
-                self.player.set_hwnd(self.video_frame.winId())
-            elif sys.platform == "darwin":
-                self.player.set_nsobject(int(self.video_frame.winId()))
-            # Play new stream
-            media = self.vlc_instance.media_new(channel.url)
-            self.player.set_media(media)
-            self.player.play()
+            TELEMETRY.count('channel_plays')
+        if channel and self.mosaic is not None:
+            # In the mosaic the chosen channel replaces the focused tile
+            self.mosaic.replace_focused(channel)
+            self.settings.set_last_channel(channel.url)
+            self.update_favorite_button()
+        elif channel:
+            self.current_channel = channel
+            self.update_now_playing()
+            self.ensure_playback()
+            # Swaps in a pre-buffered player when the channel was already warmed up
+            self.player = self.zapper.play(channel.url, self.caching_policy.media_options(channel.url))
+            self.video_frame = self.zapper.active.frame
+            self.set_boost(self.boost_slider.value())
+            self.prewarm_timer.start()
             self.settings.set_last_channel(channel.url)
             self.settings.sanitize()
             self.update_favorite_button()
 
+    def ensure_playback(self):
+        """Start VLC and the player engine on first use."""
+        if self.zapper is not None:
+            return
+        with PROFILE.phase('vlc instance'):
+            import vlc
+            if self.hardware_thread is not None and self.hardware_thread.is_alive():
+                # The acceleration mode is part of the instance options, but blocking
+                # the first play on detection only pays off if it can change the mode
+                if set(HW_ACCEL_BY_VENDOR.values()) | {HW_ACCEL_FALLBACK} != {self.hardware_accel_mode}:
+                    self.hardware_thread.join(2.0)
+            # Optimize VLC cache to reduce freezing (network/file cache in ms)
+            self.vlc_instance = vlc.Instance(
+                f'--avcodec-hw={self.hardware_accel_mode}',
+                '--network-caching=2000',   # 2 seconds network cache (channels get their own value from CachingPolicy)
+                '--file-caching=2000'       # 2 seconds file cache
+            )
+            self.player = self.vlc_instance.media_player_new()
+            self.zapper = ZapEngine(
+                self.vlc_instance,
+                self.video_stack,
+                self.create_video_frame,
+                self.player,
+                max_prewarmed=self.settings.get_prewarm_neighbors(),
+                max_bandwidth_kbps=self.settings.get_prewarm_max_kbps(),
+                media_options=self.caching_policy.media_options,
+                metrics=self.playback_metrics,
+                resolve_url=self.hls.resolve
+            )
+            self.video_frame = self.zapper.active.frame
+            self.player.audio_set_volume(self.volume_slider.value())
+
+    def toggle_mosaic(self):
+        if self.mosaic is not None:
+            self.close_mosaic()
+        else:
+            self.open_mosaic()
+
+    def open_mosaic(self):
+        """Play the selected channel and the ones after it in a grid."""
+        row = max(0, self.channel_list.currentIndex().row())
+        count = self.settings.get_mosaic_tiles()
+        channels = [self.channel_model.channel_at(i) for i in range(row, row + count)]
+        channels = [channel for channel in channels if channel]
+        if len(channels) < 2:
+            self.status.setText("Select a channel with at least one more after it for the mosaic view.")
+            return
+        self.ensure_playback()
+        self.prewarm_timer.stop()
+        self.zapper.stop_prewarming()
+        self.zapper.active.player.stop()
+        self.zapper.active.url = None
+        self.mosaic = MosaicView(
+            self.vlc_instance,
+            self.create_video_frame,
+            channels,
+            max_decodes=self.settings.get_mosaic_max_decodes(),
+            media_options=self.caching_policy.media_options,
+            metrics=self.playback_metrics,
+            resolve_url=self.hls.resolve
+        )
+        self.mosaic.focus_changed.connect(self.on_mosaic_focus_changed)
+        self.video_stack.addWidget(self.mosaic)
+        self.video_stack.setCurrentWidget(self.mosaic)
+        self.on_mosaic_focus_changed(channels[0])
+
+    def close_mosaic(self):
+        """Leave the mosaic and keep playing its focused channel full screen."""
+        channel = self.mosaic.focused_tile.channel
+        self.mosaic.release()
+        self.video_stack.removeWidget(self.mosaic)
+        self.mosaic.deleteLater()
+        self.mosaic = None
+        self.player = self.zapper.play(channel.url, self.caching_policy.media_options(channel.url))
+        self.video_frame = self.zapper.active.frame
+        self.video_stack.setCurrentWidget(self.video_frame)
+        self.set_boost(self.boost_slider.value())
+        self.prewarm_timer.start()
+
+    def on_mosaic_focus_changed(self, channel):
+        # Volume, boost and play/pause act on the audible tile
+        self.player = self.mosaic.focused_tile.player
+        self.set_boost(self.boost_slider.value())
+        self.current_channel = channel
+        self.update_now_playing()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            PROFILE.mark('first paint')
+            # Everything slow starts only once the window is visible
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        if USER_HW_ACCEL_MODE == 'auto':
+            self.hardware_thread = threading.Thread(target=self.detect_hardware, name='gpu-probe', daemon=True)
+            self.hardware_thread.start()
+        else:
+            self.hardware_accel_mode = USER_HW_ACCEL_MODE
+            self.gpu_info_str = f"GPU detection bypassed (manual override)\nHardware Acceleration: {self.hardware_accel_mode}"
+            print(f"[INFO] {self.gpu_info_str.replace(chr(10), ' | ')}")
+            self.hardware_detected.emit()
+        with PROFILE.phase('start playlist load'):
+            self.load_playlist(self.settings.get_playlist_sources() or [DEFAULT_PLAYLIST])
+        minutes = self.settings.get_refresh_minutes()
+        if minutes:
+            self.refresh_timer.start(minutes * 60000)
+        self.loop_monitor.start()
+        port = self.settings.get_metrics_port()
+        if port:
+            try:
+                self.metrics_server = MetricsServer(TELEMETRY, port, profiler=self.profiler, profile_toggle=self.profile_requested.emit)
+                print(f"[INFO] Metrics at http://127.0.0.1:{self.metrics_server.port}/metrics")
+            except OSError as e:
+                print(f"[WARN] Metrics endpoint not started on port {port}: {e}")
+
+    def toggle_profiler(self):
+        path = self.profiler.toggle()
+        if path is None:
+            self.status.setText("Profiling... press Ctrl+P again to stop.")
+        else:
+            self.status.setText(f"Profile saved to {path}")
+            print(self.profiler.last_report)
+
+    def detect_hardware(self):
+        with PROFILE.phase('gpu probe'):
+            vendor = detect_gpu_vendor()
+        self.hardware_accel_mode = HW_ACCEL_BY_VENDOR.get(vendor, HW_ACCEL_FALLBACK)
+        self.gpu_info_str = f"GPU detected: {vendor if vendor else 'unknown'}\nHardware Acceleration: {self.hardware_accel_mode}"
+        print(f"[INFO] {self.gpu_info_str.replace(chr(10), ' | ')}")
+        # Runs on a worker thread: the popup is shown by the UI thread
+        self.hardware_detected.emit()
+
+    def show_gpu_popup(self):
+        # Show popup with GPU info for 5 seconds (non-blocking)
+        self.gpu_popup = QMessageBox(self)
+        self.gpu_popup.setWindowTitle("Hardware Info")
+        self.gpu_popup.setText(self.gpu_info_str)
+        self.gpu_popup.setStandardButtons(QMessageBox.Close)
+        self.gpu_popup.setStyleSheet("QLabel{min-width:300px; font-size:15px;} QMessageBox{background:#23272e; color:#fff;}")
+        self.gpu_popup.show()
+        QTimer.singleShot(5000, self.gpu_popup.close)
+
+    def update_now_playing(self):
+        channel = self.current_channel
+        if channel is None:
+            return
+        text = f"Now Playing: {channel.title} [{channel.country}]"
+        current, upcoming = self.epg.now_next(channel.tvg_id)
+
+        def clock(seconds):
+            return time.strftime('%H:%M', time.localtime(seconds))
+
+        if current is not None:
+            text += f"  —  {current.title} ({clock(current.start)}–{clock(current.stop)})"
+        if upcoming is not None:
+            text += f"  ·  Next: {upcoming.title} at {clock(upcoming.start)}"
+        self.now_playing.setText(text)
+
     def set_volume(self, value):
+        self.settings.set_volume(value)
+        self.settings.sanitize()
         if hasattr(self, 'player'):
             self.player.audio_set_volume(value)
-            self.settings.set_volume(value)
-            self.settings.sanitize()
             # Also apply current boost
             self.set_boost(self.boost_slider.value() if hasattr(self, 'boost_slider') else 100)
 
@@ -519,6 +876,25 @@ class EnhancedTVApp(QMainWindow):
         set_theme(QApplication.instance(), self.current_theme)
         print(f"Theme toggled to {self.current_theme}")
 
+    def toggle_debug_overlay(self):
+        if not self.debug_overlay.isHidden():
+            self.debug_timer.stop()
+            self.debug_overlay.hide()
+        else:
+            self.update_debug_overlay()
+            self.debug_overlay.show()
+            self.debug_timer.start()
+
+    def update_debug_overlay(self):
+        if self.mosaic is not None:
+            self.debug_overlay.setText(self.mosaic.describe())
+            return
+        url = self.zapper.active.url if self.zapper is not None else None
+        if not url:
+            self.debug_overlay.setText("No channel playing.")
+            return
+        self.debug_overlay.setText(f"{self.playback_metrics.describe(url)}\n{self.hls.describe(url)}")
+
     def show_shortcuts_popup(self):
         shortcuts = [
             ("Space", "Play/Pause"),
@@ -527,6 +903,10 @@ class EnhancedTVApp(QMainWindow):
             ("Left", "Previous Channel"),
             ("Right", "Next Channel"),
             ("Ctrl+T", "Toggle Theme"),
+            ("Ctrl+D", "Playback Statistics"),
+            ("Ctrl+M", "Mosaic View"),
+            ("Ctrl+P", "Start/Stop Profiler"),
+            ("Esc", "Cancel Playlist Loading"),
         ]
         msg = "Keyboard Shortcuts:\n\n" + "\n".join(f"{k}: {v}" for k, v in shortcuts)
         QMessageBox.information(self, "Keyboard Shortcuts", msg)
@@ -539,14 +919,18 @@ class EnhancedTVApp(QMainWindow):
             ("Left", "Previous Channel"),
             ("Right", "Next Channel"),
             ("Ctrl+T", "Toggle Theme"),
+            ("Ctrl+D", "Playback Statistics"),
+            ("Ctrl+M", "Mosaic View"),
+            ("Ctrl+P", "Start/Stop Profiler"),
+            ("Esc", "Cancel Playlist Loading"),
         ]
         return "<b>Keyboard Shortcuts:</b><br>" + "<br>".join(f"<b>{k}</b>: {v}" for k, v in shortcuts)
 
     def toggle_favorite(self):
-        item = self.channel_list.currentItem()
-        if not item:
+        index = self.channel_list.currentIndex()
+        if not index.isValid():
             return
-        channel = item.data(Qt.UserRole)
+        channel = index.data(Qt.UserRole)
         if not channel:
             return
         url = channel.url
@@ -557,11 +941,11 @@ class EnhancedTVApp(QMainWindow):
         self.update_favorite_button()
 
     def update_favorite_button(self):
-        item = self.channel_list.currentItem()
-        if not item:
+        index = self.channel_list.currentIndex()
+        if not index.isValid():
             self.favorite_button.setText("☆ Favorite")
             return
-        channel = item.data(Qt.UserRole)
+        channel = index.data(Qt.UserRole)
         if not channel:
             self.favorite_button.setText("☆ Favorite")
             return
@@ -571,6 +955,31 @@ class EnhancedTVApp(QMainWindow):
         else:
             self.favorite_button.setText("☆ Favorite")
 
+    def closeEvent(self, event):
+        # Nothing may schedule more background work once the pools below are shut down
+        for timer in (self.probe_timer, self.logo_timer, self.prewarm_timer, self.repaint_timer, self.epg_timer, self.debug_timer, self.hls_timer, self.refresh_timer):
+            timer.stop()
+        self.cancel_loading()
+        if self.epg_loader is not None:
+            self.epg_loader.cancel()
+        self.prober.shutdown()
+        self.logo_cache.shutdown()
+        self.hls.shutdown()
+        self.loop_monitor.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        if self.mosaic is not None:
+            self.mosaic.release()
+        if self.zapper is not None:
+            self.zapper.release()
+        self.playback_metrics.save()
+        self.caching_policy.save()
+        self.settings.flush()
+        for thread in list(self.worker_threads.values()):
+            thread.quit()
+            thread.wait(3000)
+        super().closeEvent(event)
+
     # --- Keyboard shortcut stubs ---
     def toggle_play_pause(self):
         if hasattr(self, 'player'):
@@ -580,34 +989,31 @@ class EnhancedTVApp(QMainWindow):
                 self.player.play()
 
     def volume_up(self):
-        if hasattr(self, 'player'):
-            current = self.volume_slider.value()
-            new_value = min(current + 10, 100)
-            self.volume_slider.setValue(new_value)
-            self.player.audio_set_volume(new_value)
-            self.settings.set_volume(new_value)
-            self.settings.sanitize()
+        # set_volume (via valueChanged) applies the new value to the player and the settings
+        current = self.volume_slider.value()
+        self.volume_slider.setValue(min(current + 10, 100))
 
     def volume_down(self):
-        if hasattr(self, 'player'):
-            current = self.volume_slider.value()
-            new_value = max(current - 10, 0)
-            self.volume_slider.setValue(new_value)
-            self.player.audio_set_volume(new_value)
-            self.settings.set_volume(new_value)
-            self.settings.sanitize()
+        current = self.volume_slider.value()
+        self.volume_slider.setValue(max(current - 10, 0))
 
     def prev_channel(self):
-        current_row = self.channel_list.currentRow()
+        if self.mosaic is not None:
+            self.mosaic.focus_previous()
+            return
+        current_row = self.channel_list.currentIndex().row()
         if current_row > 0:
-            self.channel_list.setCurrentRow(current_row - 1)
-            self.play_channel(self.channel_list.currentItem())
+            self.channel_list.setCurrentIndex(self.channel_model.index(current_row - 1))
+            self.play_channel(self.channel_list.currentIndex())
 
     def next_channel(self):
-        current_row = self.channel_list.currentRow()
-        if current_row < self.channel_list.count() - 1:
-            self.channel_list.setCurrentRow(current_row + 1)
-            self.play_channel(self.channel_list.currentItem())
+        if self.mosaic is not None:
+            self.mosaic.focus_next()
+            return
+        current_row = self.channel_list.currentIndex().row()
+        if current_row < self.channel_model.rowCount() - 1:
+            self.channel_list.setCurrentIndex(self.channel_model.index(current_row + 1))
+            self.play_channel(self.channel_list.currentIndex())
 
 if __name__ == "__main__":
     import traceback
@@ -619,11 +1025,17 @@ if __name__ == "__main__":
         sys.stdout.flush()
         sys.stderr.flush()
     sys.excepthook = excepthook
+    if '--startup-profile' in sys.argv:
+        sys.argv.remove('--startup-profile')
+        PROFILE.enabled = True
     print("Launching Enhanced TV App...")
     sys.stdout.flush()
-    app = QApplication(sys.argv)
-    win = EnhancedTVApp()
-    win.show()
+    with PROFILE.phase('create QApplication'):
+        app = QApplication(sys.argv)
+    with PROFILE.phase('create window'):
+        win = EnhancedTVApp()
+    with PROFILE.phase('show window'):
+        win.show()
     print("App window should now be visible (if no error above).")
     sys.stdout.flush()
     sys.exit(app.exec_())
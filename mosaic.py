@@ -0,0 +1,285 @@
+"""
+mosaic.py - Multi-channel mosaic view for Enhanced TV App
+Plays several channels side by side in a grid of players created from the
+shared VLC instance. Only the focused tile is audible. A decode governor
+watches the CPU load of the process and, while it is too high, reopens the
+other tiles at a lower resolution, then keyframes only, then pauses them;
+when the load drops it restores them one step at a time.
+"""
+
+import os
+import time
+
+from PyQt5.QtCore import QEvent, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QFrame, QGridLayout, QLabel, QVBoxLayout, QWidget
+
+from zapping import bind_video_output
+
+# Extra media options per decode level; a tile at PAUSED does not decode at all
+LEVEL_OPTIONS = (
+    (),
+    (':adaptive-maxwidth=960', ':adaptive-maxheight=540', ':avcodec-skiploopfilter=4'),
+    (':adaptive-maxwidth=640', ':adaptive-maxheight=360', ':avcodec-skiploopfilter=4', ':avcodec-skip-frame=3'),
+)
+PAUSED = len(LEVEL_OPTIONS)
+LEVEL_NAMES = ('full', 'reduced', 'keyframes', 'paused')
+
+
+class CpuMeter:
+    """
+    Share of the machine's CPU time used by this process since the last
+    sample (0 = idle, 1 = every core busy), smoothed over a few samples.
+    VLC decodes on threads of this process, so their work is included.
+    """
+    def __init__(self, smoothing=0.5):
+        self.smoothing = smoothing
+        self.cores = os.cpu_count() or 1
+        self.load = None
+        self.last_cpu = time.process_time()
+        self.last_wall = time.perf_counter()
+
+    def sample(self):
+        cpu, wall = time.process_time(), time.perf_counter()
+        elapsed = wall - self.last_wall
+        if elapsed <= 0:
+            return self.load or 0.0
+        current = (cpu - self.last_cpu) / (elapsed * self.cores)
+        self.last_cpu, self.last_wall = cpu, wall
+        self.load = current if self.load is None else self.smoothing * current + (1 - self.smoothing) * self.load
+        return self.load
+
+
+class DecodeGovernor:
+    """
+    Decides the decode level of every tile. At most max_decodes tiles decode
+    at once and the focused tile always decodes at full quality. Above high
+    load one other tile is lowered a level, the last one in the grid first;
+    below low load the most degraded one is raised, the first one in the grid
+    first. After each change the next settle_ticks samples are ignored, since
+    reopening a stream briefly costs extra CPU by itself.
+    """
+    def __init__(self, max_decodes=4, high=0.75, low=0.45, settle_ticks=2, meter=None):
+        self.max_decodes = max(1, max_decodes)
+        self.high = high
+        self.low = low
+        self.settle_ticks = settle_ticks
+        self.meter = meter or CpuMeter()
+        self.cooldown = settle_ticks
+        self.load = 0.0
+
+    def initial_levels(self, count, focused):
+        """Full quality for the focused tile, reduced for the others that fit under max_decodes, paused for the rest."""
+        levels = []
+        decoding = 1
+        for i in range(count):
+            if i == focused:
+                levels.append(0)
+            elif decoding < self.max_decodes:
+                levels.append(1)
+                decoding += 1
+            else:
+                levels.append(PAUSED)
+        return levels
+
+    def refocus(self, levels, focused):
+        """Return levels with the newly focused tile at full quality, pausing another tile if that exceeds max_decodes."""
+        levels = list(levels)
+        if levels[focused] == PAUSED and sum(level < PAUSED for level in levels) >= self.max_decodes:
+            victim = max((i for i, level in enumerate(levels) if i != focused and level < PAUSED), default=None)
+            if victim is not None:
+                levels[victim] = PAUSED
+        levels[focused] = 0
+        self.cooldown = self.settle_ticks
+        return levels
+
+    def adjust(self, levels, focused):
+        """Sample the load and return (tile index, new level) for one tile to change, or None."""
+        self.load = self.meter.sample()
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return None
+        change = None
+        if self.load > self.high:
+            # Lower the most expensive other tile, the last one in the grid first
+            candidates = [i for i, level in enumerate(levels) if i != focused and level < PAUSED]
+            if candidates:
+                tile = min(reversed(candidates), key=lambda i: levels[i])
+                change = (tile, levels[tile] + 1)
+        elif self.load < self.low:
+            decoding = sum(level < PAUSED for level in levels)
+            candidates = [
+                i for i, level in enumerate(levels)
+                if level > 0 and (level < PAUSED or decoding < self.max_decodes)
+            ]
+            if candidates:
+                # Raise the most degraded tile, the first one in the grid first
+                tile = max(candidates, key=lambda i: levels[i])
+                change = (tile, levels[tile] - 1)
+        if change is not None:
+            self.cooldown = self.settle_ticks
+        return change
+
+
+class MosaicTile:
+    """One grid cell: a player, the frame it renders into and the channel it shows."""
+    def __init__(self, player, frame, container, caption):
+        self.player = player
+        self.frame = frame
+        self.container = container
+        self.caption = caption
+        self.channel = None
+        self.level = PAUSED
+
+
+class MosaicView(QWidget):
+    """
+    Grid of up to len(channels) players sharing vlc_instance. Clicking a tile
+    (or focus_next / focus_previous) moves the focus, and with it the audio;
+    focus_changed(channel) is emitted afterwards. media_options(url) supplies
+    the per-channel options, e.g. CachingPolicy.media_options, and
+    resolve_url(url) the URL to open at full quality, e.g.
+    HlsResolver.resolve. Degraded tiles open the channel URL itself, so the
+    adaptive size limits can pick among all of a master's renditions; they
+    are kept out of the playback metrics and the caching policy, whose
+    history should only describe streams watched at full quality. The
+    governor is consulted every interval ms.
+    """
+    focus_changed = pyqtSignal(object)
+
+    def __init__(self, vlc_instance, frame_factory, channels, max_decodes=4, media_options=None,
+                 metrics=None, resolve_url=None, interval=2000, parent=None):
+        super().__init__(parent)
+        self.vlc_instance = vlc_instance
+        self.media_options = media_options or (lambda url: ())
+        self.resolve_url = resolve_url or (lambda url: url)
+        self.metrics = metrics
+        self.governor = DecodeGovernor(max_decodes)
+        self.tiles = []
+        self.focused = 0
+        grid = QGridLayout(self)
+        grid.setContentsMargins(0, 0, 0, 0)
+        grid.setSpacing(4)
+        columns = max(1, int(len(channels) ** 0.5 + 0.999))
+        for i, channel in enumerate(channels):
+            tile = self._new_tile(frame_factory)
+            tile.channel = channel
+            grid.addWidget(tile.container, i // columns, i % columns)
+            self.tiles.append(tile)
+        for tile, level in zip(self.tiles, self.governor.initial_levels(len(self.tiles), self.focused)):
+            self._set_level(tile, level)
+        self._update_focus_style()
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.govern)
+        self.timer.start()
+
+    def _new_tile(self, frame_factory):
+        container = QFrame()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+        frame = frame_factory()
+        caption = QLabel()
+        caption.setStyleSheet("color: #fff; font-size: 12px;")
+        layout.addWidget(frame, 1)
+        layout.addWidget(caption)
+        player = self.vlc_instance.media_player_new()
+        bind_video_output(player, frame)
+        # Leave mouse clicks to Qt so tiles can be focused
+        player.video_set_mouse_input(False)
+        player.video_set_key_input(False)
+        if self.metrics is not None:
+            self.metrics.watch(player)
+        container.installEventFilter(self)
+        frame.installEventFilter(self)
+        return MosaicTile(player, frame, container, caption)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.MouseButtonPress:
+            for i, tile in enumerate(self.tiles):
+                if obj is tile.container or obj is tile.frame:
+                    self.set_focus(i)
+                    break
+        return super().eventFilter(obj, event)
+
+    def _set_level(self, tile, level):
+        tile.level = level
+        tile.player.stop()
+        if self.metrics is not None and level > 0:
+            self.metrics.forget(tile.player)
+        if level < PAUSED:
+            url = tile.channel.url
+            if level == 0:
+                media = self.vlc_instance.media_new(self.resolve_url(url), *self.media_options(url))
+            else:
+                # A pinned variant would leave :adaptive-maxwidth/maxheight nothing to choose from
+                media = self.vlc_instance.media_new(url, *LEVEL_OPTIONS[level])
+            tile.player.set_media(media)
+            tile.player.audio_set_mute(tile is not self.tiles[self.focused])
+            if self.metrics is not None and level == 0:
+                self.metrics.start(tile.player, url)
+            tile.player.play()
+        tile.caption.setText(f"{tile.channel.title}  ·  {LEVEL_NAMES[level]}")
+
+    def _apply(self, levels):
+        for tile, level in zip(self.tiles, levels):
+            if tile.level != level:
+                self._set_level(tile, level)
+
+    def _update_focus_style(self):
+        for i, tile in enumerate(self.tiles):
+            color = '#0078d4' if i == self.focused else '#23252a'
+            tile.container.setStyleSheet(f"QFrame {{ border: 2px solid {color}; border-radius: 8px; }}")
+            if tile.level < PAUSED:
+                tile.player.audio_set_mute(i != self.focused)
+
+    def govern(self):
+        change = self.governor.adjust([tile.level for tile in self.tiles], self.focused)
+        if change is not None:
+            tile, level = change
+            self._set_level(self.tiles[tile], level)
+
+    @property
+    def focused_tile(self):
+        return self.tiles[self.focused] if self.tiles else None
+
+    def set_focus(self, index):
+        if not self.tiles or index == self.focused or not 0 <= index < len(self.tiles):
+            return
+        self.focused = index
+        self._apply(self.governor.refocus([tile.level for tile in self.tiles], index))
+        self._update_focus_style()
+        self.focus_changed.emit(self.tiles[index].channel)
+
+    def focus_next(self):
+        if self.tiles:
+            self.set_focus((self.focused + 1) % len(self.tiles))
+
+    def focus_previous(self):
+        if self.tiles:
+            self.set_focus((self.focused - 1) % len(self.tiles))
+
+    def replace_focused(self, channel):
+        """Show channel in the focused tile instead of its current one."""
+        tile = self.focused_tile
+        if tile is None:
+            return
+        tile.channel = channel
+        self._set_level(tile, 0)
+        self.focus_changed.emit(channel)
+
+    def describe(self):
+        """Text for the debug overlay: load and the decode level of every tile."""
+        lines = [f"Mosaic CPU load: {self.governor.load * 100:.0f}% of {self.governor.meter.cores} cores, "
+                 f"max {self.governor.max_decodes} decodes"]
+        for i, tile in enumerate(self.tiles):
+            marker = '▶ ' if i == self.focused else '  '
+            lines.append(f"{marker}{tile.channel.title}: {LEVEL_NAMES[tile.level]}")
+        return '\n'.join(lines)
+
+    def release(self):
+        self.timer.stop()
+        for tile in self.tiles:
+            tile.player.stop()
+            tile.player.release()
+        self.tiles = []
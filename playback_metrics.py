@@ -0,0 +1,226 @@
+"""
+playback_metrics.py - Zap latency and stall statistics for Enhanced TV App
+Listens to VLC player events and keeps, per channel URL, a time-to-first-frame
+histogram plus buffering and error counts. The numbers are persisted between
+sessions so caching can be tuned and channels ranked by reliability.
+"""
+
+import os
+import json
+import time
+import threading
+
+# Upper bounds (seconds) of the time-to-first-frame histogram buckets; one extra overflow bucket follows
+TTFF_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+
+def empty_stats():
+    return {
+        'plays': 0,
+        'ttff_histogram': [0] * (len(TTFF_BUCKETS) + 1),
+        'ttff_total': 0.0,
+        'ttff_count': 0,
+        'ttff_last': None,
+        'buffering_episodes': 0,
+        'buffering_seconds': 0.0,
+        'errors': 0,
+        'prewarms': 0,
+        'prewarm_zaps': 0,
+    }
+
+
+class PlaybackMetrics:
+    """
+    Per-channel playback statistics fed by VLC events. Call watch() once per
+    player and start() whenever a player begins a new stream; VLC delivers
+    events on its own threads, so all updates go through a lock. Hidden
+    pre-buffers are begun with prewarm() instead: they are not plays and
+    their stalls and errors are not counted until promote() makes them the
+    watched stream.
+    """
+    def __init__(self, metrics_file='playback_metrics.json'):
+        self.metrics_file = metrics_file
+        self.channels = {}
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.metrics_file):
+            try:
+                with open(self.metrics_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self.channels = data
+            except Exception:
+                self.channels = {}
+        self.sanitize()
+
+    def sanitize(self):
+        # Drop entries that do not have the expected shape
+        template = empty_stats()
+        clean = {}
+        for url, stats in self.channels.items():
+            if not isinstance(url, str) or not isinstance(stats, dict):
+                continue
+            merged = empty_stats()
+            merged.update({k: v for k, v in stats.items() if k in template})
+            if not isinstance(merged['ttff_histogram'], list) or len(merged['ttff_histogram']) != len(template['ttff_histogram']):
+                merged['ttff_histogram'] = list(template['ttff_histogram'])
+            clean[url] = merged
+        self.channels = clean
+
+    def save(self):
+        if not self.dirty:
+            return
+        with self.lock:
+            data = json.loads(json.dumps(self.channels))
+            self.dirty = False
+        tmp_file = self.metrics_file + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.metrics_file)
+        except Exception:
+            pass
+
+    def _stats(self, url):
+        stats = self.channels.get(url)
+        if stats is None:
+            stats = self.channels[url] = empty_stats()
+        return stats
+
+    def watch(self, player):
+        """Attach to the events of a VLC media player."""
+        import vlc
+        key = id(player)
+        events = player.event_manager()
+        events.event_attach(vlc.EventType.MediaPlayerVout, self._on_vout, key)
+        events.event_attach(vlc.EventType.MediaPlayerBuffering, self._on_buffering, key)
+        events.event_attach(vlc.EventType.MediaPlayerEncounteredError, self._on_error, key)
+
+    def start(self, player, url):
+        """Begin timing a new stream on player."""
+        with self.lock:
+            self.sessions[id(player)] = {'url': url, 'started': time.perf_counter(), 'first_frame': None, 'buffering_since': None, 'prewarm': False}
+            self._stats(url)['plays'] += 1
+            self.dirty = True
+
+    def forget(self, player):
+        """Stop tracking player's stream, e.g. while it only plays a degraded preview."""
+        with self.lock:
+            self.sessions.pop(id(player), None)
+
+    def prewarm(self, player, url):
+        """Begin a hidden pre-buffer of url on player; it only becomes a play once promoted."""
+        with self.lock:
+            self.sessions[id(player)] = {'url': url, 'started': time.perf_counter(), 'first_frame': None, 'buffering_since': None, 'prewarm': True}
+            self._stats(url)['prewarms'] += 1
+            self.dirty = True
+
+    def promote(self, player, started):
+        """
+        The pre-buffer on player became the watched stream in a zap requested
+        at started (a time.perf_counter() value). The zap latency is recorded
+        now if the first frame was already decoded, else when it arrives.
+        """
+        now = time.perf_counter()
+        with self.lock:
+            session = self.sessions.get(id(player))
+            if session is None or not session['prewarm']:
+                return
+            session['prewarm'] = False
+            session['started'] = started
+            session['buffering_since'] = None
+            stats = self._stats(session['url'])
+            stats['plays'] += 1
+            stats['prewarm_zaps'] += 1
+            if session['first_frame'] is not None:
+                session['first_frame'] = now
+                self._record_ttff(stats, now - started)
+            self.dirty = True
+
+    def _record_ttff(self, stats, ttff):
+        bucket = next((i for i, bound in enumerate(TTFF_BUCKETS) if ttff <= bound), len(TTFF_BUCKETS))
+        stats['ttff_histogram'][bucket] += 1
+        stats['ttff_total'] += ttff
+        stats['ttff_count'] += 1
+        stats['ttff_last'] = ttff
+
+    def _on_vout(self, event, key):
+        if event.u.new_count <= 0:
+            return
+        now = time.perf_counter()
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None or session['first_frame'] is not None:
+                return
+            session['first_frame'] = now
+            if session['prewarm']:
+                # Nobody is watching yet; promote() records the zap
+                return
+            self._record_ttff(self._stats(session['url']), now - session['started'])
+            self.dirty = True
+
+    def _on_buffering(self, event, key):
+        now = time.perf_counter()
+        with self.lock:
+            session = self.sessions.get(key)
+            # Initial buffering is part of the startup time; only stalls after the first frame of a watched stream count
+            if session is None or session['prewarm'] or session['first_frame'] is None:
+                return
+            if event.u.new_cache < 100.0:
+                if session['buffering_since'] is None:
+                    session['buffering_since'] = now
+            elif session['buffering_since'] is not None:
+                stats = self._stats(session['url'])
+                stats['buffering_episodes'] += 1
+                stats['buffering_seconds'] += now - session['buffering_since']
+                session['buffering_since'] = None
+                self.dirty = True
+
+    def _on_error(self, event, key):
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None or session['prewarm']:
+                return
+            self._stats(session['url'])['errors'] += 1
+            self.dirty = True
+
+    def get(self, url):
+        """Return a copy of the statistics of url, with ttff_average added."""
+        with self.lock:
+            stats = dict(self.channels.get(url) or empty_stats())
+        stats['ttff_histogram'] = list(stats['ttff_histogram'])
+        stats['ttff_average'] = stats['ttff_total'] / stats['ttff_count'] if stats['ttff_count'] else None
+        return stats
+
+    def summary(self):
+        with self.lock:
+            urls = list(self.channels)
+        return {url: self.get(url) for url in urls}
+
+    def reliability(self, url):
+        """Score in [0, 1]: the share of plays that had no stall or error."""
+        stats = self.get(url)
+        if not stats['plays']:
+            return None
+        problems = stats['buffering_episodes'] + stats['errors']
+        return max(0.0, 1.0 - problems / stats['plays'])
+
+    def describe(self, url):
+        """One-paragraph text for the debug overlay."""
+        stats = self.get(url)
+
+        def fmt(seconds):
+            return f"{seconds * 1000:.0f} ms" if seconds is not None else "n/a"
+
+        labels = [f"≤{bound:g}s" for bound in TTFF_BUCKETS] + [f">{TTFF_BUCKETS[-1]:g}s"]
+        histogram = ' '.join(f"{label}:{count}" for label, count in zip(labels, stats['ttff_histogram']) if count)
+        return (
+            f"Plays: {stats['plays']} ({stats['prewarm_zaps']} from {stats['prewarms']} pre-buffers) | "
+            f"First frame: last {fmt(stats['ttff_last'])}, avg {fmt(stats['ttff_average'])}\n"
+            f"Stalls: {stats['buffering_episodes']} ({stats['buffering_seconds']:.1f}s) | Errors: {stats['errors']}\n"
+            f"TTFF histogram: {histogram or 'empty'}"
+        )
@@ -0,0 +1,87 @@
+"""
+playlist_cache.py - On-disk snapshots of parsed playlists for Enhanced TV App
+Lets the app show the last known catalog instantly and only re-parse when the
+playlist source reports new content.
+"""
+
+import os
+import json
+import zlib
+import struct
+import marshal
+import hashlib
+
+SNAPSHOT_MAGIC = b'TVS1'
+
+
+class PlaylistCache:
+    """
+    Stores the parsed channels of each playlist URL in a compact binary file:
+    a small JSON header (source URL, ETag, Last-Modified) followed by the
+    channel columns, marshalled and zlib-compressed.
+    """
+    def __init__(self, cache_dir='playlist_cache'):
+        self.cache_dir = cache_dir
+
+    def _path(self, playlist_url):
+        name = hashlib.sha1(playlist_url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + '.bin')
+
+    def _read_header(self, f):
+        if f.read(4) != SNAPSHOT_MAGIC:
+            return None
+        (header_len,) = struct.unpack('<I', f.read(4))
+        return json.loads(f.read(header_len).decode('utf-8'))
+
+    def get_validators(self, playlist_url):
+        """Return (etag, last_modified) recorded for playlist_url, or (None, None)."""
+        try:
+            with open(self._path(playlist_url), 'rb') as f:
+                header = self._read_header(f)
+        except Exception:
+            header = None
+        if not header or header.get('url') != playlist_url:
+            return None, None
+        return header.get('etag'), header.get('last_modified')
+
+    def conditional_headers(self, playlist_url):
+        etag, last_modified = self.get_validators(playlist_url)
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def load(self, playlist_url):
+        """
+        Return the cached channel rows as (title, url, country, country_name,
+        logo, group, tvg_id) tuples, or None. Snapshots written before tvg_id
+        was stored yield six-item rows.
+        """
+        try:
+            with open(self._path(playlist_url), 'rb') as f:
+                header = self._read_header(f)
+                if not header or header.get('url') != playlist_url:
+                    return None
+                columns = marshal.loads(zlib.decompress(f.read()))
+        except Exception:
+            return None
+        return list(zip(*columns))
+
+    def save(self, playlist_url, rows, etag=None, last_modified=None):
+        header = json.dumps({'url': playlist_url, 'etag': etag, 'last_modified': last_modified}).encode('utf-8')
+        columns = [list(column) for column in zip(*rows)] if rows else [[], [], [], [], [], [], []]
+        payload = zlib.compress(marshal.dumps(columns), 1)
+        path = self._path(playlist_url)
+        tmp_path = path + '.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                f.write(struct.pack('<I', len(header)))
+                f.write(header)
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass
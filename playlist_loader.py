@@ -0,0 +1,101 @@
+"""
+playlist_loader.py - Background playlist loading for Enhanced TV App
+Fetching, parsing and country indexing run on a worker thread; results are
+handed back to the UI thread through Qt signals.
+"""
+
+import time
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from search_index import SearchIndex
+from countries import add_to_country_buckets
+from catalog import ChannelCatalog, diff_catalogs
+from telemetry import TELEMETRY
+
+
+class PlaylistLoader(QObject):
+    """
+    Streams the playlist sources through TVApi on a worker thread. A first load reports
+    each parsed batch; a revalidation collects the new catalog and its country
+    buckets in channels/country_buckets and only reports completion. Given
+    the catalog on screen as base, a revalidation also diffs the new catalog
+    against it (in diff) so only the changes need applying.
+    """
+    batch_ready = pyqtSignal(list)
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool)  # not_modified
+    failed = pyqtSignal(str)
+    done = pyqtSignal()
+
+    def __init__(self, api, sources, revalidate=False, base=None):
+        super().__init__()
+        self.api = api
+        self.sources = sources
+        self.revalidate = revalidate
+        self.base = base
+        self.diff = None
+        self.channels = ChannelCatalog()
+        self.country_buckets = {}
+        self._cancelled = False
+
+    def cancel(self):
+        # Checked between batches; the batch in flight is dropped
+        self._cancelled = True
+
+    def run(self):
+        count = 0
+        start = time.perf_counter()
+        try:
+            for batch in self.api.iter_sources(self.sources, revalidate=self.revalidate):
+                if self._cancelled:
+                    break
+                if self.revalidate:
+                    add_to_country_buckets(self.country_buckets, batch, len(self.channels))
+                    self.channels.extend(batch)
+                else:
+                    self.batch_ready.emit(batch)
+                count += len(batch)
+                self.progress.emit(count)
+            if self._cancelled:
+                return
+            if self.revalidate and self.base is not None and not self.api.not_modified:
+                self.diff = diff_catalogs(self.base, self.channels)
+            # Cancelled and failed loads would skew the timing, so only completed ones are recorded
+            TELEMETRY.observe('playlist_revalidate' if self.revalidate else 'playlist_load', time.perf_counter() - start)
+            self.finished.emit(self.api.not_modified)
+        except Exception as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+        finally:
+            self.done.emit()
+
+
+class SearchIndexBuilder(QObject):
+    """Builds the title search index for a catalog on a worker thread."""
+    ready = pyqtSignal(object)
+    done = pyqtSignal()
+
+    def __init__(self, channels):
+        super().__init__()
+        # Snapshot the titles so the UI thread may keep appending to the catalog
+        self.titles = list(channels.titles)
+        # Tombstones get an empty title, which no search matches
+        for index in channels.removed:
+            self.titles[index] = ''
+
+    def run(self):
+        try:
+            self.ready.emit(SearchIndex(self.titles))
+        finally:
+            self.done.emit()
+
+
+def start_worker(worker):
+    """Move worker onto a new QThread, call its run() there and stop the thread when it is done."""
+    thread = QThread()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.done.connect(thread.quit)
+    thread.start()
+    return thread
@@ -1,16 +1,26 @@
 """
-remember_settings.py - Persistent last channel and volume for Enhanced TV App
+remember_settings.py - Persistent last channel, volume and playlist sources for Enhanced TV App
+Changes are written behind: save() only marks the settings dirty and a single
+flush writes them out flush_delay seconds later, or at exit.
 """
 
 import os
 import json
+import atexit
+import threading
 
 class RememberSettings:
-    def __init__(self, settings_file='user_settings.json'):
+    def __init__(self, settings_file='user_settings.json', flush_delay=1.0):
         self.settings_file = settings_file
-        self.data = {'last_channel': None, 'volume': 100}
+        self.flush_delay = flush_delay
+        self.data = {'last_channel': None, 'volume': 100, 'prewarm_neighbors': 1, 'prewarm_max_kbps': 0, 'mosaic_tiles': 4, 'mosaic_max_decodes': 4, 'refresh_minutes': 30, 'metrics_port': 0, 'playlist_sources': [], 'epg_sources': []}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.flush_timer = None
+        self.write_count = 0  # number of times the settings file was actually written
         self.load()
         self.sanitize()
+        atexit.register(self.flush)
 
     def load(self):
         if os.path.exists(self.settings_file):
@@ -33,19 +43,83 @@ class RememberSettings:
             self.data['volume'] = v
         except Exception:
             self.data['volume'] = 100
+        # Ensure prewarm_neighbors is an int between 0 and 2
+        try:
+            n = int(self.data.get('prewarm_neighbors', 1))
+            self.data['prewarm_neighbors'] = n if 0 <= n <= 2 else 1
+        except Exception:
+            self.data['prewarm_neighbors'] = 1
+        # Ensure prewarm_max_kbps is a non-negative int (0 = no limit)
+        try:
+            self.data['prewarm_max_kbps'] = max(0, int(self.data.get('prewarm_max_kbps', 0)))
+        except Exception:
+            self.data['prewarm_max_kbps'] = 0
+        # Ensure mosaic_tiles is an int between 2 and 9 and mosaic_max_decodes one between 1 and 16
+        try:
+            n = int(self.data.get('mosaic_tiles', 4))
+            self.data['mosaic_tiles'] = n if 2 <= n <= 9 else 4
+        except Exception:
+            self.data['mosaic_tiles'] = 4
+        try:
+            n = int(self.data.get('mosaic_max_decodes', 4))
+            self.data['mosaic_max_decodes'] = n if 1 <= n <= 16 else 4
+        except Exception:
+            self.data['mosaic_max_decodes'] = 4
+        # Ensure refresh_minutes is a non-negative int (0 = no background refresh)
+        try:
+            self.data['refresh_minutes'] = max(0, int(self.data.get('refresh_minutes', 30)))
+        except Exception:
+            self.data['refresh_minutes'] = 30
+        # Ensure metrics_port is a valid TCP port, or 0 for no metrics endpoint
+        try:
+            port = int(self.data.get('metrics_port', 0))
+            self.data['metrics_port'] = port if 0 <= port <= 65535 else 0
+        except Exception:
+            self.data['metrics_port'] = 0
+        # Ensure playlist_sources and epg_sources are lists of distinct non-empty strings (empty playlist_sources = built-in playlist)
+        for key in ('playlist_sources', 'epg_sources'):
+            sources = self.data.get(key)
+            if not isinstance(sources, list):
+                sources = []
+            self.data[key] = list(dict.fromkeys(s.strip() for s in sources if isinstance(s, str) and s.strip()))
 
     def save(self):
+        """Schedule a flush; further changes before it fires are written together."""
+        with self.lock:
+            self.dirty = True
+            if self.flush_timer is None:
+                self.flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+    def flush(self):
+        """Write pending changes to disk now."""
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            if not self.dirty:
+                return
+            data = dict(self.data)
+            self.dirty = False
+        tmp_file = self.settings_file + '.tmp'
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.settings_file)
+            self.write_count += 1
         except Exception:
             pass
 
     def set_last_channel(self, channel_url):
+        if self.data.get('last_channel') == channel_url:
+            return
         self.data['last_channel'] = channel_url
         self.save()
 
     def set_volume(self, volume):
+        if self.data.get('volume') == volume:
+            return
         self.data['volume'] = volume
         self.save()
 
@@ -54,3 +128,37 @@ class RememberSettings:
 
     def get_volume(self):
         return self.data.get('volume', 100)
+
+    def get_prewarm_neighbors(self):
+        return self.data.get('prewarm_neighbors', 1)
+
+    def get_prewarm_max_kbps(self):
+        return self.data.get('prewarm_max_kbps', 0)
+
+    def get_mosaic_tiles(self):
+        return self.data.get('mosaic_tiles', 4)
+
+    def get_mosaic_max_decodes(self):
+        return self.data.get('mosaic_max_decodes', 4)
+
+    def get_refresh_minutes(self):
+        return self.data.get('refresh_minutes', 30)
+
+    def get_metrics_port(self):
+        return self.data.get('metrics_port', 0)
+
+    def get_playlist_sources(self):
+        return list(self.data.get('playlist_sources', []))
+
+    def set_playlist_sources(self, sources):
+        self.data['playlist_sources'] = list(sources)
+        self.sanitize()
+        self.save()
+
+    def get_epg_sources(self):
+        return list(self.data.get('epg_sources', []))
+
+    def set_epg_sources(self, sources):
+        self.data['epg_sources'] = list(sources)
+        self.sanitize()
+        self.save()
@@ -0,0 +1,94 @@
+"""
+search_index.py - Trigram search index over channel titles for Enhanced TV App
+Titles are casefolded and stripped of accents once when the index is built,
+so a search never re-normalizes the whole catalog.
+"""
+
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+
+def normalize(text):
+    """Casefold text and drop accents, so "Télé" and "TELE" both become "tele"."""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    if text.isascii():
+        return text
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+class SearchIndex:
+    """
+    Inverted index from title trigrams to channel indices. Posting lists are
+    kept in ascending order, so results come back in catalog order.
+    """
+    def __init__(self, titles=()):
+        self.titles = []
+        self.postings = {}
+        self._last_query = None
+        self._last_results = None
+        self.add(titles)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def add(self, titles):
+        """Index titles as the next channel indices."""
+        postings = self.postings
+        for title in titles:
+            index = len(self.titles)
+            text = normalize(title)
+            self.titles.append(text)
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(index)
+        self._last_query = None
+        self._last_results = None
+
+    def replace(self, index, title):
+        """Re-index the channel at index under a new title; an empty title takes it out of every result."""
+        old = self.titles[index]
+        text = normalize(title)
+        if text == old:
+            return
+        old_grams = {old[i:i + 3] for i in range(len(old) - 2)}
+        new_grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        for gram in old_grams - new_grams:
+            posting = self.postings[gram]
+            del posting[bisect_left(posting, index)]
+            if not posting:
+                del self.postings[gram]
+        for gram in new_grams - old_grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('I')
+            # Keep the posting list ascending
+            posting.insert(bisect_left(posting, index), index)
+        self.titles[index] = text
+        self._last_query = None
+        self._last_results = None
+
+    def search(self, query):
+        """Return the ascending indices of titles containing query, or None if query is empty."""
+        query = normalize(query.strip())
+        if not query:
+            return None
+        titles = self.titles
+        if self._last_query and self._last_query in query:
+            # The user kept typing: every new hit is already in the previous result set
+            candidates = self._last_results
+        elif len(query) >= 3:
+            grams = {query[i:i + 3] for i in range(len(query) - 2)}
+            posting_lists = [self.postings.get(gram) for gram in grams]
+            if any(posting is None for posting in posting_lists):
+                candidates = ()
+            else:
+                candidates = min(posting_lists, key=len)
+        else:
+            candidates = range(len(titles))
+        results = [i for i in candidates if query in titles[i]]
+        self._last_query = query
+        self._last_results = results
+        return results
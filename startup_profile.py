@@ -0,0 +1,68 @@
+"""
+startup_profile.py - Startup phase timing for Enhanced TV App
+Import this module first: its import time is taken as the start of the
+process. Phases and marks are recorded until startup is finished (it is cheap); the
+breakdown is only printed when the app runs with --startup-profile.
+"""
+
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = False
+        self.entries = []  # (name, start offset, duration or None for a point in time)
+        self.reported = False
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        """Record that name was reached."""
+        if self.reported:
+            return
+        with self.lock:
+            self.entries.append((name, time.perf_counter() - self.origin, None))
+
+    @contextmanager
+    def phase(self, name):
+        """Record how long the with-block took."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if not self.reported:
+                with self.lock:
+                    self.entries.append((name, start - self.origin, end - start))
+
+    def finish(self, name):
+        """Mark the end of startup and print the report."""
+        self.mark(name)
+        self.report()
+
+    def report(self, title="Startup profile", file=None):
+        """Print every mark and phase in start order, once, if profiling is enabled."""
+        if self.reported:
+            return
+        self.reported = True
+        if not self.enabled:
+            return
+        # stdout, like the app's [INFO] lines: on Windows main.py points stderr at nul to silence VLC
+        file = file or sys.stdout
+        if file is None:
+            return
+        with self.lock:
+            entries = sorted(self.entries, key=lambda entry: entry[1])
+        print(f"--- {title} (ms since start) ---", file=file)
+        for name, start, duration in entries:
+            if duration is None:
+                print(f"{start * 1000:9.1f}            {name}", file=file)
+            else:
+                print(f"{start * 1000:9.1f}  +{duration * 1000:8.1f}  {name}", file=file)
+        file.flush()
+
+
+PROFILE = StartupProfile()
@@ -0,0 +1,132 @@
+"""
+stream_health.py - Background stream reachability checks for Enhanced TV App
+Channel URLs are probed concurrently over pooled connections and the results
+are kept in a TTL cache that survives restarts, so dead streams can be marked
+or hidden before anyone tries to play them.
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from http_session import LazySession
+
+
+class StreamHealthCache:
+    """Last probe result per stream URL: reachable flag, latency (seconds) and check time."""
+    def __init__(self, cache_file='stream_health.json', ttl=6 * 60 * 60):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self.entries = data
+            except Exception:
+                self.entries = {}
+        self.sanitize()
+
+    def sanitize(self):
+        # Keep only well-formed entries that have not expired
+        now = time.time()
+        self.entries = {
+            url: entry for url, entry in self.entries.items()
+            if isinstance(url, str) and isinstance(entry, dict)
+            and isinstance(entry.get('checked'), (int, float)) and now - entry['checked'] < self.ttl
+        }
+
+    def save(self):
+        if not self.dirty:
+            return
+        with self.lock:
+            self.sanitize()
+            data = dict(self.entries)
+            self.dirty = False
+        tmp_file = self.cache_file + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception:
+            pass
+
+    def get(self, url):
+        """Return the cached entry for url if it is still fresh, else None."""
+        entry = self.entries.get(url)
+        if entry is None or time.time() - entry['checked'] >= self.ttl:
+            return None
+        return entry
+
+    def is_dead(self, url):
+        entry = self.get(url)
+        return entry is not None and not entry['ok']
+
+    def record(self, url, ok, latency):
+        with self.lock:
+            self.entries[url] = {'ok': ok, 'latency': latency, 'checked': time.time()}
+            self.dirty = True
+
+
+class StreamProber(QObject):
+    """
+    Probes stream URLs on a bounded thread pool sharing one pooled HTTP
+    session. probed(url, ok, latency) is emitted for each finished probe;
+    latency is -1 when the stream did not answer.
+    """
+    probed = pyqtSignal(str, bool, float)
+
+    def __init__(self, cache, max_workers=8, timeout=5.0):
+        super().__init__()
+        self.cache = cache
+        self.timeout = timeout
+        self.session = LazySession(max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stream-probe')
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def probe(self, url):
+        """Return (ok, latency) for url: the time until the first bytes of the stream arrive."""
+        start = time.perf_counter()
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                if response.status_code >= 400:
+                    return False, -1.0
+                next(response.iter_content(1024), b'')
+                return True, time.perf_counter() - start
+        except Exception:
+            return False, -1.0
+
+    def submit(self, urls):
+        """Queue every HTTP(S) url without a fresh cached result for probing."""
+        for url in urls:
+            if not url.startswith(('http://', 'https://')) or self.cache.get(url) is not None:
+                continue
+            with self.lock:
+                if url in self.pending:
+                    continue
+                self.pending.add(url)
+            self.executor.submit(self._run, url)
+
+    def _run(self, url):
+        try:
+            ok, latency = self.probe(url)
+            self.cache.record(url, ok, latency)
+        finally:
+            with self.lock:
+                self.pending.discard(url)
+        self.probed.emit(url, ok, latency)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.save()
@@ -0,0 +1,264 @@
+"""
+telemetry.py - Timing spans, gauges and a local metrics endpoint for Enhanced TV App
+Code wraps interesting operations in TELEMETRY.span(name); each span keeps a
+count, total, maximum and latency histogram. Everything can be read as JSON
+or Prometheus text, optionally served on a localhost-only HTTP port:
+
+    /metrics       Prometheus text format
+    /metrics.json  the same data as JSON
+    /profile       GET: last cProfile report, POST: start or stop profiling
+                   (POST needs an X-Requested-With header, which a web page
+                   cannot send to another origin without a CORS preflight)
+
+Kept free of Qt so headless modules (tv_api.py) can be instrumented too; the
+HTTP server and profiler modules are only imported when they are used.
+"""
+
+import io
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+from startup_profile import PROFILE
+
+# Upper bounds (seconds) of the latency histogram buckets; Prometheus adds +Inf
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Timing:
+    """Count, sum, maximum and bucketed histogram of observed durations."""
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'max_seconds': round(self.max, 6),
+            'average_seconds': round(self.total / self.count, 6) if self.count else None,
+            'buckets': dict(zip((str(bound) for bound in LATENCY_BUCKETS), self.buckets)),
+        }
+
+
+class Telemetry:
+    """
+    Thread-safe registry of timings (span / observe), counters and gauges.
+    Gauges are callables read at export time, so nothing is sampled unless
+    someone asks for the metrics.
+    """
+    def __init__(self, prefix='tvapp'):
+        self.prefix = prefix
+        self.started = time.time()
+        self.timings = {}
+        self.counters = {}
+        self.gauges = {}  # name -> (function, help text)
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self.lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = Timing()
+            timing.observe(seconds)
+
+    @contextmanager
+    def span(self, name):
+        """Time the with-block as one observation of name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, function, help_text=''):
+        """Register function() as the current value of gauge name."""
+        with self.lock:
+            self.gauges[name] = (function, help_text)
+
+    def _gauge_values(self):
+        with self.lock:
+            gauges = dict(self.gauges)
+        values = {
+            'uptime_seconds': time.time() - self.started,
+            'process_cpu_seconds': time.process_time(),
+            'threads': threading.active_count(),
+        }
+        for name, (function, _) in gauges.items():
+            try:
+                values[name] = float(function())
+            except Exception:
+                pass
+        return values
+
+    def snapshot(self):
+        """Everything as one JSON-serializable dict."""
+        with self.lock:
+            timings = {name: timing.as_dict() for name, timing in self.timings.items()}
+            counters = dict(self.counters)
+        return {
+            'timestamp': time.time(),
+            'pid': os.getpid(),
+            'gauges': {name: round(value, 6) for name, value in self._gauge_values().items()},
+            'counters': counters,
+            'timings': timings,
+            'startup': [
+                {'name': name, 'at_seconds': round(start, 6), 'seconds': None if duration is None else round(duration, 6)}
+                for name, start, duration in list(PROFILE.entries)
+            ],
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        prefix = self.prefix
+        lines = []
+        with self.lock:
+            gauges_help = {name: help_text for name, (_, help_text) in self.gauges.items()}
+            timings = {name: (timing.count, timing.total, timing.max, list(timing.buckets)) for name, timing in self.timings.items()}
+            counters = dict(self.counters)
+        for name, value in sorted(self._gauge_values().items()):
+            lines.append(f"# HELP {prefix}_{name} {gauges_help.get(name) or name.replace('_', ' ')}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value:g}")
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value:g}")
+        if timings:
+            lines.append(f"# HELP {prefix}_span_seconds Durations of instrumented operations (and event loop lag)")
+            lines.append(f"# TYPE {prefix}_span_seconds histogram")
+            for name, (count, total, _, buckets) in sorted(timings.items()):
+                cumulative = 0
+                for bound, hits in zip(LATENCY_BUCKETS, buckets):
+                    cumulative += hits
+                    lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="+Inf"}} {count}')
+                lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {total:g}')
+                lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {count}')
+            lines.append(f"# HELP {prefix}_span_max_seconds Longest single run of an instrumented operation")
+            lines.append(f"# TYPE {prefix}_span_max_seconds gauge")
+            for name, (_, _, longest, _) in sorted(timings.items()):
+                lines.append(f'{prefix}_span_max_seconds{{span="{name}"}} {longest:g}')
+        return '\n'.join(lines) + '\n'
+
+
+class ProfilerToggle:
+    """
+    On-demand cProfile of the thread that calls toggle() (the UI thread in
+    the app). Stopping writes the raw stats to profile_dir and keeps a text
+    report of the top entries in last_report.
+    """
+    def __init__(self, profile_dir='profiles', top=40):
+        self.profile_dir = profile_dir
+        self.top = top
+        self.profiler = None
+        self.started = None
+        self.last_report = "No profile recorded yet."
+
+    @property
+    def running(self):
+        return self.profiler is not None
+
+    def toggle(self):
+        """Start profiling, or stop it and return the path of the saved stats."""
+        import cProfile
+        import pstats
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.started = time.time()
+            self.profiler.enable()
+            return None
+        profiler, self.profiler = self.profiler, None
+        profiler.disable()
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, time.strftime('profile-%Y%m%d-%H%M%S.prof'))
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        out.write(f"Profile of {time.time() - self.started:.1f}s saved to {path}\n")
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(self.top)
+        self.last_report = out.getvalue()
+        return path
+
+
+class MetricsServer:
+    """
+    Serves telemetry over HTTP on host:port (localhost only by default) from
+    a daemon thread. profile_toggle, when given, is called for POST /profile
+    requests carrying X-Requested-With; it must hand the toggle over to the
+    thread that should be profiled.
+    """
+    def __init__(self, telemetry, port, host='127.0.0.1', profiler=None, profile_toggle=None):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        self.telemetry = telemetry
+        self.profiler = profiler
+        self.profile_toggle = profile_toggle
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    self.reply(200, server.telemetry.to_prometheus(), 'text/plain; version=0.0.4; charset=utf-8')
+                elif path == '/metrics.json':
+                    self.reply(200, server.telemetry.to_json(), 'application/json')
+                elif path == '/profile' and server.profiler is not None:
+                    state = "running" if server.profiler.running else "stopped"
+                    self.reply(200, f"Profiler {state}.\n\n{server.profiler.last_report}", 'text/plain; charset=utf-8')
+                else:
+                    self.reply(404, "Not found\n", 'text/plain')
+
+            def do_POST(self):
+                if self.path.split('?', 1)[0] == '/profile' and server.profile_toggle is not None:
+                    if not self.headers.get('X-Requested-With'):
+                        self.reply(403, "POST /profile needs an X-Requested-With header.\n", 'text/plain')
+                        return
+                    server.profile_toggle()
+                    self.reply(202, "Profiler toggle requested; GET /profile for the report.\n", 'text/plain')
+                else:
+                    self.reply(404, "Not found\n", 'text/plain')
+
+            def reply(self, status, text, content_type):
+                body = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics-server', daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+TELEMETRY = Telemetry()
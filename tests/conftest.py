@@ -0,0 +1,9 @@
+"""
+conftest.py - Test setup for Enhanced TV App
+The app is a set of flat modules, so the tests import them from the repo root.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
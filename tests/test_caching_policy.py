@@ -0,0 +1,75 @@
+"""
+test_caching_policy.py - Adaptive network caching for Enhanced TV App
+CachingPolicy is driven with synthetic stall traces: each simulated play
+stalls when the chosen cache is below what the stream's jitter needs. The
+policy must settle just above that need without stalling once it has.
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from playback_metrics import PlaybackMetrics
+from caching_policy import CachingPolicy
+
+URL = 'http://streams.example/jittery.m3u8'
+
+
+def play(metrics, player, stall):
+    """One watched play: first frame, then optionally one stall."""
+    metrics.start(player, URL)
+    metrics._on_vout(SimpleNamespace(u=SimpleNamespace(new_count=1)), id(player))
+    if stall:
+        metrics._on_buffering(SimpleNamespace(u=SimpleNamespace(new_cache=5.0)), id(player))
+        metrics._on_buffering(SimpleNamespace(u=SimpleNamespace(new_cache=100.0)), id(player))
+
+
+def simulate(tmp_path, need_ms, plays=200, seed=1):
+    """Return the caching chosen for each play and whether that play stalled."""
+    rng = random.Random(seed)
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    policy = CachingPolicy(metrics, str(tmp_path / 'policy.json'))
+    player = object()
+    trace = []
+    for _ in range(plays):
+        caching = policy.caching_for(URL)
+        stalled = caching < need_ms * rng.uniform(0.8, 1.2)
+        play(metrics, player, stalled)
+        trace.append((caching, stalled))
+    return trace
+
+
+@pytest.mark.parametrize('need_ms', [200, 800, 3000, 7000])
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_settles_just_above_the_needed_buffer(tmp_path, need_ms, seed):
+    trace = simulate(tmp_path, need_ms, seed=seed)
+    settled = sorted(caching for caching, _ in trace[len(trace) // 2:])
+    median = settled[len(settled) // 2]
+    assert min(max(300, need_ms), 10000) <= median <= min(max(300, need_ms * 1.5), 10000), settled
+    assert settled[0] >= min(max(300, need_ms * 0.8), 10000), settled
+    # Shrinking probes the edge now and then; it must not turn into steady rebuffering
+    stalls = sum(stalled for _, stalled in trace[len(trace) // 2:])
+    assert stalls <= len(settled) * 0.12
+
+
+def test_stall_grows_and_clean_streak_shrinks(tmp_path):
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    policy = CachingPolicy(metrics, str(tmp_path / 'policy.json'), default=2000)
+    player = object()
+    assert policy.caching_for(URL) == 2000
+    play(metrics, player, stall=True)
+    assert policy.caching_for(URL) == 3000
+    for expected in (3000, 3000, 2700):
+        play(metrics, player, stall=False)
+        assert policy.caching_for(URL) == expected
+
+
+def test_decisions_survive_a_reload(tmp_path):
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    policy = CachingPolicy(metrics, str(tmp_path / 'policy.json'))
+    play(metrics, object(), stall=True)
+    policy.caching_for(URL)
+    caching = policy.caching_for(URL)
+    policy.save()
+    assert CachingPolicy(metrics, str(tmp_path / 'policy.json')).caching_for(URL) == caching
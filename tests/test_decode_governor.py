@@ -0,0 +1,90 @@
+"""
+test_decode_governor.py - Mosaic decode governor for Enhanced TV App
+DecodeGovernor is run against a scripted CPU load instead of real decoding:
+levels must drop one step per decision while the load is high, come back
+while it is low, and never let more than max_decodes tiles decode.
+"""
+
+from mosaic import DecodeGovernor, PAUSED
+
+
+class ScriptedMeter:
+    """Stands in for CpuMeter: sample() returns the scripted load values in turn."""
+    cores = 4
+
+    def __init__(self, loads):
+        self.loads = list(loads)
+
+    def sample(self):
+        return self.loads.pop(0)
+
+
+def run(governor, levels, focused, ticks):
+    """Apply ticks governor decisions to levels; return the levels after each one."""
+    history = []
+    for _ in range(ticks):
+        change = governor.adjust(levels, focused)
+        if change is not None:
+            tile, level = change
+            levels[tile] = level
+        history.append(list(levels))
+    return history
+
+
+def decoding(levels):
+    return sum(level < PAUSED for level in levels)
+
+
+def test_initial_levels_respect_max_decodes():
+    governor = DecodeGovernor(max_decodes=3, meter=ScriptedMeter([]))
+    assert governor.initial_levels(6, focused=2) == [1, 1, 0, PAUSED, PAUSED, PAUSED]
+    assert DecodeGovernor(max_decodes=1, meter=ScriptedMeter([])).initial_levels(3, 0) == [0, PAUSED, PAUSED]
+
+
+def test_high_load_degrades_other_tiles_and_low_load_restores_them():
+    governor = DecodeGovernor(max_decodes=4, settle_ticks=0, meter=ScriptedMeter([0.95] * 9 + [0.2] * 12))
+    levels = governor.initial_levels(4, focused=0)
+    assert levels == [0, 1, 1, 1]
+    history = run(governor, levels, focused=0, ticks=9)
+    # One step per decision, the last tile in the grid first, the focused tile never
+    assert history[0] == [0, 1, 1, 2]
+    assert history[1] == [0, 1, 2, 2]
+    assert history[4] == [0, 2, 3, 3]
+    assert history[-1] == [0, PAUSED, PAUSED, PAUSED]
+    history = run(governor, levels, focused=0, ticks=12)
+    # The most degraded tile comes back first, the first one in the grid first
+    assert history[0] == [0, 2, PAUSED, PAUSED]
+    assert all(b[0] == 0 for b in history)
+    assert history[-1] == [0, 0, 0, 0]
+
+
+def test_moderate_load_holds_levels():
+    governor = DecodeGovernor(settle_ticks=0, meter=ScriptedMeter([0.6] * 5))
+    levels = [0, 1, 2, PAUSED]
+    assert run(governor, levels, focused=0, ticks=5)[-1] == [0, 1, 2, PAUSED]
+
+
+def test_settle_ticks_skip_samples_after_a_change():
+    governor = DecodeGovernor(settle_ticks=2, meter=ScriptedMeter([0.95] * 7))
+    levels = [0, 1, 1, 1]
+    changes = [governor.adjust(levels, 0) for _ in range(7)]
+    assert [change is not None for change in changes] == [False, False, True, False, False, True, False]
+
+
+def test_low_load_never_exceeds_max_decodes():
+    governor = DecodeGovernor(max_decodes=2, settle_ticks=0, meter=ScriptedMeter([0.1] * 10))
+    levels = governor.initial_levels(5, focused=0)
+    for levels_now in run(governor, levels, focused=0, ticks=10):
+        assert decoding(levels_now) <= 2
+    assert levels == [0, 0, PAUSED, PAUSED, PAUSED]
+
+
+def test_refocus_pauses_another_tile_at_the_limit():
+    governor = DecodeGovernor(max_decodes=3, meter=ScriptedMeter([]))
+    levels = governor.initial_levels(5, focused=0)
+    levels = governor.refocus(levels, focused=4)
+    assert levels[4] == 0
+    assert decoding(levels) == 3
+    # The last decoding tile makes room; the previously focused one keeps its level
+    assert levels == [0, 1, PAUSED, PAUSED, 0]
+    assert governor.cooldown == governor.settle_ticks
@@ -0,0 +1,51 @@
+"""
+test_favorites.py - Favorites journal recovery for Enhanced TV App
+A crash can leave the journal ending in a torn append, possibly in the middle
+of a multi-byte character; only that append may be lost.
+"""
+
+import os
+
+from favorites import FavoritesManager
+
+URLS = [f'http://streams.example/{n}' for n in range(6)]
+
+
+def journalled(tmp_path):
+    favorites_file = str(tmp_path / 'favorites.json')
+    manager = FavoritesManager(favorites_file)
+    for url in URLS:
+        manager.add_favorite(url)
+    assert not os.path.exists(favorites_file)
+    return favorites_file, manager.journal_file
+
+
+def test_torn_multibyte_append_keeps_the_rest(tmp_path):
+    favorites_file, journal_file = journalled(tmp_path)
+    intact_size = os.path.getsize(journal_file)
+    with open(journal_file, 'ab') as f:
+        # A crash after the first byte of "é"
+        f.write('+http://streams.example/télé'.encode('utf-8')[:26])
+    manager = FavoritesManager(favorites_file)
+    assert sorted(manager.get_favorites()) == URLS
+    assert os.path.getsize(journal_file) == intact_size
+    manager.add_favorite('http://streams.example/télé')
+    assert FavoritesManager(favorites_file).is_favorite('http://streams.example/télé')
+
+
+def test_undecodable_line_is_skipped(tmp_path):
+    favorites_file, journal_file = journalled(tmp_path)
+    with open(journal_file, 'ab') as f:
+        f.write(b'+http://streams.example/\xff\xfe\n-' + URLS[0].encode('utf-8') + b'\n')
+    manager = FavoritesManager(favorites_file)
+    assert sorted(manager.get_favorites()) == URLS[1:]
+
+
+def test_recovered_favorites_survive_compaction(tmp_path):
+    favorites_file, journal_file = journalled(tmp_path)
+    with open(journal_file, 'ab') as f:
+        f.write('+http://streams.example/ü'.encode('utf-8')[:-1])
+    manager = FavoritesManager(favorites_file)
+    manager.compact_now()
+    assert not os.path.exists(journal_file)
+    assert sorted(FavoritesManager(favorites_file).get_favorites()) == URLS
@@ -0,0 +1,67 @@
+"""
+test_filter_rows.py - Channel filtering for Enhanced TV App
+TVApi.filter_rows must give the same rows whether or not the search index is
+ready, and never return channels removed by a refresh.
+"""
+
+from tv_api import TVApi
+from catalog import TVChannel, ChannelCatalog, diff_catalogs
+from search_index import SearchIndex
+from playlist_loader import SearchIndexBuilder
+
+
+def make_api():
+    api = TVApi()
+    api.set_channels([
+        TVChannel('Télé Matin', 'http://streams.example/1', 'FR', 'France'),
+        TVChannel('TELE Sport', 'http://streams.example/2', 'FR', 'France'),
+        TVChannel('Straße TV', 'http://streams.example/3', 'DE', 'Germany'),
+        TVChannel('News One', 'http://streams.example/4', 'US', 'United States'),
+    ])
+    return api
+
+
+def test_scan_matches_like_the_index():
+    api = make_api()
+    index = SearchIndex(api.channels.titles)
+    for country in (None, 'FR', 'DE'):
+        for query in ('tele', 'TÉLÉ', 'strasse', ' news '):
+            assert api.filter_rows(country, query) == api.filter_rows(country, query, search_index=index), (country, query)
+    assert api.filter_rows(None, 'tele') == [0, 1]
+    assert api.filter_rows('DE', 'STRASSE') == [2]
+
+
+def test_scan_of_rows_added_after_the_index():
+    api = make_api()
+    index = SearchIndex(api.channels.titles)
+    start = api.add_channels([TVChannel('Téléfoot', 'http://streams.example/5', 'FR', 'France')])
+    assert api.filter_rows(None, 'telefoot', start, index) == [4]
+    assert api.filter_rows('FR', 'tele', start, index) == [4]
+
+
+def remove_first_news_channel():
+    """Two US news channels, the first one dropped by a refresh."""
+    api = TVApi()
+    api.set_channels([
+        TVChannel('News One', 'http://streams.example/1', 'US', 'United States'),
+        TVChannel('News Two', 'http://streams.example/2', 'US', 'United States'),
+    ])
+    refreshed = ChannelCatalog([TVChannel('News Two', 'http://streams.example/2', 'US', 'United States')])
+    api.apply_diff(diff_catalogs(api.channels, refreshed), refreshed)
+    return api
+
+
+def test_tombstones_never_match():
+    api = remove_first_news_channel()
+    # An index over every title, tombstone included, as a rebuild used to make
+    index = SearchIndex(api.channels.titles)
+    for country in (None, 'US'):
+        assert api.filter_rows(country, 'news', 0, index) == [1]
+        assert api.filter_rows(country, 'news') == [1]
+        assert api.filter_rows(country) == [1]
+
+
+def test_index_builder_blanks_tombstones():
+    api = remove_first_news_channel()
+    index = SearchIndex(SearchIndexBuilder(api.channels).titles)
+    assert index.search('news') == [1]
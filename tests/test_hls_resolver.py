@@ -0,0 +1,165 @@
+"""
+test_hls_resolver.py - HLS master playlist pre-resolution for Enhanced TV App
+HlsResolver fetches from a local HTTP server serving a multi-variant master,
+a master with separate audio renditions, a media playlist, padded masters
+around the read cap and an endless MPEG-TS stream.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hls_resolver import HlsResolver, parse_master_playlist
+
+MASTER = (
+    '#EXTM3U\n'
+    '#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720,CODECS="avc1.4d401f,mp4a.40.2"\n'
+    'v/720.m3u8\n'
+    '#EXT-X-STREAM-INF:BANDWIDTH=128000,CODECS="mp4a.40.2"\n'
+    'v/audio.m3u8\n'
+    '#EXT-X-STREAM-INF:BANDWIDTH=6000000,RESOLUTION=1920x1080,CODECS="avc1.640028,mp4a.40.2"\n'
+    'v/1080.m3u8\n'
+    '#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.42c01e,mp4a.40.2"\n'
+    'v/360.m3u8\n'
+)
+SEPARATE_AUDIO = (
+    '#EXTM3U\n'
+    '#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aac",NAME="English",DEFAULT=YES,URI="audio/en.m3u8"\n'
+    '#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720,AUDIO="aac"\n'
+    'video/720.m3u8\n'
+)
+MEDIA = (
+    '#EXTM3U\n'
+    '#EXT-X-TARGETDURATION:6\n'
+    '#EXTINF:6.0,\n'
+    'segment1.ts\n'
+    '#EXTINF:6.0,\n'
+    'segment2.ts\n'
+)
+CAP = 256 * 1024
+
+
+def padded(size):
+    """MASTER grown to size bytes with comment lines."""
+    padding = size - len(MASTER)
+    return MASTER + ('#' + 'x' * 1023 + '\n') * (padding // 1025) + '#' * (padding % 1025)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    BODIES = {
+        '/live/master.m3u8': MASTER,
+        '/live/audio.m3u8': SEPARATE_AUDIO,
+        '/live/media.m3u8': MEDIA,
+        '/live/under-cap.m3u8': padded(CAP - 16 * 1024),
+        '/live/over-cap.m3u8': padded(CAP + 16 * 1024),
+    }
+
+    def do_GET(self):
+        if self.path == '/live/stream.ts':
+            self.send_endless_ts()
+            return
+        body = self.BODIES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.apple.mpegurl')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_endless_ts(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp2t')
+        self.end_headers()
+        packets = b'\x47' + b'\x00' * 187
+        try:
+            # Effectively endless; the bound only stops a broken client from hanging the suite
+            for _ in range(100000):
+                self.wfile.write(packets * 64)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/live'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def resolver():
+    resolver = HlsResolver(max_workers=1, timeout=2.0)
+    yield resolver
+    resolver.shutdown()
+
+
+def test_master_variants_are_parsed_in_bandwidth_order(base_url):
+    variants = parse_master_playlist(MASTER, base_url + '/master.m3u8')
+    assert [variant.bandwidth for variant in variants] == [128000, 800000, 2500000, 6000000]
+    assert [variant.audio_only for variant in variants] == [True, False, False, False]
+    assert variants[1].url == base_url + '/v/360.m3u8'
+    assert (variants[3].width, variants[3].height) == (1920, 1080)
+
+
+@pytest.mark.parametrize('kbps, expected', [
+    (20000, '/v/1080.m3u8'),   # 6000 kbps fits 0.7 x 20000
+    (4000, '/v/720.m3u8'),     # 2500 kbps fits 0.7 x 4000, 6000 does not
+    (1500, '/v/360.m3u8'),
+    (100, '/v/360.m3u8'),      # nothing fits: the lightest video variant, never audio only
+])
+def test_variant_follows_the_throughput_estimate(base_url, resolver, kbps, expected):
+    master = base_url + '/master.m3u8'
+    assert resolver.fetch(master)
+    resolver.throughput.kbps = kbps
+    assert resolver.resolve(master) == base_url + expected
+
+
+def test_default_estimate_without_measurements(base_url, resolver):
+    master = base_url + '/master.m3u8'
+    resolver.fetch(master)
+    assert resolver.throughput.kbps is None
+    # default_kbps 4000 at 0.7 safety
+    assert resolver.resolve(master) == base_url + '/v/720.m3u8'
+
+
+def test_urls_that_are_not_masters_pass_through(base_url, resolver):
+    media = base_url + '/media.m3u8'
+    assert resolver.fetch(media) is None
+    assert resolver.resolve(media) == media
+    assert resolver.resolve(base_url + '/never-fetched.m3u8') == base_url + '/never-fetched.m3u8'
+    assert resolver.fetch(base_url + '/missing.m3u8') is None
+    assert resolver.fetch('rtmp://streams.example/live') is None
+
+
+def test_separate_audio_masters_are_not_pinned(base_url, resolver):
+    master = base_url + '/audio.m3u8'
+    assert resolver.fetch(master) is None
+    assert resolver.resolve(master) == master
+
+
+def test_read_cap(base_url, resolver):
+    assert resolver.max_playlist_bytes == CAP
+    assert resolver.fetch(base_url + '/under-cap.m3u8')
+    assert resolver.fetch(base_url + '/over-cap.m3u8') is None
+    assert resolver.resolve(base_url + '/over-cap.m3u8') == base_url + '/over-cap.m3u8'
+
+
+def test_endless_stream_stops_at_the_cap(base_url, resolver):
+    stream = base_url + '/stream.ts'
+    result = []
+    fetcher = threading.Thread(target=lambda: result.append(resolver.fetch(stream)), daemon=True)
+    fetcher.start()
+    fetcher.join(10)
+    assert not fetcher.is_alive(), "fetch kept reading an endless stream"
+    assert result == [None]
+    assert resolver.resolve(stream) == stream
@@ -0,0 +1,143 @@
+"""
+test_parse_extinf.py - Parity of the single-scan EXTINF tokenizer for Enhanced TV App
+parse_extinf must read the same title, country and logo out of every line as
+the original implementation, which ran one regex search per attribute.
+"""
+
+import re
+import random
+
+import pytest
+
+from tv_api import TVApi
+
+
+def reference_parse_extinf(api, extinf_line):
+    """The per-attribute regex parser that parse_extinf replaced."""
+    channel_info = {
+        'title': 'Unknown Channel',
+        'country': 'Unknown',
+        'country_name': 'Unknown',
+        'logo': '',
+        'extinf': extinf_line
+    }
+    if ',' in extinf_line:
+        title_part = extinf_line.split(',', 1)[1].strip().strip('"\'')
+        if title_part:
+            channel_info['title'] = title_part[:200]
+    country_match = re.search(r'tvg-country="([^"]*)"', extinf_line, re.IGNORECASE)
+    if not country_match:
+        country_match = re.search(r'tvg-country=([A-Z]{2})', extinf_line, re.IGNORECASE)
+    if country_match:
+        for country_code in country_match.group(1).upper().split(';'):
+            country_code = country_code.strip()
+            if len(country_code) == 2 and country_code.isalpha():
+                channel_info['country'] = country_code
+                channel_info['country_name'] = api.get_country_name(country_code)
+                break
+    if channel_info['country'] == 'Unknown':
+        group_match = re.search(r'group-title="([^"]*)"', extinf_line, re.IGNORECASE)
+        if group_match:
+            detected_country = api.detect_country_from_text(group_match.group(1))
+            if detected_country:
+                channel_info['country'], channel_info['country_name'] = detected_country
+    if channel_info['country'] == 'Unknown':
+        title = channel_info['title']
+        title_country_match = re.match(r'\[([A-Z]{2})\]\s*(.*)', title)
+        if title_country_match:
+            country_code = title_country_match.group(1).upper()
+            channel_info['country'] = country_code
+            channel_info['country_name'] = api.get_country_name(country_code)
+            channel_info['title'] = title_country_match.group(2).strip()
+        elif '(' in title and ')' in title:
+            paren_match = re.search(r'\(([A-Z]{2})\)', title)
+            if paren_match:
+                country_code = paren_match.group(1).upper()
+                channel_info['country'] = country_code
+                channel_info['country_name'] = api.get_country_name(country_code)
+                channel_info['title'] = re.sub(r'\s*\([A-Z]{2}\)', '', title).strip()
+        elif ':' in title:
+            colon_match = re.match(r'([A-Z]{2}):\s*(.*)', title)
+            if colon_match:
+                country_code = colon_match.group(1).upper()
+                channel_info['country'] = country_code
+                channel_info['country_name'] = api.get_country_name(country_code)
+                channel_info['title'] = colon_match.group(2).strip()
+        if channel_info['country'] == 'Unknown':
+            detected_country = api.detect_country_from_text(title)
+            if detected_country:
+                channel_info['country'], channel_info['country_name'] = detected_country
+    logo_match = re.search(r'tvg-logo="([^"]*)"', extinf_line, re.IGNORECASE)
+    if logo_match:
+        channel_info['logo'] = logo_match.group(1)
+    return channel_info
+
+
+EDGE_CASES = [
+    '#EXTINF:-1 tvg-id="cnn.us" tvg-country="US" tvg-logo="http://logo/cnn.png" group-title="News",CNN',
+    '#EXTINF:-1 tvg-country=US,Unquoted Country',
+    '#EXTINF:-1 tvg-country=us group-title="Sport",Lowercase Unquoted Country',
+    '#EXTINF:-1 tvg-country=USA,Three Letter Unquoted Country',
+    '#EXTINF:-1 tvg-country=U1,Non-Alpha Unquoted Country',
+    '#EXTINF:-1 TVG-COUNTRY="fr" TVG-LOGO="http://logo/f.png",Uppercase Keys',
+    '#EXTINF:-1 Tvg-Country="de;AT;CH",Mixed Case Key Multi Country',
+    '#EXTINF:-1 tvg-country="XYZ;12;GB",First Valid Of Several',
+    '#EXTINF:-1 tvg-country="",Empty Country',
+    '#EXTINF:-1 tvg-country=";;",Only Separators',
+    '#EXTINF:-1 tvg-country="CA" tvg-country="MX",Duplicate Key',
+    '#EXTINF:-1 tvg-logo="http://logo/a,b.png" tvg-country="IT",Comma In Logo',
+    '#EXTINF:-1 tvg-logo="",Empty Logo',
+    '#EXTINF:-1 tvg-logo=http://logo/unquoted.png,Unquoted Logo',
+    '#EXTINF:-1 group-title="Canada",Group Hint',
+    '#EXTINF:-1 group-title="UK | Entertainment",Group Code Hint',
+    '#EXTINF:-1 group-title=Germany,Unquoted Group',
+    '#EXTINF:-1,[ES] Bracket Title',
+    '#EXTINF:-1,[es] Lowercase Bracket Title',
+    '#EXTINF:-1,Paren Title (BR)',
+    '#EXTINF:-1,Paren Title (Live) (PT)',
+    '#EXTINF:-1,Paren Without Code (HD)',
+    '#EXTINF:-1,NL: Colon Title',
+    '#EXTINF:-1,News: Colon Without Code',
+    '#EXTINF:-1,"Quoted Title"',
+    "#EXTINF:-1,'Single Quoted Title'",
+    '#EXTINF:-1,Title, With, Commas',
+    '#EXTINF:-1,',
+    '#EXTINF:-1 tvg-country="JP"',
+    '#EXTINF:-1',
+    '#EXTINF:-1 tvg-name="A, B" tvg-country="KR",Comma In Name',
+    '#EXTINF:-1 tvg-country="SE" tvg-logo="http://logo/s.png" group-title="Sweden",' + 'Long Title ' * 30,
+    '#EXTINF:-1 tvg-country = "US",Spaced Equals',
+    '#EXTINF:0 tvg-chno=5 tvg-country="AU",Numeric Attribute',
+]
+
+
+def assert_same(api, line):
+    expected = reference_parse_extinf(api, line)
+    actual = api.parse_extinf(line)
+    assert {key: actual[key] for key in expected} == expected, line
+
+
+@pytest.mark.parametrize('line', EDGE_CASES)
+def test_edge_cases_match_reference(line):
+    assert_same(TVApi(), line)
+
+
+def test_generated_corpus_matches_reference():
+    rng = random.Random(1234)
+    codes = ['US', 'us', 'GB', 'FR', 'DE', 'XX', '', 'ca;mx', 'USA']
+    groups = ['News', 'Canada', 'France | Sport', 'Kids', '']
+    titles = ['Channel {}', '[IT] Canal {}', 'Sport {} (ES)', 'DE: Kanal {}', 'Movies {} HD', 'Noticias {}, Live']
+    api = TVApi()
+    for n in range(2000):
+        parts = []
+        code = rng.choice(codes)
+        if code:
+            key = rng.choice(['tvg-country', 'TVG-COUNTRY', 'Tvg-Country'])
+            parts.append(f'{key}="{code}"' if rng.random() < 0.8 else f'{key}={code}')
+        if rng.random() < 0.7:
+            parts.append(f'tvg-logo="http://logo.example/{n},{rng.randint(0, 9)}.png"')
+        group = rng.choice(groups)
+        if group:
+            parts.append(f'group-title="{group}"')
+        rng.shuffle(parts)
+        assert_same(api, ' '.join(['#EXTINF:-1'] + parts) + ',' + rng.choice(titles).format(n))
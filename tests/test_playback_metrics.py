@@ -0,0 +1,105 @@
+"""
+test_playback_metrics.py - Play and pre-buffer accounting for Enhanced TV App
+VLC events are fed to PlaybackMetrics by hand, with the event payloads the
+handlers read, so no libvlc is needed.
+"""
+
+import time
+from types import SimpleNamespace
+
+from playback_metrics import PlaybackMetrics
+
+URL = 'http://streams.example/news.m3u8'
+
+
+def vout(metrics, player):
+    metrics._on_vout(SimpleNamespace(u=SimpleNamespace(new_count=1)), id(player))
+
+
+def buffering(metrics, player, percent):
+    metrics._on_buffering(SimpleNamespace(u=SimpleNamespace(new_cache=percent)), id(player))
+
+
+def error(metrics, player):
+    metrics._on_error(SimpleNamespace(), id(player))
+
+
+def test_plain_play_records_first_frame_and_stalls(tmp_path):
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    player = object()
+    metrics.start(player, URL)
+    vout(metrics, player)
+    buffering(metrics, player, 20.0)
+    buffering(metrics, player, 100.0)
+    stats = metrics.get(URL)
+    assert (stats['plays'], stats['ttff_count'], stats['buffering_episodes']) == (1, 1, 1)
+    assert metrics.reliability(URL) == 0.0
+
+
+def test_unwatched_prebuffer_is_not_a_play(tmp_path):
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    player = object()
+    metrics.prewarm(player, URL)
+    vout(metrics, player)
+    buffering(metrics, player, 20.0)
+    buffering(metrics, player, 100.0)
+    error(metrics, player)
+    stats = metrics.get(URL)
+    assert stats['prewarms'] == 1
+    assert (stats['plays'], stats['ttff_count'], stats['buffering_episodes'], stats['errors']) == (0, 0, 0, 0)
+    assert metrics.reliability(URL) is None
+
+
+def test_promoted_prebuffer_records_the_zap(tmp_path):
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    player = object()
+    metrics.prewarm(player, URL)
+    time.sleep(0.05)
+    vout(metrics, player)
+    metrics.promote(player, time.perf_counter())
+    stats = metrics.get(URL)
+    assert (stats['plays'], stats['prewarm_zaps'], stats['ttff_count']) == (1, 1, 1)
+    # The frame was already there: the zap is not charged the pre-buffer's startup time
+    assert stats['ttff_last'] < 0.05
+    buffering(metrics, player, 20.0)
+    buffering(metrics, player, 100.0)
+    assert metrics.get(URL)['buffering_episodes'] == 1
+
+
+def test_prebuffer_promoted_before_its_first_frame(tmp_path):
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    player = object()
+    metrics.prewarm(player, URL)
+    time.sleep(0.05)
+    started = time.perf_counter()
+    metrics.promote(player, started)
+    assert metrics.get(URL)['ttff_count'] == 0
+    time.sleep(0.02)
+    vout(metrics, player)
+    stats = metrics.get(URL)
+    assert stats['ttff_count'] == 1
+    assert 0.02 <= stats['ttff_last'] < 0.05
+
+
+def test_counts_survive_a_reload(tmp_path):
+    metrics_file = str(tmp_path / 'metrics.json')
+    metrics = PlaybackMetrics(metrics_file)
+    player = object()
+    metrics.prewarm(player, URL)
+    metrics.promote(player, time.perf_counter())
+    metrics.save()
+    stats = PlaybackMetrics(metrics_file).get(URL)
+    assert (stats['plays'], stats['prewarms'], stats['prewarm_zaps']) == (1, 1, 1)
+
+
+def test_forgotten_player_is_no_longer_tracked(tmp_path):
+    metrics = PlaybackMetrics(str(tmp_path / 'metrics.json'))
+    player = object()
+    metrics.start(player, URL)
+    vout(metrics, player)
+    metrics.forget(player)
+    buffering(metrics, player, 20.0)
+    buffering(metrics, player, 100.0)
+    error(metrics, player)
+    stats = metrics.get(URL)
+    assert (stats['plays'], stats['buffering_episodes'], stats['errors']) == (1, 0, 0)
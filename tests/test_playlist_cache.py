@@ -0,0 +1,101 @@
+"""
+test_playlist_cache.py - Cold and warm playlist loads for Enhanced TV App
+A local HTTP server with ETag support stands in for the playlist source: the
+cold load parses and snapshots the playlist, the warm load revalidates it with
+a conditional GET and is answered 304 without a body.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tv_api import TVApi
+from playlist_cache import PlaylistCache
+
+PLAYLIST = (
+    '#EXTM3U\n'
+    '#EXTINF:-1 tvg-country="US" group-title="News",News One\n'
+    'http://streams.example/news1.m3u8\n'
+    '#EXTINF:-1 tvg-country="FR",Canal Deux\n'
+    'http://streams.example/canal2.m3u8\n'
+)
+
+
+class PlaylistServer:
+    """Serves self.body at /playlist.m3u with an ETag and records every request's If-None-Match."""
+    def __init__(self):
+        self.body = PLAYLIST
+        self.etag = '"v1"'
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.headers.get('If-None-Match'))
+                if self.headers.get('If-None-Match') == server.etag:
+                    self.send_response(304)
+                    self.send_header('ETag', server.etag)
+                    self.end_headers()
+                    return
+                body = server.body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('ETag', server.etag)
+                self.send_header('Content-Type', 'audio/x-mpegurl; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/playlist.m3u'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = PlaylistServer()
+    yield server
+    server.close()
+
+
+def load(api, url, revalidate):
+    return [channel for batch in api.iter_sources([url], revalidate=revalidate) for channel in batch]
+
+
+def test_cold_load_parses_and_snapshots(server, tmp_path):
+    cache = PlaylistCache(str(tmp_path))
+    channels = load(TVApi(cache=cache), server.url, revalidate=False)
+    assert [channel.title for channel in channels] == ['News One', 'Canal Deux']
+    assert server.requests == [None]
+    assert cache.get_validators(server.url)[0] == '"v1"'
+    assert [row[0] for row in cache.load(server.url)] == ['News One', 'Canal Deux']
+
+
+def test_warm_load_revalidates_with_304(server, tmp_path):
+    cache = PlaylistCache(str(tmp_path))
+    load(TVApi(cache=cache), server.url, revalidate=False)
+    api = TVApi(cache=cache)
+    # What the app shows instantly on a warm start
+    assert [channel.title for channel in api.load_cached([server.url])] == ['News One', 'Canal Deux']
+    assert load(api, server.url, revalidate=True) == []
+    assert api.not_modified
+    assert server.requests == [None, '"v1"']
+
+
+def test_changed_playlist_is_reparsed(server, tmp_path):
+    cache = PlaylistCache(str(tmp_path))
+    load(TVApi(cache=cache), server.url, revalidate=False)
+    server.body = PLAYLIST + '#EXTINF:-1 tvg-country="DE",Kanal Drei\nhttp://streams.example/kanal3.m3u8\n'
+    server.etag = '"v2"'
+    api = TVApi(cache=cache)
+    channels = load(api, server.url, revalidate=True)
+    assert not api.not_modified
+    assert [channel.title for channel in channels] == ['News One', 'Canal Deux', 'Kanal Drei']
+    assert cache.get_validators(server.url)[0] == '"v2"'
@@ -0,0 +1,165 @@
+"""
+test_playlist_sources.py - Aggregated playlist sources for Enhanced TV App
+TVApi.iter_sources runs against several playlists served by one local HTTP
+server: sources are fetched concurrently, duplicate stream URLs are dropped,
+every channel remembers its source, and failing or unchanged sources are
+handled per source.
+"""
+
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tv_api import TVApi
+from playlist_cache import PlaylistCache
+
+
+def playlist(*entries):
+    return '#EXTM3U\n' + ''.join(f'#EXTINF:-1 tvg-country="US",{title}\n{url}\n' for title, url in entries)
+
+
+class SourceServer:
+    """
+    Serves self.playlists[path] with ETag "path-version". A path in failing
+    answers 500; delays[path] seconds pass before the body is sent. The
+    largest number of requests in flight at once is kept in max_active.
+    """
+    def __init__(self):
+        self.playlists = {}
+        self.versions = {}
+        self.delays = {}
+        self.failing = set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    time.sleep(server.delays.get(self.path, 0))
+                    self.respond()
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def respond(self):
+                if self.path in server.failing or self.path not in server.playlists:
+                    self.send_error(500 if self.path in server.failing else 404)
+                    return
+                etag = f'"{self.path}-{server.versions.get(self.path, 1)}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = server.playlists[self.path].encode('utf-8')
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return self.base + path
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = SourceServer()
+    server.playlists['/a.m3u'] = playlist(('A One', 'http://streams.example/a1'), ('Shared', 'http://streams.example/shared'))
+    server.playlists['/b.m3u'] = playlist(('B One', 'http://streams.example/b1'), ('Shared Again', 'http://streams.example/shared'))
+    server.playlists['/c.m3u'] = playlist(('C One', 'http://streams.example/c1'))
+    yield server
+    server.close()
+
+
+def load(api, sources, revalidate=False):
+    return [channel for batch in api.iter_sources(sources, revalidate=revalidate) for channel in batch]
+
+
+def test_sources_are_fetched_concurrently(server):
+    for path in ('/a.m3u', '/b.m3u', '/c.m3u'):
+        server.delays[path] = 0.4
+    start = time.perf_counter()
+    channels = load(TVApi(), [server.url(path) for path in ('/a.m3u', '/b.m3u', '/c.m3u')])
+    assert time.perf_counter() - start < 1.0
+    assert server.max_active == 3
+    assert len(channels) == 4
+
+
+def test_duplicate_urls_keep_the_first_delivery_and_its_source(server):
+    # b answers first, so its copy of the shared stream wins
+    server.delays['/a.m3u'] = 0.3
+    a, b = server.url('/a.m3u'), server.url('/b.m3u')
+    channels = load(TVApi(), [a, b])
+    assert sorted(channel.url for channel in channels) == [
+        'http://streams.example/a1', 'http://streams.example/b1', 'http://streams.example/shared']
+    by_url = {channel.url: channel for channel in channels}
+    assert by_url['http://streams.example/shared'].title == 'Shared Again'
+    assert by_url['http://streams.example/shared'].source == b
+    assert by_url['http://streams.example/a1'].source == a
+    assert by_url['http://streams.example/b1'].source == b
+
+
+def test_sources_survive_into_the_catalog(server):
+    a, c = server.url('/a.m3u'), server.url('/c.m3u')
+    api = TVApi()
+    api.load_playlist([a, c])
+    assert sorted(set(api.channels.sources)) == sorted([a, c])
+    assert {channel.url: channel.source for channel in api.channels}['http://streams.example/c1'] == c
+
+
+def test_one_failing_source_is_tolerated(server):
+    server.failing.add('/b.m3u')
+    api = TVApi()
+    a, b = server.url('/a.m3u'), server.url('/b.m3u')
+    channels = load(api, [a, b])
+    assert [channel.title for channel in channels] == ['A One', 'Shared']
+    assert list(api.source_errors) == [b]
+
+
+def test_every_source_failing_raises(server):
+    server.failing.update({'/a.m3u', '/b.m3u'})
+    api = TVApi()
+    with pytest.raises(Exception):
+        load(api, [server.url('/a.m3u'), server.url('/b.m3u')])
+    assert len(api.source_errors) == 2
+
+
+def test_mixed_revalidate_fills_unchanged_sources_from_the_cache(server, tmp_path):
+    cache = PlaylistCache(str(tmp_path))
+    a, c = server.url('/a.m3u'), server.url('/c.m3u')
+    load(TVApi(cache=cache), [a, c])
+    server.playlists['/c.m3u'] = playlist(('C One', 'http://streams.example/c1'), ('C Two', 'http://streams.example/c2'))
+    server.versions['/c.m3u'] = 2
+    api = TVApi(cache=cache)
+    channels = load(api, [a, c], revalidate=True)
+    assert not api.not_modified
+    assert sorted((channel.title, channel.source) for channel in channels) == sorted([
+        ('A One', a), ('Shared', a), ('C One', c), ('C Two', c)])
+
+
+def test_revalidate_with_every_source_unchanged(server, tmp_path):
+    cache = PlaylistCache(str(tmp_path))
+    sources = [server.url('/a.m3u'), server.url('/c.m3u')]
+    load(TVApi(cache=cache), sources)
+    api = TVApi(cache=cache)
+    assert load(api, sources, revalidate=True) == []
+    assert api.not_modified
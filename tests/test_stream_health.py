@@ -0,0 +1,93 @@
+"""
+test_stream_health.py - Stream probing for Enhanced TV App
+StreamProber runs against a local stub server with a healthy, a slow, a too
+slow and a failing stream; results must land in the StreamHealthCache.
+"""
+
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from stream_health import StreamHealthCache, StreamProber
+
+# Seconds each stub stream waits before sending its first bytes
+DELAYS = {'/healthy': 0.0, '/slow': 0.3, '/stalled': 2.0}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/failing':
+            self.send_error(500)
+            return
+        if self.path not in DELAYS:
+            self.send_error(404)
+            return
+        time.sleep(DELAYS[self.path])
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp2t')
+        self.end_headers()
+        try:
+            self.wfile.write(b'\x47' * 188 * 8)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return f'http://127.0.0.1:{s.getsockname()[1]}/gone'
+
+
+def test_probe_results(base_url, tmp_path):
+    prober = StreamProber(StreamHealthCache(str(tmp_path / 'health.json')), timeout=1.0)
+    try:
+        ok, latency = prober.probe(base_url + '/healthy')
+        assert ok and 0 <= latency < 0.3
+        ok, latency = prober.probe(base_url + '/slow')
+        assert ok and latency >= 0.3
+        assert prober.probe(base_url + '/stalled') == (False, -1.0)
+        assert prober.probe(base_url + '/failing') == (False, -1.0)
+        assert prober.probe(closed_port_url()) == (False, -1.0)
+    finally:
+        prober.shutdown()
+
+
+def test_submit_records_and_persists(base_url, tmp_path):
+    cache_file = str(tmp_path / 'health.json')
+    cache = StreamHealthCache(cache_file)
+    prober = StreamProber(cache, timeout=1.0)
+    urls = [base_url + path for path in ('/healthy', '/slow', '/failing')]
+    prober.submit(urls + ['rtmp://streams.example/not-http'])
+    prober.executor.shutdown(wait=True)
+    prober.shutdown()
+    assert not cache.is_dead(urls[0]) and not cache.is_dead(urls[1])
+    assert cache.is_dead(urls[2])
+    assert cache.get('rtmp://streams.example/not-http') is None
+    reloaded = StreamHealthCache(cache_file)
+    assert reloaded.is_dead(urls[2]) and reloaded.get(urls[0])['ok']
+
+
+def test_fresh_results_are_not_probed_again(base_url, tmp_path):
+    cache = StreamHealthCache(str(tmp_path / 'health.json'))
+    cache.record(base_url + '/failing', True, 0.01)
+    prober = StreamProber(cache, timeout=1.0)
+    prober.submit([base_url + '/failing'])
+    prober.executor.shutdown(wait=True)
+    prober.shutdown()
+    assert not cache.is_dead(base_url + '/failing')
@@ -0,0 +1,50 @@
+"""
+test_telemetry.py - Metrics endpoint and parse spans for Enhanced TV App
+POST /profile only acts on requests a web page could not have sent, and every
+playlist source parsed adds one parse_source observation.
+"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from telemetry import TELEMETRY, Telemetry, MetricsServer
+from tv_api import TVApi
+
+
+@pytest.fixture
+def server():
+    toggles = []
+    server = MetricsServer(Telemetry(), 0, profile_toggle=lambda: toggles.append(True))
+    server.toggles = toggles
+    yield server
+    server.close()
+
+
+def post(server, headers):
+    request = urllib.request.Request(f'http://127.0.0.1:{server.port}/profile', data=b'', headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_profile_post_needs_x_requested_with(server):
+    assert post(server, {}) == 403
+    assert post(server, {'Content-Type': 'text/plain'}) == 403
+    assert server.toggles == []
+    assert post(server, {'X-Requested-With': 'curl'}) == 202
+    assert server.toggles == [True]
+
+
+def test_one_parse_span_per_source(tmp_path):
+    sources = []
+    for name, count in (('a', 1200), ('b', 3)):
+        path = tmp_path / f'{name}.m3u'
+        path.write_text('#EXTM3U\n' + ''.join(f'#EXTINF:-1,{name} {n}\nhttp://streams.example/{name}/{n}\n' for n in range(count)))
+        sources.append(str(path))
+    before = TELEMETRY.snapshot()['timings'].get('parse_source', {}).get('count', 0)
+    TVApi().load_playlist(sources)
+    assert TELEMETRY.snapshot()['timings']['parse_source']['count'] == before + 2
@@ -0,0 +1,490 @@
+"""
+tv_api.py - Playlist fetching and parsing for Enhanced TV App
+Everything needed to turn M3U playlists into a channel catalog, kept free of
+Qt and VLC so it can also run headless (e.g. from benchmark.py). Very large
+playlists are parsed on a process pool, in chunks split at #EXTINF lines.
+"""
+
+import os
+import re
+import multiprocessing
+import time
+import queue
+import threading
+from bisect import bisect_left, insort
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from http_session import LazySession
+from telemetry import TELEMETRY
+from countries import get_country_name, detect_country, country_key, add_to_country_buckets
+from catalog import TVChannel, ChannelCatalog
+from search_index import normalize
+
+# Single-pass EXTINF tokenizer: every key=value / key="value" pair in one scan
+EXTINF_ATTR_RE = re.compile(r'([A-Za-z0-9_-]+)=("[^"]*"|[^\s",]*)')
+# Country hints embedded in channel titles: "[US] Name", "Name (US)", "US: Name"
+TITLE_BRACKET_COUNTRY_RE = re.compile(r'\[([A-Z]{2})\]\s*(.*)')
+TITLE_PAREN_COUNTRY_RE = re.compile(r'\(([A-Z]{2})\)')
+TITLE_PAREN_STRIP_RE = re.compile(r'\s*\([A-Z]{2}\)')
+TITLE_COLON_COUNTRY_RE = re.compile(r'([A-Z]{2}):\s*(.*)')
+# Below this many entries starting a process pool costs more than it saves
+PARALLEL_MIN_ENTRIES = 20000
+# Local playlists at least this large are read whole so they can be parsed in parallel
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+
+def as_source_list(sources):
+    """Accept a single playlist URL/path or a list of them."""
+    return [sources] if isinstance(sources, str) else list(sources)
+
+
+def local_playlist_path(source):
+    """Return the file path of a local playlist source, or None for HTTP(S) sources."""
+    if source.startswith(('http://', 'https://')):
+        return None
+    if source.startswith('file://'):
+        return source[len('file://'):]
+    return source
+
+
+def dedupe_channels(channels, seen, source):
+    """Tag channels with source and keep those whose URL is not in seen yet, adding them to it."""
+    fresh = []
+    for channel in channels:
+        if channel.url in seen:
+            continue
+        seen.add(channel.url)
+        channel.source = source
+        fresh.append(channel)
+    return fresh
+
+def split_m3u_chunks(content, count):
+    """Split content into at most count chunks of similar size, each new one starting at an #EXTINF line."""
+    size = len(content) // max(1, count)
+    bounds = [0]
+    for i in range(1, count):
+        position = content.find('\n#EXTINF:', max(bounds[-1], i * size))
+        if position < 0:
+            break
+        bounds.append(position + 1)
+    bounds.append(len(content))
+    return [content[start:end] for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def parse_m3u_chunk(text):
+    """Process pool entry point: parse one chunk into row tuples, which pickle much faster than TVChannel objects."""
+    return [
+        (c.title, c.url, c.country, c.country_name, c.logo, c.group, c.tvg_id)
+        for c in TVApi().iter_m3u_lines(text.splitlines())
+    ]
+
+
+class TVApi:
+    def __init__(self, playlist_url=None, cache=None, max_workers=8, parse_workers=1):
+        self.channels = ChannelCatalog()
+        self.country_buckets = {}
+        self.cache = cache
+        self.not_modified = False
+        self.source_errors = {}
+        self.max_workers = max_workers
+        # Processes used to parse very large playlists (1 = never in parallel, 0 = one per CPU).
+        # Serial is the default: pool start-up and pickling the rows back cost more than they save.
+        self.parse_workers = parse_workers
+        # One pooled session for every playlist source, so connections to the same host are reused
+        self.session = LazySession(max_workers)
+        if playlist_url:
+            self.load_playlist(playlist_url)
+
+    def load_playlist(self, sources):
+        self.set_channels(ChannelCatalog())
+        for batch in self.iter_sources(sources):
+            self.add_channels(batch)
+        return self.channels
+
+    def set_channels(self, channels, country_buckets=None):
+        """Replace the catalog; country buckets are rebuilt unless already computed for channels."""
+        if not isinstance(channels, ChannelCatalog):
+            channels = ChannelCatalog(channels)
+        self.channels = channels
+        self.country_buckets = country_buckets if country_buckets is not None else add_to_country_buckets({}, channels)
+
+    def add_channels(self, channels):
+        """Append channels to the catalog, filing them into their country buckets. Returns the first new index."""
+        start = len(self.channels)
+        self.channels.extend(channels)
+        add_to_country_buckets(self.country_buckets, channels, start)
+        return start
+
+    def apply_diff(self, diff, channels):
+        """
+        Apply diff, computed by diff_catalogs(self.channels, channels), to the
+        catalog in place: removed channels become tombstones, changed ones are
+        rewritten at their index and new ones are appended. Country buckets
+        are edited in place too. Returns the index of the first new channel.
+        """
+        catalog = self.channels
+        for index in diff.removed:
+            self._unbucket(country_key(catalog.country_of(index)), index)
+            catalog.remove(index)
+        for index, new_index in diff.updated:
+            old_key = country_key(catalog.country_of(index))
+            catalog.replace(index, channels[new_index])
+            key = country_key(catalog.country_of(index))
+            if key != old_key:
+                self._unbucket(old_key, index)
+                insort(self.country_buckets.setdefault(key, []), index)
+        return self.add_channels([channels[new_index] for new_index in diff.inserted])
+
+    def _unbucket(self, key, index):
+        bucket = self.country_buckets.get(key)
+        if not bucket:
+            return
+        position = bisect_left(bucket, index)
+        if position < len(bucket) and bucket[position] == index:
+            del bucket[position]
+        if not bucket:
+            del self.country_buckets[key]
+
+    def cached_channels(self, source):
+        """Return the channels of the last saved snapshot of source."""
+        if not self.cache:
+            return []
+        return [TVChannel(*row, source=source) for row in self.cache.load(source) or ()]
+
+    def load_cached(self, sources):
+        """Return a catalog of the last saved snapshots of sources (duplicate URLs dropped), or an empty one."""
+        catalog = ChannelCatalog()
+        seen = set()
+        for source in as_source_list(sources):
+            for channel in self.cached_channels(source):
+                if channel.url not in seen:
+                    seen.add(channel.url)
+                    catalog.append(channel)
+        return catalog
+
+    def iter_sources(self, sources, batch_size=500, revalidate=False):
+        """
+        Fetch every source concurrently and yield batches of channels as they
+        are parsed, each channel tagged with its source. A URL already seen in
+        an earlier batch is dropped, so the first source to deliver it wins.
+        With revalidate=True, not_modified is set when no source changed;
+        otherwise unchanged or unreachable sources are filled in from their
+        cached snapshots. Failing sources are recorded in source_errors; the
+        first error is raised only if every source failed.
+        """
+        sources = as_source_list(sources)
+        self.not_modified = False
+        self.source_errors = {}
+        if not sources:
+            return
+        results = queue.Queue()
+        stop = threading.Event()
+        statuses = {source: {} for source in sources}
+
+        def fetch(source):
+            try:
+                for batch in self._fetch_source(source, batch_size, revalidate, statuses[source]):
+                    if stop.is_set():
+                        return
+                    results.put((source, batch))
+            except Exception as e:
+                results.put((source, e))
+            finally:
+                results.put((source, None))
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(sources)), thread_name_prefix='playlist-source')
+        seen = set()
+        try:
+            for source in sources:
+                executor.submit(fetch, source)
+            remaining = len(sources)
+            while remaining:
+                source, item = results.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    self.source_errors[source] = item
+                else:
+                    batch = dedupe_channels(item, seen, source)
+                    if batch:
+                        yield batch
+            if len(self.source_errors) == len(sources):
+                raise next(iter(self.source_errors.values()))
+            stale = [source for source in sources if statuses[source].get('not_modified') or source in self.source_errors]
+            if revalidate and len(stale) == len(sources):
+                self.not_modified = True
+                return
+            if revalidate:
+                for source in stale:
+                    batch = dedupe_channels(self.cached_channels(source), seen, source)
+                    if batch:
+                        yield batch
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def _fetch_source(self, source, batch_size, revalidate, status):
+        path = local_playlist_path(source)
+        if path is not None:
+            # Local files use their modification time as the validator
+            modified = str(os.path.getmtime(path))
+            if revalidate and self.cache and self.cache.get_validators(source)[1] == modified:
+                status['not_modified'] = True
+                return
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                if self.parse_workers != 1 and os.path.getsize(path) >= PARALLEL_MIN_BYTES:
+                    channels = chain.from_iterable(self.iter_m3u_content(f.read()))
+                else:
+                    channels = self.iter_m3u_lines(f)
+                yield from self._parse_batches(source, channels, batch_size, None, modified)
+            return
+        headers = self.cache.conditional_headers(source) if (revalidate and self.cache) else {}
+        with self.session.get(source, stream=True, timeout=30, headers=headers) as response:
+            if response.status_code == 304:
+                status['not_modified'] = True
+                return
+            response.raise_for_status()
+            encoding = response.encoding or 'utf-8'
+            lines = (line.decode(encoding, errors='replace') for line in response.iter_lines(chunk_size=64 * 1024))
+            yield from self._parse_batches(source, self.iter_m3u_lines(lines), batch_size, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    def _parse_batches(self, source, channels, batch_size, etag, last_modified):
+        rows = []
+        batch = []
+        # One parse_source observation per source: time spent reading and parsing, not waiting on the consumer
+        busy = 0.0
+        resumed = time.perf_counter()
+        for channel in channels:
+            batch.append(channel)
+            if len(batch) >= batch_size:
+                rows.extend(batch)
+                busy += time.perf_counter() - resumed
+                yield batch
+                resumed = time.perf_counter()
+                batch = []
+        busy += time.perf_counter() - resumed
+        TELEMETRY.observe('parse_source', busy)
+        if batch:
+            rows.extend(batch)
+            yield batch
+        if self.cache:
+            self.cache.save(
+                source,
+                [(c.title, c.url, c.country, c.country_name, c.logo, c.group, c.tvg_id) for c in rows],
+                etag,
+                last_modified
+            )
+
+    def parse_m3u_content(self, content, workers=None, min_entries=PARALLEL_MIN_ENTRIES):
+        return list(chain.from_iterable(self.iter_m3u_content(content, workers, min_entries)))
+
+    def iter_m3u_content(self, content, workers=None, min_entries=PARALLEL_MIN_ENTRIES):
+        """
+        Yield the channels of a whole playlist as lists, in playlist order.
+        With at least min_entries entries and more than one worker (None =
+        parse_workers, 0 = one per CPU) the content is split at #EXTINF lines
+        and the chunks are parsed on a process pool; chunks a pool could not
+        parse are parsed here instead.
+        """
+        if workers is None:
+            workers = self.parse_workers
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or content.count('#EXTINF:') < min_entries:
+            yield list(self.iter_m3u_lines(content.splitlines()))
+            return
+        # Several chunks per process even out chunks that happen to be slower to parse
+        chunks = split_m3u_chunks(content, workers * 4)
+        done = 0
+        try:
+            # spawn rather than fork: forking a process that already runs Qt and loader threads is unsafe
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        except (OSError, NotImplementedError):
+            pool = None
+        if pool is not None:
+            try:
+                # map() hands results back in submission order, i.e. playlist order
+                for rows in pool.map(parse_m3u_chunk, chunks):
+                    yield [TVChannel(*row) for row in rows]
+                    done += 1
+            except Exception as e:
+                print(f"Parallel playlist parsing failed, parsing serially: {e}")
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        for chunk in chunks[done:]:
+            yield list(self.iter_m3u_lines(chunk.splitlines()))
+
+    def iter_m3u_lines(self, lines):
+        extinf = None
+        for line in lines:
+            line = line.strip()
+            if line.startswith('#EXTINF:'):
+                extinf = line
+            elif line and not line.startswith('#') and extinf:
+                channel_info = self.parse_extinf(extinf)
+                channel_info['url'] = line
+                yield TVChannel(
+                    channel_info['title'],
+                    channel_info['url'],
+                    channel_info['country'],
+                    channel_info['country_name'],
+                    channel_info['logo'],
+                    channel_info['group'],
+                    channel_info['tvg_id']
+                )
+                extinf = None
+
+    def parse_extinf(self, extinf_line):
+        channel_info = {
+            'title': 'Unknown Channel',
+            'country': 'Unknown',
+            'country_name': 'Unknown',
+            'logo': '',
+            'group': '',
+            'tvg_id': '',
+            'extinf': extinf_line
+        }
+        try:
+            # Extract title
+            if ',' in extinf_line:
+                title_part = extinf_line.split(',', 1)[1].strip().strip('"\'')
+                if title_part:
+                    channel_info['title'] = title_part[:200]
+            attributes = self._extinf_attributes(extinf_line)
+            # Extract country code from tvg-country
+            country_value = attributes.get('tvg-country')
+            if country_value is not None:
+                if country_value.startswith('"'):
+                    country_codes = country_value[1:-1].upper().split(';')
+                else:
+                    # Unquoted form only carries a single two-letter code
+                    country_codes = [country_value[:2].upper()]
+                for country_code in country_codes:
+                    country_code = country_code.strip()
+                    if len(country_code) == 2 and country_code.isalpha():
+                        channel_info['country'] = country_code
+                        channel_info['country_name'] = self.get_country_name(country_code)
+                        break
+            group_value = attributes.get('group-title', '')
+            if group_value.startswith('"'):
+                channel_info['group'] = group_value[1:-1]
+            # Try group-title for country info
+            if channel_info['country'] == 'Unknown':
+                detected_country = self.detect_country_from_text(channel_info['group'])
+                if detected_country:
+                    channel_info['country'] = detected_country[0]
+                    channel_info['country_name'] = detected_country[1]
+            # Try to extract country from channel title patterns
+            if channel_info['country'] == 'Unknown':
+                title = channel_info['title']
+                title_country_match = TITLE_BRACKET_COUNTRY_RE.match(title)
+                if title_country_match:
+                    country_code = title_country_match.group(1).upper()
+                    if len(country_code) == 2 and country_code.isalpha():
+                        channel_info['country'] = country_code
+                        channel_info['country_name'] = self.get_country_name(country_code)
+                        channel_info['title'] = title_country_match.group(2).strip()
+                elif '(' in title and ')' in title:
+                    paren_match = TITLE_PAREN_COUNTRY_RE.search(title)
+                    if paren_match:
+                        country_code = paren_match.group(1).upper()
+                        if len(country_code) == 2 and country_code.isalpha():
+                            channel_info['country'] = country_code
+                            channel_info['country_name'] = self.get_country_name(country_code)
+                            channel_info['title'] = TITLE_PAREN_STRIP_RE.sub('', title).strip()
+                elif ':' in title:
+                    colon_match = TITLE_COLON_COUNTRY_RE.match(title)
+                    if colon_match:
+                        country_code = colon_match.group(1).upper()
+                        if len(country_code) == 2 and country_code.isalpha():
+                            channel_info['country'] = country_code
+                            channel_info['country_name'] = self.get_country_name(country_code)
+                            channel_info['title'] = colon_match.group(2).strip()
+                if channel_info['country'] == 'Unknown':
+                    detected_country = self.detect_country_from_text(title)
+                    if detected_country:
+                        channel_info['country'] = detected_country[0]
+                        channel_info['country_name'] = detected_country[1]
+            # Extract logo URL
+            logo_value = attributes.get('tvg-logo', '')
+            if logo_value.startswith('"'):
+                channel_info['logo'] = logo_value[1:-1]
+            # Extract the guide channel id used to match XMLTV programmes
+            tvg_id = attributes.get('tvg-id', '')
+            channel_info['tvg_id'] = (tvg_id[1:-1] if tvg_id.startswith('"') else tvg_id).strip()
+        except Exception as e:
+            print(f"Error parsing EXTINF: {e}")
+        return channel_info
+
+    def _extinf_attributes(self, extinf_line):
+        """
+        Collect every key=value attribute of an EXTINF line in a single scan.
+        Keys are lowercased, the first occurrence wins, and quoted values keep
+        their quotes so callers can tell the two forms apart.
+        """
+        attributes = {}
+        for key, value in EXTINF_ATTR_RE.findall(extinf_line):
+            key = key.lower()
+            if key not in attributes:
+                attributes[key] = value
+        return attributes
+
+    def get_country_name(self, country_code):
+        return get_country_name(country_code)
+
+    def get_countries(self):
+        return sorted(code for code in self.country_buckets if code != 'Unknown')
+
+    def get_country_counts(self):
+        return {code: len(bucket) for code, bucket in self.country_buckets.items()}
+
+    def get_country_rows(self, country):
+        return self.country_buckets.get(country, [])
+
+    def detect_country_from_text(self, text):
+        return detect_country(text)
+
+    def filter_rows(self, country=None, query='', start=0, search_index=None, is_dead=None):
+        """
+        Return the indices of channels, from start on, in country (None = all)
+        whose title contains query. search_index is used when it covers the
+        whole catalog; is_dead(url), when given, filters out offline streams.
+        """
+        channels = self.channels
+        query = normalize(query.strip())
+        if country:
+            rows = self.get_country_rows(country)
+            if start:
+                rows = rows[bisect_left(rows, start):]
+        else:
+            rows = range(start, len(channels))
+        indexed = False
+        if query:
+            if search_index is not None and start == 0 and len(search_index) == len(channels):
+                hits = search_index.search(query)
+                rows = hits if not country else [i for i in hits if country_key(channels.country_of(i)) == country]
+                indexed = True
+            else:
+                # Index not built yet or behind the catalog: plain scan, normalized like the index
+                titles = channels.titles
+                rows = [i for i in rows if query in normalize(titles[i])]
+        if channels.removed and (indexed or not country):
+            # Country buckets never hold tombstones; the full range and an index built before a removal do
+            removed = channels.removed
+            rows = [i for i in rows if i not in removed]
+        if is_dead is not None:
+            urls = channels.urls
+            rows = [i for i in rows if not is_dead(urls[i])]
+        return rows
+
+    def row_matches(self, index, country=None, query='', is_dead=None):
+        """Whether the channel at index would be part of filter_rows(country, query, is_dead=is_dead)."""
+        channels = self.channels
+        if index in channels.removed:
+            return False
+        if country and country_key(channels.country_of(index)) != country:
+            return False
+        query = normalize(query.strip())
+        if query and query not in normalize(channels.titles[index]):
+            return False
+        return is_dead is None or not is_dead(channels.urls[index])
@@ -0,0 +1,168 @@
+"""
+zapping.py - Pre-buffered channel switching for Enhanced TV App
+Neighbouring channels are opened ahead of time in extra, muted VLC players
+that render into hidden video frames; switching to one of them only swaps the
+visible frame instead of paying the full connect-and-buffer cost.
+"""
+
+import sys
+import time
+
+
+def bind_video_output(player, frame):
+    """Point a VLC player's video output at a Qt widget."""
+    if sys.platform.startswith('linux'):
+        player.set_xwindow(frame.winId())
+    elif sys.platform == "win32":
+        player.set_hwnd(frame.winId())
+    elif sys.platform == "darwin":
+        player.set_nsobject(int(frame.winId()))
+
+
+class PlayerSlot:
+    """A VLC player together with the video frame it renders into."""
+    def __init__(self, player, frame):
+        self.player = player
+        self.frame = frame
+        self.url = None
+        self.options = ()
+
+
+class ZapEngine:
+    """
+    Owns one active player plus up to max_prewarmed players buffering other
+    channels. max_bandwidth_kbps (0 = unlimited) caps the estimated combined
+    bitrate; pre-warming is scaled back when the active stream alone would
+    push the total over it. media_options(url) supplies the per-channel
+    options, e.g. CachingPolicy.media_options; a pre-warmed player opened
+    with other options than play() is given is reopened instead of
+    promoted. When a PlaybackMetrics is given, every player is watched;
+    pre-buffers are tracked apart from plays and a zap onto one is timed
+    when it is promoted.
+    resolve_url(url), when given, returns the URL the player should actually
+    open for a channel URL (e.g. a pinned HLS variant); streams are still
+    tracked under the channel URL.
+    """
+    def __init__(self, vlc_instance, stack, frame_factory, player=None,
+                 max_prewarmed=1, max_bandwidth_kbps=0, media_options=None, metrics=None, resolve_url=None):
+        self.vlc_instance = vlc_instance
+        self.media_options = media_options or (lambda url: ())
+        self.resolve_url = resolve_url or (lambda url: url)
+        self.metrics = metrics
+        self.stack = stack
+        self.frame_factory = frame_factory
+        self.max_prewarmed = max_prewarmed
+        self.max_bandwidth_kbps = max_bandwidth_kbps
+        self.active = self._new_slot(player)
+        self.prewarmed = {}  # url -> PlayerSlot
+        self.spare = []
+        self.stack.setCurrentWidget(self.active.frame)
+
+    def _new_slot(self, player=None):
+        frame = self.frame_factory()
+        self.stack.addWidget(frame)
+        slot = PlayerSlot(player or self.vlc_instance.media_player_new(), frame)
+        bind_video_output(slot.player, frame)
+        if self.metrics is not None:
+            self.metrics.watch(slot.player)
+        return slot
+
+    def _take_spare(self):
+        if self.spare:
+            return self.spare.pop()
+        return self._new_slot()
+
+    def _retire(self, slot):
+        slot.player.stop()
+        slot.url = None
+        slot.options = ()
+        if len(self.spare) >= self.max_prewarmed:
+            # Keep at most one idle player per pre-warm slot; free the rest
+            slot.player.release()
+            self.stack.removeWidget(slot.frame)
+            slot.frame.deleteLater()
+            return
+        self.spare.append(slot)
+
+    def play(self, url, media_options=()):
+        """Make url the visible, audible stream and return the player now playing it."""
+        started = time.perf_counter()
+        media_options = tuple(media_options)
+        slot = self.prewarmed.pop(url, None)
+        if slot is not None and slot.options != media_options:
+            # Buffered with a cache size the policy has since moved away from
+            self._retire(slot)
+            slot = None
+        if slot is not None:
+            # Already buffered: just bring its frame to the front and unmute it
+            previous = self.active
+            self.active = slot
+            self.stack.setCurrentWidget(slot.frame)
+            slot.player.audio_set_mute(False)
+            if self.metrics is not None:
+                self.metrics.promote(slot.player, started)
+            self._retire(previous)
+            return slot.player
+        self.active.player.stop()
+        media = self.vlc_instance.media_new(self.resolve_url(url), *media_options)
+        self.active.player.set_media(media)
+        self.active.player.audio_set_mute(False)
+        if self.metrics is not None:
+            self.metrics.start(self.active.player, url)
+        self.active.player.play()
+        self.active.url = url
+        self.active.options = media_options
+        return self.active.player
+
+    def prewarm_budget(self):
+        """How many neighbours may be pre-buffered right now."""
+        budget = self.max_prewarmed
+        if self.max_bandwidth_kbps and self.active.url:
+            active_kbps = self.active_bitrate_kbps()
+            if active_kbps > 0:
+                budget = min(budget, max(0, int(self.max_bandwidth_kbps // active_kbps) - 1))
+        return budget
+
+    def active_bitrate_kbps(self):
+        import vlc
+        try:
+            media = self.active.player.get_media()
+            if media is None:
+                return 0
+            # libvlc fills in a caller-allocated struct and returns whether statistics are available
+            stats = vlc.MediaStats()
+            if not media.get_stats(stats):
+                return 0
+            # libvlc reports the input bitrate in kB per millisecond
+            return stats.input_bitrate * 8000
+        except Exception:
+            return 0
+
+    def prewarm(self, urls):
+        """Pre-buffer the first urls that fit the budget and drop any other pre-warmed stream."""
+        wanted = [url for url in urls if url and url != self.active.url][:self.prewarm_budget()]
+        for url in list(self.prewarmed):
+            if url not in wanted:
+                self._retire(self.prewarmed.pop(url))
+        for url in wanted:
+            if url in self.prewarmed:
+                continue
+            slot = self._take_spare()
+            slot.options = tuple(self.media_options(url))
+            media = self.vlc_instance.media_new(self.resolve_url(url), *slot.options)
+            slot.player.set_media(media)
+            slot.player.audio_set_mute(True)
+            if self.metrics is not None:
+                self.metrics.prewarm(slot.player, url)
+            slot.player.play()
+            slot.url = url
+            self.prewarmed[url] = slot
+
+    def stop_prewarming(self):
+        for url in list(self.prewarmed):
+            self._retire(self.prewarmed.pop(url))
+
+    def release(self):
+        self.stop_prewarming()
+        for slot in [self.active] + self.spare:
+            slot.player.stop()